@@ -0,0 +1,32 @@
+from typing import Any
+from django.conf import settings
+from django.core.management import BaseCommand
+from externals.feedback.pdf_report import rerender_all
+
+
+class Command(BaseCommand):
+    help = "Re-render the feedback report PDFs whose content or template changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render every report, changed or not.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "FEEDBACK_PDF_CONCURRENCY", 4),
+            help="Reports rendered at the same time.",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        counts = rerender_all(
+            concurrency=options["concurrency"], force=options["force"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{counts['rendered']} rendered, {counts['unchanged']} unchanged, "
+                f"{counts['failed']} failed."
+            )
+        )
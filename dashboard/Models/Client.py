@@ -313,7 +313,31 @@ class EngagementOperation(CreateUpdateDateTimeAndArchivedField):
 
 
 class InterviewScheduleAttempt(CreateUpdateDateTimeAndArchivedField):
+    # OPEN -> BOOKED when an interviewer accepts, OPEN -> CANCELLED when the
+    # candidate is scheduled again; every transition is a compare-and-swap
+    STATUS_CHOICES = (
+        ("OPEN", "Open"),
+        ("BOOKED", "Booked"),
+        ("CANCELLED", "Cancelled"),
+    )
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     candidate = models.ForeignKey(
         Candidate, on_delete=models.CASCADE, related_name="scheduling_attempts"
     )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="OPEN")
+    version = models.PositiveIntegerField(default=0)
+
+
+class CandidateDemand(CreateUpdateDateTimeAndArchivedField):
+    """NSCH candidates waiting per domain and strength, next to the capacity cube."""
+
+    domain = models.CharField(max_length=15, blank=True, help_text="Job name.")
+    strength = models.CharField(max_length=100, blank=True)
+    waiting_candidates = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("domain", "strength")
+
+    def __str__(self):
+        return f"{self.domain}/{self.strength}: {self.waiting_candidates}"
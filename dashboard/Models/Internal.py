@@ -75,6 +75,17 @@ class DesignationDomain(CreateUpdateDateTimeAndArchivedField):
         return self.name
 
 
+class Skill(CreateUpdateDateTimeAndArchivedField):
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Normalized skill name (case-folded, synonyms resolved).",
+    )
+
+    def __str__(self) -> str:
+        return self.name
+
+
 class InternalInterviewer(CreateUpdateDateTimeAndArchivedField):
     objects = SoftDelete()
     object_all = models.Manager()
@@ -166,6 +177,12 @@ class InternalInterviewer(CreateUpdateDateTimeAndArchivedField):
         DesignationDomain, related_name="interviewers", blank=True
     )
     skills = models.JSONField(default=list, blank=True)  # e.g., ["Java", "Python"]
+    normalized_skills = models.ManyToManyField(
+        Skill,
+        related_name="interviewers",
+        blank=True,
+        help_text="Normalized copy of skills used for skill matching.",
+    )
     strength = models.CharField(
         max_length=50, blank=True, choices=STRENGTH_CHOICES
     )  # e.g., Backend
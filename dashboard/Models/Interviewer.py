@@ -2,6 +2,7 @@ from django.db import models
 from django.utils.timezone import now
 from core.models import User
 from .Internal import InternalInterviewer
+from .Client import InterviewScheduleAttempt
 from .Interviews import Interview
 from hiringdogbackend.ModelUtils import CreateUpdateDateTimeAndArchivedField
 
@@ -35,10 +36,19 @@ class InterviewerAvailability(CreateUpdateDateTimeAndArchivedField):
     is_scheduled = models.BooleanField(default=False)
     google_calendar_id = models.CharField(max_length=255, blank=True)
     recurrence_rule = models.CharField(max_length=255, null=True, blank=True)
+    version = models.PositiveIntegerField(
+        default=0, help_text="Bumped on booking, for compare-and-swap updates."
+    )
+    recurrence_exceptions = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="ISO dates excluded from the recurrence, e.g. materialized occurrences.",
+    )
 
     class Meta:
         ordering = ["date", "start_time", "end_time"]
         unique_together = ("interviewer", "date", "start_time", "end_time")
+        indexes = [models.Index(fields=["date", "start_time"])]
         verbose_name = "Interviewer Slot Booking"
         verbose_name_plural = "Interviewer Slot Bookings"
 
@@ -60,6 +70,249 @@ class InterviewerAvailability(CreateUpdateDateTimeAndArchivedField):
     def is_recurrence(self):
         return self.recurrence_rule is not None
 
+
+class ArchivedInterviewerAvailability(CreateUpdateDateTimeAndArchivedField):
+    """
+    Past unbooked InterviewerAvailability rows moved out of the live table by
+    the compaction job (see externals.scheduling.compaction).
+    """
+
+    original_id = models.PositiveBigIntegerField(
+        unique=True, help_text="Id the slot had in InterviewerAvailability."
+    )
+    interviewer = models.ForeignKey(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="archived_availability",
+    )
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    notes = models.TextField(blank=True, null=True)
+    google_calendar_id = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["interviewer", "date"])]
+
+    def __str__(self):
+        return f"Archived slot for {self.interviewer} on {self.date}"
+
+
+class InterviewerDayGrid(CreateUpdateDateTimeAndArchivedField):
+    """
+    Bitmap companion of the InterviewerAvailability rows: one row per
+    interviewer per day, every mask being 96 bits of 15-minute cells (see
+    externals.scheduling.time_grid). Rebuilt whenever the day's slots or
+    interviews change.
+    """
+
+    interviewer = models.ForeignKey(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="day_grids",
+        help_text="The interviewer the grid belongs to.",
+    )
+    date = models.DateField(help_text="The day the grid covers.")
+    occupied_cells = models.BinaryField(
+        max_length=12,
+        default=bytes(12),
+        help_text="Cells touched by any slot, booked or free.",
+    )
+    interview_cells = models.BinaryField(
+        max_length=12,
+        default=bytes(12),
+        help_text="Cells holding the start of a scheduled interview.",
+    )
+    version = models.PositiveIntegerField(
+        default=0, help_text="Bumped on every change, for compare-and-swap updates."
+    )
+
+    class Meta:
+        unique_together = ("interviewer", "date")
+
+    def __str__(self):
+        return f"Grid for {self.interviewer} on {self.date}"
+
+
+class InterviewScheduleRecipient(CreateUpdateDateTimeAndArchivedField):
+    """
+    One interviewer slot a scheduling attempt was fanned out to. The first
+    acceptance withdraws every other pending recipient of the attempt. The
+    outcomes outlive the slot, interviewer ranking reads them.
+    """
+
+    STATUS_CHOICES = (
+        ("PENDING", "Pending"),
+        ("ACCEPTED", "Accepted"),
+        ("REJECTED", "Rejected"),
+        ("WITHDRAWN", "Withdrawn"),
+    )
+
+    attempt = models.ForeignKey(
+        InterviewScheduleAttempt,
+        on_delete=models.CASCADE,
+        related_name="recipients",
+    )
+    availability = models.ForeignKey(
+        InterviewerAvailability,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="schedule_requests",
+        help_text="Emptied when the slot is archived or merged, the outcome stays.",
+    )
+    interviewer = models.ForeignKey(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="schedule_requests",
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+
+    class Meta:
+        unique_together = ("attempt", "availability")
+
+    def __str__(self):
+        return f"{self.interviewer} - {self.status}"
+
+
+class CalendarSyncState(CreateUpdateDateTimeAndArchivedField):
+    """
+    Incremental sync position of an interviewer's Google Calendar; the busy
+    time it yields is kept in CalendarBusyInterval.
+    """
+
+    interviewer = models.OneToOneField(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="calendar_sync",
+    )
+    sync_token = models.TextField(
+        blank=True, help_text="nextSyncToken of the last successful sync."
+    )
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    full_synced_at = models.DateTimeField(
+        null=True, blank=True, help_text="When the horizon was last listed in full."
+    )
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"Calendar sync of {self.interviewer}"
+
+
+class CalendarBusyInterval(CreateUpdateDateTimeAndArchivedField):
+    """busy time of an interviewer taken from a Google Calendar event."""
+
+    interviewer = models.ForeignKey(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="busy_intervals",
+    )
+    event_id = models.CharField(max_length=255)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("interviewer", "event_id")
+        indexes = [models.Index(fields=["start", "end"])]
+
+    def __str__(self):
+        return f"{self.interviewer} busy {self.start} - {self.end}"
+
+
+class CalendarWriteOperation(CreateUpdateDateTimeAndArchivedField):
+    """
+    A Google Calendar event write waiting for the batch processor (see
+    externals.google.calendar_writes). user owns the calendar written to; it
+    is empty for the service account's calendar.
+    """
+
+    ACTION_CHOICES = (
+        ("INSERT", "Insert"),
+        ("UPDATE", "Update"),
+        ("DELETE", "Delete"),
+    )
+    STATUS_CHOICES = (
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="calendar_writes",
+    )
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    event_id = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Set for updates and deletes, and once inserted.",
+    )
+    body = models.JSONField(default=dict, blank=True)
+    params = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Extra API parameters, e.g. conferenceDataVersion.",
+    )
+    availability = models.ForeignKey(
+        InterviewerAvailability,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="calendar_writes",
+    )
+    interview = models.ForeignKey(
+        Interview,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="calendar_writes",
+    )
+    contexts = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Email contexts sent with the meeting link once the event exists.",
+    )
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    retry_after = models.DateTimeField(
+        null=True, blank=True, help_text="Not sent before this time, set on retries."
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.action} {self.event_id or '-'} ({self.status})"
+
+
+class AvailabilityCapacity(CreateUpdateDateTimeAndArchivedField):
+    """
+    One cell of the capacity cube: free interviewer minutes of an hour of a
+    date for a domain and strength (see externals.scheduling.capacity).
+    """
+
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField(help_text="Hour of the day, 0-23.")
+    domain = models.CharField(max_length=15, help_text="DesignationDomain name.")
+    strength = models.CharField(max_length=50, blank=True)
+    free_minutes = models.PositiveIntegerField(default=0)
+    interviewers = models.PositiveIntegerField(
+        default=0, help_text="Interviewers with free time in the hour."
+    )
+
+    class Meta:
+        unique_together = ("date", "hour", "domain", "strength")
+        indexes = [models.Index(fields=["date", "domain", "strength"])]
+
+    def __str__(self):
+        return f"{self.domain}/{self.strength} {self.date} {self.hour}h: {self.free_minutes}m"
+
+
 # currently model is in not used
 class InterviewerRequest(CreateUpdateDateTimeAndArchivedField):
     STATUS_CHOICES = (
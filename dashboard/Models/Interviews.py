@@ -62,6 +62,17 @@ class Interview(CreateUpdateDateTimeAndArchivedField):
     downloaded = models.BooleanField(
         default=False, help_text="signifies that video is downloaded and stored"
     )
+    recording_claim = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text="Token of the worker currently downloading the recordings.",
+    )
+    recording_lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="The recording claim expires at this time unless renewed.",
+    )
     feedback = models.TextField(
         blank=True, null=True, help_text="Feedback for the candidate"
     )
@@ -120,7 +131,17 @@ class InterviewFeedback(CreateUpdateDateTimeAndArchivedField):
         default=False,
         help_text="Signify whether the interviewer has submitted their feedback for this interview or not.",
     )
+    is_complete = models.BooleanField(
+        default=True,
+        help_text="False while the generated feedback lacks sections, it is generated again.",
+    )
     pdf_file = models.FileField(upload_to="feedback_report", null=True, blank=True)
+    pdf_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the content pdf_file was rendered from.",
+    )
     attachment = models.FileField(
         upload_to="feedback_attachments", null=True, blank=True
     )
@@ -0,0 +1,44 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from hiringdogbackend.ModelUtils import CreateUpdateDateTimeAndArchivedField
+
+
+class EmailOutbox(CreateUpdateDateTimeAndArchivedField):
+    """
+    An email written in the transaction that caused it and sent by the outbox
+    dispatcher once committed (see externals.mail.outbox). Messages with the
+    same dedupe_key are sent once.
+    """
+
+    STATUS_CHOICES = (
+        ("PENDING", "Pending"),
+        ("SENDING", "Sending"),
+        ("SENT", "Sent"),
+        ("DUPLICATE", "Duplicate"),
+        ("FAILED", "Failed"),
+    )
+
+    to = models.EmailField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True)
+    template = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    from_email = models.CharField(max_length=255, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    attachments = models.JSONField(
+        default=list, blank=True, help_text="Paths of the files to attach."
+    )
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(
+        null=True, blank=True, help_text="Not sent before this time, set on retries."
+    )
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to} ({self.status})"
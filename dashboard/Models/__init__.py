@@ -6,6 +6,7 @@ from .Client import (
     EngagementTemplates,
     EngagementOperation,
     InterviewScheduleAttempt,
+    CandidateDemand,
 )
 from .Internal import (
     ClientPointOfContact,
@@ -15,7 +16,19 @@ from .Internal import (
     HDIPUsers,
     DesignationDomain,
     InterviewerPricing,
+    Skill,
+)
+from .Interviewer import (
+    InterviewerAvailability,
+    InterviewerRequest,
+    InterviewerDayGrid,
+    ArchivedInterviewerAvailability,
+    InterviewScheduleRecipient,
+    CalendarSyncState,
+    CalendarBusyInterval,
+    CalendarWriteOperation,
+    AvailabilityCapacity,
 )
-from .Interviewer import InterviewerAvailability, InterviewerRequest
 from .Interviews import Interview, InterviewFeedback
 from .Finance import BillingRecord, BillingLog, BillPayments
+from .Notifications import EmailOutbox
@@ -28,7 +28,8 @@ from hiringdogbackend.utils import (
     validate_attachment,
     validate_json,
 )
-from ..tasks import send_mail, send_schedule_engagement_email
+from ..tasks import send_schedule_engagement_email
+from externals.mail.outbox import queue_mail
 
 
 class ClientUserDetailsSerializer(serializers.ModelSerializer):
@@ -137,7 +138,7 @@ class ClientUserSerializer(serializers.ModelSerializer):
 
             data = f"user:{current_user.email};invitee-email:{email}"
             uid = urlsafe_base64_encode(force_bytes(data))
-            send_mail_to_clientuser = send_mail.si(
+            queue_mail(
                 to=email,
                 subject=f"You're Invited to Join {organization.name} on Hiring Dog",
                 template="invitation.html",
@@ -151,7 +152,7 @@ class ClientUserSerializer(serializers.ModelSerializer):
                 site_domain=settings.SITE_DOMAIN,
             )
 
-            send_mail_to_internal = send_mail.si(
+            queue_mail(
                 to=organization.internal_client.assigned_to.user.email,
                 subject=f"Confirmation: Invitation Sent to {name} for {organization.name}",
                 template="internal_client_clientuser_invitation_confirmation.html",
@@ -161,10 +162,6 @@ class ClientUserSerializer(serializers.ModelSerializer):
                 client_name=organization.name,
             )
 
-            transaction.on_commit(
-                lambda: (send_mail_to_clientuser | send_mail_to_internal).apply_async()
-            )
-
         return client_user
 
     def update(self, instance, validated_data):
@@ -1056,3 +1053,31 @@ class FeedbackPDFVideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Interview
         fields = ("id", "recording")
+
+
+class AutoScheduleSerializer(serializers.Serializer):
+    candidate_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=500
+    )
+    date = serializers.DateField(input_formats=["%d/%m/%Y"])
+    start_time = serializers.TimeField(input_formats=["%H:%M"], required=False)
+    end_time = serializers.TimeField(input_formats=["%H:%M"], required=False)
+    max_interviews_per_interviewer = serializers.IntegerField(
+        min_value=1, max_value=8, default=3
+    )
+
+    def validate(self, data):
+        errors = {}
+        if data["date"] < date.today():
+            errors.setdefault("date", []).append("Invalid date. Date can't in past")
+        if (
+            data.get("start_time")
+            and data.get("end_time")
+            and data["end_time"] <= data["start_time"]
+        ):
+            errors.setdefault("end_time", []).append(
+                "end_time must be after start_time"
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
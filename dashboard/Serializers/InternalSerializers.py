@@ -2,7 +2,6 @@ import datetime
 from rest_framework import serializers
 from organizations.utils import create_organization
 from organizations.models import Organization
-from celery import group
 from django.conf import settings
 from django.db import transaction
 from django.utils.encoding import force_bytes
@@ -26,7 +25,8 @@ from hiringdogbackend.utils import (
     get_boolean,
     check_for_email_and_phone_uniqueness,
 )
-from ..tasks import send_mail, send_email_to_multiple_recipients
+from externals.mail.outbox import queue_emails, queue_mail
+from externals.scheduling.skill_index import sync_interviewer_skills
 
 ONBOARD_EMAIL_TEMPLATE = "onboard.html"
 WELCOME_MAIL_SUBJECT = "Welcome to Hiring Dog"
@@ -280,40 +280,29 @@ class InternalClientSerializer(serializers.ModelSerializer):
             ClientPointOfContact.objects.bulk_create(points_of_contact_objs)
             ClientUser.objects.bulk_create(client_user_objs)
 
-            send_mail_to_poc_and_internal = group(
-                *(
-                    [
-                        send_mail.si(
-                            to=point_of_contact["email"],
-                            subject=WELCOME_MAIL_SUBJECT,
-                            template=ONBOARD_EMAIL_TEMPLATE,
-                            user_name=point_of_contact["name"],
-                            password=point_of_contact["temporary_password"],
-                            login_url=settings.LOGIN_URL,
-                            org_name=organization_name,
-                        )
-                        for point_of_contact in points_of_contact_data
-                    ]
-                    + [
-                        send_mail.si(
-                            to=request.user.email,
-                            subject=f"{organization.name} Client Onboarded Successfully.",
-                            template="internal_client_onboarding_confirmation.html",
-                            internal_user_name=getattr(
-                                getattr(request.user, "hdipuser", None),
-                                "name",
-                                request.user.email,
-                            ),
-                            client_name=organization.name,
-                            onboarding_date=datetime.date.today().strftime("%d/%m/%Y"),
-                        )
-                    ]
+            for point_of_contact in points_of_contact_data:
+                queue_mail(
+                    to=point_of_contact["email"],
+                    subject=WELCOME_MAIL_SUBJECT,
+                    template=ONBOARD_EMAIL_TEMPLATE,
+                    user_name=point_of_contact["name"],
+                    password=point_of_contact["temporary_password"],
+                    login_url=settings.LOGIN_URL,
+                    org_name=organization_name,
                 )
+            queue_mail(
+                to=request.user.email,
+                subject=f"{organization.name} Client Onboarded Successfully.",
+                template="internal_client_onboarding_confirmation.html",
+                internal_user_name=getattr(
+                    getattr(request.user, "hdipuser", None),
+                    "name",
+                    request.user.email,
+                ),
+                client_name=organization.name,
+                onboarding_date=datetime.date.today().strftime("%d/%m/%Y"),
             )
 
-            # Queue the email sending after the transaction is committed
-            transaction.on_commit(lambda: send_mail_to_poc_and_internal.apply_async())
-
         return client
 
     def update(self, instance, validated_data):
@@ -383,7 +372,7 @@ class InternalClientSerializer(serializers.ModelSerializer):
                     password,
                     role=Role.CLIENT_ADMIN,
                 )
-                send_mail.delay(
+                queue_mail(
                     to=email,
                     subject=WELCOME_MAIL_SUBJECT,
                     template=ONBOARD_EMAIL_TEMPLATE,
@@ -571,6 +560,7 @@ class InterviewerSerializer(serializers.ModelSerializer):
                 user=user, **validated_data
             )
             interviewer_obj.assigned_domains.add(*domain_ids)
+            sync_interviewer_skills(interviewer_obj)
             verification_data = (
                 f"{user.id}:{int(datetime.datetime.now().timestamp() + 86400)}"
             )
@@ -599,7 +589,7 @@ class InterviewerSerializer(serializers.ModelSerializer):
                     "onboarding_date": datetime.date.today().strftime("%d/%m/%Y"),
                 },
             ]
-            send_email_to_multiple_recipients.delay(contexts, "", "")
+            queue_emails(contexts, "", "")
             user.profile.name = name
             user.profile.save()
         return interviewer_obj
@@ -626,9 +616,11 @@ class InterviewerSerializer(serializers.ModelSerializer):
 
             instance.assigned_domains.set(assigned_domain_ids)
             instance = super().update(instance, validated_data)
+            if "skills" in validated_data:
+                sync_interviewer_skills(instance)
 
             if "email" in changes:
-                send_mail.delay(
+                queue_mail(
                     to=current_email,
                     template=CHANGE_EMAIL_NOTIFICATION_TEMPLATE,
                     subject=f"{instance.name} - Your Email is updated",
@@ -942,7 +934,7 @@ class InternalClientUserSerializer(serializers.ModelSerializer):
             validated_data["invited_by"] = request.user
             client_user = super().create(validated_data)
 
-            send_mail.delay(
+            queue_mail(
                 to=email,
                 subject=WELCOME_MAIL_SUBJECT,
                 template=ONBOARD_EMAIL_TEMPLATE,
@@ -991,7 +983,7 @@ class InternalClientUserSerializer(serializers.ModelSerializer):
 
             instance = super().update(instance, validated_data)
             if new_email and current_email != new_email:
-                send_mail.delay(
+                queue_mail(
                     to=current_email,
                     subject=f"{instance.name}, Your Email Is Updated",
                     template=CHANGE_EMAIL_NOTIFICATION_TEMPLATE,
@@ -1123,7 +1115,7 @@ class HDIPUsersSerializer(serializers.ModelSerializer):
                 InternalClient.objects.filter(pk__in=client_ids).update(
                     assigned_to=hdip_user
                 )
-            send_mail.delay(
+            queue_mail(
                 to=email,
                 subject=WELCOME_MAIL_SUBJECT,
                 template=ONBOARD_EMAIL_TEMPLATE,
@@ -1175,7 +1167,7 @@ class HDIPUsersSerializer(serializers.ModelSerializer):
 
             super().update(instance, validated_data)
             if email and current_email != email:
-                send_mail.delay(
+                queue_mail(
                     to=current_email,
                     subject=f"{instance.name}, Your Email Is Updated",
                     template=CHANGE_EMAIL_NOTIFICATION_TEMPLATE,
@@ -17,6 +17,9 @@ from ..models import (
     Agreement,
 )
 from hiringdogbackend.utils import validate_incoming_data, validate_attachment
+from externals.scheduling.time_grid import may_overlap
+from externals.scheduling.recurrence import parse_rule, recurring_overlaps
+from externals.google.google_calendar import GoogleCalendar
 
 
 class RecurrenceSerializer(serializers.Serializer):
@@ -146,17 +149,40 @@ class InterviewerAvailabilitySerializer(serializers.ModelSerializer):
         if errors:
             raise serializers.ValidationError({"errors": errors})
 
+        # the day grid answers the common "no overlap" case without a range query
         overlapping_slots = InterviewerAvailability.objects.filter(
             interviewer=interviewer_user,
             date=data.get("date"),
             start_time__lt=data.get("end_time"),
             end_time__gt=data.get("start_time"),
         )
-        if overlapping_slots.exists():
+        if (
+            may_overlap(
+                interviewer_user.pk,
+                data["date"],
+                data["start_time"],
+                data["end_time"],
+            )
+            and overlapping_slots.exists()
+        ) or recurring_overlaps(
+            interviewer_user, data["date"], data["start_time"], data["end_time"]
+        ):
             errors.setdefault("availability", []).append(
                 "Interviewer already available at this date and time."
             )
 
+        if recurrence := data.get("recurrence"):
+            # stored once on the slot and expanded lazily by the availability index
+            data["recurrence_rule"] = GoogleCalendar().generate_rrule_string(
+                recurrence
+            )
+            try:
+                parse_rule(data["recurrence_rule"], data["date"], data["start_time"])
+            except ValueError:
+                errors.setdefault("recurrence", []).append(
+                    "Invalid recurrence for this date."
+                )
+
         if data["date"] < datetime.datetime.now().date():
             errors.setdefault("date", []).append("Invalid date. Date can't in past")
 
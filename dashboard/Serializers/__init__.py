@@ -11,6 +11,7 @@ from .ClientSerializers import (
     AnalyticsQuerySerializer,
     FeedbackPDFVideoSerializer,
     FinanceSerializerForInterviewer,
+    AutoScheduleSerializer,
 )
 from .InternalSerializers import (
     ClientPointOfContactSerializer,
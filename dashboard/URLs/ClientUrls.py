@@ -6,6 +6,7 @@ from ..views import (
     ResumeParserView,
     CandidateView,
     PotentialInterviewerAvailabilityForCandidateView,
+    AutoScheduleView,
     EngagementTemplateView,
     EngagementView,
     EngagementOperationView,
@@ -42,6 +43,7 @@ urlpatterns = [
         PotentialInterviewerAvailabilityForCandidateView.as_view(),
         name="interviewer-availablity",
     ),
+    path("auto-schedule/", AutoScheduleView.as_view(), name="auto-schedule"),
     path("parse-resume/", ResumeParserView.as_view(), name="resume-parser"),
     path(
         "engagement-templates/",
@@ -13,6 +13,7 @@ from ..views import (
     DomainDesignationView,
     InternalClientDomainView,
     InternalEngagementView,
+    CapacityHeatmapView,
     FinanceView,
 )
 
@@ -68,4 +69,9 @@ urlpatterns = [
         name="engagements",
     ),
     path("finance/", FinanceView.as_view(), name="internal-finance"),
+    path(
+        "capacity-heatmap/",
+        CapacityHeatmapView.as_view(),
+        name="capacity-heatmap",
+    ),
 ]
@@ -24,7 +24,6 @@ from ..models import (
     Job,
     Candidate,
     EngagementTemplates,
-    InterviewerAvailability,
     Engagement,
     EngagementOperation,
     Interview,
@@ -46,11 +45,16 @@ from ..serializer import (
     AnalyticsQuerySerializer,
     FeedbackPDFVideoSerializer,
     FinanceSerializerForInterviewer,
+    AutoScheduleSerializer,
 )
 from ..permissions import CanDeleteUpdateUser, UserRoleDeleteUpdateClientData
 from externals.parser.resumeparser2 import process_resumes
 from externals.analytics import get_candidate_analytics
 from externals.payment.cashfree import create_payment_link, is_valid_signature
+from externals.scheduling.availability_index import availability_index
+from externals.scheduling.eligibility import get_eligible_interviewer_ids
+from externals.scheduling.auto_scheduler import plan_auto_schedule
+from externals.scheduling.ranking import rank_slots
 from core.permissions import (
     IsClientAdmin,
     IsClientOwner,
@@ -882,6 +886,7 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
         experience = request.query_params.get("experience_year")
         company = request.query_params.get("company")
         designation_id = request.query_params.get("designation_id")
+        top_k = request.query_params.get("top_k")
 
         required_fields = {
             "date": date,
@@ -943,6 +948,19 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        try:
+            top_k = int(top_k) if top_k else None
+            if top_k is not None and top_k < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": "Invalid top_k. It should be a positive integer",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         if specialization not in dict(Candidate.SPECIALIZATION_CHOICES).keys():
             return Response(
                 {
@@ -980,38 +998,28 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        query = Q()
-        for skill in skills:
-            query |= Q(interviewer__skills__icontains=f'"{skill}"')
-
         client_level = request.user.clientuser.organization.internal_client.client_level
-        interviewer_level = (
-            list(range(client_level - 1, client_level + 1))
-            if client_level in [2, 3]
-            else [client_level]
+        eligible_interviewer_ids = get_eligible_interviewer_ids(
+            job, specialization, experience, company, client_level
         )
 
-        interviewer_availability = InterviewerAvailability.objects.select_related(
-            "interviewer"
-        ).filter(
-            date=formatted_date,
-            interviewer__assigned_domains__name=job.name,
-            interviewer__strength=specialization,
-            interviewer__total_experience_years__gte=experience + 2,
-            interviewer__interviewer_level__in=interviewer_level,
-            booked_by__isnull=True,
+        # free slots come from the in-memory availability index instead of a scan
+        slots = availability_index.find_slots(
+            formatted_date,
+            interviewer_ids=eligible_interviewer_ids,
+            start_time=formatted__start_time if time else None,
+            end_time=end_time if time else None,
         )
-
-        if time:
-            interviewer_availability = interviewer_availability.filter(
-                start_time__lte=formatted__start_time, end_time__gte=end_time
+        interviewer_availability = [
+            {**slot.as_dict(), "score": score}
+            for slot, score in rank_slots(
+                slots,
+                skills,
+                experience,
+                preferred_time=formatted__start_time if time else None,
+                top_k=top_k,
             )
-
-        interviewer_availability = (
-            interviewer_availability.filter(query)
-            .exclude(interviewer__current_company__iexact=company)
-            .values("id", "date", "start_time", "end_time")
-        )
+        ]
 
         if not interviewer_availability:
             return Response(
@@ -1029,6 +1037,65 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
         )
 
 
+@extend_schema(tags=["Client"])
+class AutoScheduleView(APIView):
+    serializer_class = AutoScheduleSerializer
+    permission_classes = [
+        IsAuthenticated,
+        IsClientAdmin | IsClientOwner | IsClientUser | IsAgency,
+    ]
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "status": "failed",
+                    "message": "Invalid data",
+                    "errors": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        validated_data = serializer.validated_data
+        candidate_ids = set(validated_data["candidate_ids"])
+
+        candidates = Candidate.objects.select_related(
+            "designation", "organization__internal_client"
+        ).filter(
+            organization=request.user.clientuser.organization,
+            pk__in=candidate_ids,
+            status__in=["NSCH", "SCH"],
+        )
+        invalid_candidate_ids = candidate_ids - {candidate.id for candidate in candidates}
+        if invalid_candidate_ids:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": f"Invalid or already scheduled candidate ids: {', '.join(map(str, sorted(invalid_candidate_ids)))}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # proposal only; each assignment is booked through the usual request flow
+        assignments, unassigned = plan_auto_schedule(
+            candidates,
+            validated_data["date"],
+            start_time=validated_data.get("start_time"),
+            end_time=validated_data.get("end_time"),
+            max_interviews_per_interviewer=validated_data[
+                "max_interviews_per_interviewer"
+            ],
+        )
+        return Response(
+            {
+                "status": "success",
+                "message": "Auto schedule plan generated successfully.",
+                "data": {"assignments": assignments, "unassigned": unassigned},
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 @extend_schema(tags=["Client"])
 class EngagementTemplateView(APIView, LimitOffsetPagination):
     permission_classes = [IsAuthenticated, IsClientOwner | IsClientAdmin | IsClientUser]
@@ -1,5 +1,6 @@
+from datetime import datetime, timedelta
 from drf_spectacular.utils import extend_schema
-from django.db.models import Count, Q, Case, When, IntegerField, Min
+from django.db.models import Count, Q, Case, When, IntegerField, Min, Sum
 from organizations.models import Organization
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -16,6 +17,8 @@ from ..models import (
     ClientUser,
     HDIPUsers,
     DesignationDomain,
+    AvailabilityCapacity,
+    CandidateDemand,
 )
 from ..serializer import (
     InternalClientSerializer,
@@ -976,3 +979,99 @@ class HDIPUsersViews(APIView, LimitOffsetPagination):
             },
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+
+@extend_schema(tags=["Internal"])
+class CapacityHeatmapView(APIView):
+    """
+    free interviewer capacity per date x hour x domain x strength against the
+    NSCH candidates waiting, read from the precomputed capacity cube.
+    """
+
+    permission_classes = [IsAuthenticated, IsModerator | IsSuperAdmin | IsAdmin]
+    MAX_DAYS = 90
+
+    def get(self, request):
+        start_date = request.query_params.get("start_date")
+        days = request.query_params.get("days", "7")
+        domain = request.query_params.get("domain")
+        strength = request.query_params.get("strength")
+
+        try:
+            start_date = (
+                datetime.strptime(start_date, "%d/%m/%Y").date()
+                if start_date
+                else datetime.today().date()
+            )
+            days = int(days)
+        except ValueError:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": "Invalid start_date or days. Use DD/MM/YYYY for start_date.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= days <= self.MAX_DAYS:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": f"days should be between 1 and {self.MAX_DAYS}.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        end_date = start_date + timedelta(days=days - 1)
+
+        capacity = AvailabilityCapacity.objects.filter(
+            date__range=(start_date, end_date)
+        )
+        demand = CandidateDemand.objects.all()
+        if domain:
+            capacity = capacity.filter(domain=domain)
+            demand = demand.filter(domain=domain)
+        if strength:
+            capacity = capacity.filter(strength=strength)
+            demand = demand.filter(strength=strength)
+
+        cells = list(
+            capacity.order_by("date", "hour", "domain", "strength").values(
+                "date", "hour", "domain", "strength", "free_minutes", "interviewers"
+            )
+        )
+        waiting = {
+            (row["domain"], row["strength"]): row["waiting_candidates"]
+            for row in demand.values("domain", "strength", "waiting_candidates")
+        }
+        supply = {
+            (row["domain"], row["strength"]): row["free_minutes"] or 0
+            for row in capacity.values("domain", "strength")
+            .annotate(free_minutes=Sum("free_minutes"))
+            .order_by()
+        }
+        forecast = []
+        for key in sorted(set(supply) | set(waiting)):
+            interview_slots = supply.get(key, 0) // 60
+            waiting_candidates = waiting.get(key, 0)
+            forecast.append(
+                {
+                    "domain": key[0],
+                    "strength": key[1],
+                    "free_hours": round(supply.get(key, 0) / 60, 2),
+                    "waiting_candidates": waiting_candidates,
+                    "shortfall": max(waiting_candidates - interview_slots, 0),
+                }
+            )
+
+        return Response(
+            {
+                "status": "success",
+                "message": "Capacity heatmap retrieved successfully.",
+                "data": {
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "cells": cells,
+                    "forecast": forecast,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -6,7 +6,6 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.exceptions import ObjectDoesNotExist
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.response import Response
@@ -25,8 +24,12 @@ from ..models import (
     Interview,
     InterviewFeedback,
     InterviewScheduleAttempt,
+    InterviewScheduleRecipient,
+)
+from ..tasks import (
+    download_feedback_pdf,
+    create_interview_meeting,
 )
-from ..tasks import send_email_to_multiple_recipients, download_feedback_pdf, send_mail
 from core.permissions import (
     IsInterviewer,
     IsClientAdmin,
@@ -36,11 +39,26 @@ from core.permissions import (
     HasRole,
 )
 from core.models import OAuthToken, Role
-from externals.google.google_calendar import GoogleCalendar
-from externals.google.google_meet import create_meet_and_calendar_invite
+from externals.google.calendar_writes import queue_calendar_write
+from externals.mail.outbox import queue_emails, queue_mail
+from externals.scheduling.availability_index import availability_index
+from externals.scheduling.capacity import schedule_capacity_refresh
+from externals.scheduling.recurrence import materialize_occurrence, occurs_on
+from externals.scheduling.booking import (
+    book_slot,
+    cancel_open_attempts,
+    is_attempt_closed,
+    transition_attempt,
+    withdraw_other_recipients,
+)
+from externals.scheduling.time_grid import (
+    get_day_grid,
+    may_have_interview_near,
+    mark_interview,
+    schedule_day_grid_rebuild,
+)
 from hiringdogbackend.utils import get_boolean
 
-
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
 INTERVIEW_EMAIL = (
     settings.EMAIL_HOST_USER if settings.DEBUG else settings.INTERVIEW_EMAIL
@@ -79,8 +97,6 @@ class InterviewerAvailabilityView(APIView, LimitOffsetPagination):
                         iso_format_start_time = combine_start_datetime.isoformat()
                         iso_format_end_time = combine_end_datetime.isoformat()
 
-                        recurrence = serializer.validated_data.get("recurrence")
-                        calender = GoogleCalendar()
                         event_details = {
                             "summary": "Interview Available Time",
                             # "location": "123 Main St, Virtual",
@@ -102,19 +118,22 @@ class InterviewerAvailabilityView(APIView, LimitOffsetPagination):
                             #     {"email": "attendee2@example.com"},
                             # ],
                         }
-                        if recurrence:
-                            event_details["recurrence"] = [
-                                calender.generate_rrule_string(recurrence)
-                            ]
-
-                        event = calender.create_event(
-                            access_token=oauth_obj.access_token,
-                            refresh_token=oauth_obj.refresh_token,
+                        if interviewer.recurrence_rule:
+                            event_details["recurrence"] = [interviewer.recurrence_rule]
+
+                        # the event is created by the calendar batch worker, which
+                        # stores its id in google_calendar_id
+                        queue_calendar_write(
+                            "INSERT",
                             user=request.user,
-                            event_details=event_details,
+                            body=event_details,
+                            availability=interviewer,
                         )
-                        interviewer.google_calendar_id = event.pop("id", "")
-                        interviewer.save()
+                        event = {
+                            "message": "Event creation queued",
+                            "event_link": None,
+                            "id": None,
+                        }
 
                 except Exception as e:
                     transaction.set_rollback(True)
@@ -185,7 +204,10 @@ class InterviewerReqeustView(APIView):
                 interviewer_ids = serializer.validated_data["interviewer_ids"]
                 candidate = serializer.validated_data.pop("candidate_obj")
                 contexts = []
+                recipients = []
 
+                # links of earlier attempts stop working once a new one starts
+                cancel_open_attempts(candidate)
                 scheduling_attempt = InterviewScheduleAttempt.objects.create(
                     candidate=candidate
                 )
@@ -209,7 +231,7 @@ class InterviewerReqeustView(APIView):
                     interview_obj.save()
                     candidate.save()
 
-                    send_mail.delay(
+                    queue_mail(
                         to=interviewer.email,
                         subject=f"Interview with {candidate.name} has been cancelled",
                         template="client_interview_cancelled_notification.html",
@@ -223,7 +245,7 @@ class InterviewerReqeustView(APIView):
                         .strftime("%I:%M %p"),
                     )
 
-                    send_mail.delay(
+                    queue_mail(
                         to=candidate.email,
                         subject=f"{candidate.name}, Your Interview Has Been Cancelled",
                         template="client_candidate_cancelled_notification.html",
@@ -236,9 +258,21 @@ class InterviewerReqeustView(APIView):
                         .strftime("%I:%M %p"),
                     )
 
-                for interviewer_obj in InterviewerAvailability.objects.filter(
-                    pk__in=interviewer_ids, booked_by__isnull=True
-                ).select_related("interviewer"):
+                for interviewer_obj in (
+                    InterviewerAvailability.objects.select_for_update(of=("self",))
+                    .filter(pk__in=interviewer_ids, booked_by__isnull=True)
+                    .select_related("interviewer")
+                ):
+                    # recurring slots are requested through a concrete occurrence row
+                    if interviewer_obj.recurrence_rule:
+                        if not occurs_on(
+                            interviewer_obj, serializer.validated_data["date"]
+                        ):
+                            # an exception, past the series' end or off its pattern
+                            continue
+                        interviewer_obj = materialize_occurrence(
+                            interviewer_obj, serializer.validated_data["date"]
+                        )
                     schedule_datetime = datetime.datetime.combine(
                         serializer.validated_data.get("date"),
                         serializer.validated_data.get("time"),
@@ -260,8 +294,25 @@ class InterviewerReqeustView(APIView):
                         "from_email": INTERVIEW_EMAIL,
                     }
                     contexts.append(context)
+                    recipients.append(
+                        InterviewScheduleRecipient(
+                            attempt=scheduling_attempt,
+                            availability=interviewer_obj,
+                            interviewer=interviewer_obj.interviewer,
+                        )
+                    )
 
-                send_email_to_multiple_recipients.delay(
+                if not recipients:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {
+                            "status": "failed",
+                            "message": "None of the selected interviewers is available on this date.",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                InterviewScheduleRecipient.objects.bulk_create(recipients)
+                queue_emails(
                     contexts,
                     "Interview Opportunity Available - Confirm Your Availability",
                     "interviewer_interview_notification.html",
@@ -316,6 +367,16 @@ class InterviewerRequestResponseView(APIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
+                # clicks losing the race to an earlier acceptance stop here
+                if is_attempt_closed(scheduling_id):
+                    return Response(
+                        {
+                            "status": "failed",
+                            "message": "This interview request is no longer available.",
+                        },
+                        status=status.HTTP_409_CONFLICT,
+                    )
+
                 expired_time = datetime.datetime.strptime(
                     expired_time, "%Y-%m-%d %H:%M:%S.%f"
                 )
@@ -325,34 +386,16 @@ class InterviewerRequestResponseView(APIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
+                # no row locks here: the attempt, the slot and the interviewer day are
+                # claimed below through compare-and-swap updates on their versions
                 interviewer_availability = (
-                    InterviewerAvailability.objects.select_for_update()
-                    .filter(pk=interviewer_availability_id)
-                    .first()
-                )
-                candidate = (
-                    Candidate.objects.select_for_update()
-                    .filter(pk=candidate_id)
+                    InterviewerAvailability.objects.filter(
+                        pk=interviewer_availability_id
+                    )
+                    .select_related("interviewer")
                     .first()
                 )
-
-                if candidate.status == "SCH":
-                    try:
-                        scheduling_attempts = candidate.scheduling_attempts.latest(
-                            "created_at"
-                        )
-                    except ObjectDoesNotExist:
-                        scheduling_attempts = None
-                    if scheduling_attempts and scheduling_id != str(
-                        scheduling_attempts.id
-                    ):
-                        return Response(
-                            {
-                                "status": "failed",
-                                "message": "This interview schedule has expired or was cancelled.",
-                            },
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
+                candidate = Candidate.objects.filter(pk=candidate_id).first()
 
                 if not interviewer_availability or not candidate:
                     return Response(
@@ -363,6 +406,18 @@ class InterviewerRequestResponseView(APIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
+                scheduling_attempt = InterviewScheduleAttempt.objects.filter(
+                    pk=scheduling_id, candidate=candidate
+                ).first()
+                if not scheduling_attempt or scheduling_attempt.status != "OPEN":
+                    return Response(
+                        {
+                            "status": "failed",
+                            "message": "This interview schedule has expired or was cancelled.",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
                 if candidate.status == "CSCH":
                     return Response(
                         {
@@ -390,9 +445,19 @@ class InterviewerRequestResponseView(APIView):
                 schedule_time_before_one_hour = schedule_time - datetime.timedelta(
                     hours=1
                 )
-                if (
-                    Interview.objects.select_for_update()
-                    .filter(
+                # the interview bits of the day grid rule out most gap conflicts
+                # without a query; its version guards the check against races
+                local_schedule_time = timezone.localtime(schedule_time)
+                day_grid = get_day_grid(
+                    interviewer_availability.interviewer_id,
+                    local_schedule_time.date(),
+                )
+                if may_have_interview_near(
+                    day_grid,
+                    local_schedule_time.time(),
+                    datetime.timedelta(hours=1),
+                ) and (
+                    Interview.objects.filter(
                         interviewer=interviewer_availability.interviewer,
                         status="CSCH",
                     )
@@ -418,10 +483,48 @@ class InterviewerRequestResponseView(APIView):
                     )
 
                 if action == "accept":
+                    if not transition_attempt(scheduling_attempt, "OPEN", "BOOKED"):
+                        return Response(
+                            {
+                                "status": "failed",
+                                "message": "This interview schedule has expired or was cancelled.",
+                            },
+                            status=status.HTTP_409_CONFLICT,
+                        )
+
+                    original_start_time = interviewer_availability.start_time
+                    original_end_time = interviewer_availability.end_time
+
+                    # updating with the booked time
+                    if not book_slot(
+                        interviewer_availability,
+                        booked_by,
+                        schedule_time.time(),
+                        (schedule_time + datetime.timedelta(hours=1)).time(),
+                    ):
+                        transaction.set_rollback(True)
+                        return Response(
+                            {
+                                "status": "failed",
+                                "message": "This slot has already been booked.",
+                            },
+                            status=status.HTTP_409_CONFLICT,
+                        )
+                    if not mark_interview(day_grid, local_schedule_time.time()):
+                        transaction.set_rollback(True)
+                        return Response(
+                            {
+                                "status": "failed",
+                                "message": "Interviewer's schedule changed meanwhile. Please try again.",
+                            },
+                            status=status.HTTP_409_CONFLICT,
+                        )
+                    interviewer_availability.booked_by_id = booked_by
+                    interviewer_availability.is_scheduled = True
+
                     try:
                         interview_obj = (
-                            Interview.objects.select_for_update()
-                            .filter(candidate=candidate)
+                            Interview.objects.filter(candidate=candidate)
                             .order_by("-id")
                             .first()
                         )
@@ -437,6 +540,7 @@ class InterviewerRequestResponseView(APIView):
                         )
                     except IntegrityError as e:
                         print(str(e))
+                        transaction.set_rollback(True)
                         return Response(
                             {
                                 "status": "failed",
@@ -444,18 +548,6 @@ class InterviewerRequestResponseView(APIView):
                             },
                             status=status.HTTP_400_BAD_REQUEST,
                         )
-                    interviewer_availability.booked_by_id = booked_by
-                    interviewer_availability.is_scheduled = True
-
-                    original_start_time = interviewer_availability.start_time
-                    original_end_time = interviewer_availability.end_time
-
-                    # updating with the booked time
-                    interviewer_availability.start_time = schedule_time.time()
-                    interviewer_availability.end_time = (
-                        schedule_time + datetime.timedelta(hours=1)
-                    ).time()
-                    interviewer_availability.save()
 
                     # creating new available instance for if interviewer is futher available with 1hour before and after time gap
                     original_availability_date = interviewer_availability.date
@@ -507,24 +599,22 @@ class InterviewerRequestResponseView(APIView):
                         )
 
                     InterviewerAvailability.objects.bulk_create(new_slots)
+                    # bulk_create skips the signals that keep the slot index in sync
+                    transaction.on_commit(
+                        lambda: availability_index.invalidate(
+                            original_availability_date
+                        )
+                    )
+                    schedule_day_grid_rebuild(
+                        interviewer_availability.interviewer_id,
+                        original_availability_date,
+                    )
+                    schedule_capacity_refresh([original_availability_date])
 
                     # sending the confirmation notification
                     interview_date = schedule_time.date().strftime("%d/%m/%Y")
                     interview_time = schedule_time.time().strftime("%H:%M:%S")
 
-                    meeting_link, event_id = create_meet_and_calendar_invite(
-                        interviewer_availability.interviewer.email,
-                        candidate.email,
-                        schedule_time,
-                        schedule_time + datetime.timedelta(hours=1),
-                        candidate_name=candidate.name,
-                        designation_name=candidate.designation.get_name_display(),
-                    )
-
-                    interview.scheduled_service_account_event_id = event_id
-                    interview.meeting_link = meeting_link
-                    interview.save()
-
                     internal_user = candidate.organization.internal_client.assigned_to
 
                     contexts = [
@@ -539,7 +629,6 @@ class InterviewerRequestResponseView(APIView):
                             "template": "interview_confirmation_candidate_notification.html",
                             "recruiter_email": candidate.added_by.user.email,
                             "subject": f"Interview Scheduled - {candidate.designation.get_name_display()}",
-                            "meeting_link": meeting_link,
                             "from_email": INTERVIEW_EMAIL,
                         },
                         {
@@ -551,7 +640,6 @@ class InterviewerRequestResponseView(APIView):
                             "email": interviewer_availability.interviewer.email,
                             "template": "interview_confirmation_interviewer_notification.html",
                             "subject": f"Interview Assigned - {candidate.name}",
-                            "meeting_link": meeting_link,
                             "from_email": INTERVIEW_EMAIL,
                         },
                         {
@@ -567,7 +655,6 @@ class InterviewerRequestResponseView(APIView):
                             ),
                             "template": "interview_confirmation_client_notification.html",
                             "subject": f"Interview Scheduled - {candidate.name}",
-                            "meeting_link": meeting_link,
                             "from_email": INTERVIEW_EMAIL,
                         },
                         {
@@ -580,22 +667,46 @@ class InterviewerRequestResponseView(APIView):
                             "email": internal_user.user.email,
                             "template": "internal_interview_scheduling_confirmation.html",
                             "subject": f"Interview Scheduled - {candidate.name}",
-                            "meeting_link": meeting_link,
                             "from_email": INTERVIEW_EMAIL,
                         },
                     ]
 
-                    send_email_to_multiple_recipients.delay(
-                        contexts,
-                        "",
-                        "",
+                    # Google Meet creation and the confirmations run once the booking
+                    # has committed, so their latency never extends the transaction
+                    transaction.on_commit(
+                        lambda: create_interview_meeting.delay(interview.id, contexts)
                     )
 
+                    withdrawn_contexts = [
+                        {
+                            "name": recipient.interviewer.name,
+                            "email": recipient.interviewer.email,
+                            "position": candidate.designation.get_name_display(),
+                            "interview_date": interview_date,
+                            "interview_time": interview_time,
+                            "from_email": INTERVIEW_EMAIL,
+                        }
+                        for recipient in withdraw_other_recipients(
+                            scheduling_attempt, interviewer_availability.id
+                        )
+                    ]
+                    if withdrawn_contexts:
+                        queue_emails(
+                            withdrawn_contexts,
+                            "Interview Opportunity No Longer Available",
+                            "interviewer_interview_withdrawn_notification.html",
+                        )
+
                     return Response(
                         {"status": "success", "message": "Interview Confirmed"},
                         status=status.HTTP_200_OK,
                     )
 
+                InterviewScheduleRecipient.objects.filter(
+                    attempt=scheduling_attempt,
+                    availability=interviewer_availability,
+                    status="PENDING",
+                ).update(status="REJECTED", updated_at=timezone.now())
                 return Response(
                     {"status": "success", "message": "Interview Rejected"},
                     status=status.HTTP_200_OK,
@@ -823,7 +934,7 @@ class InterviewFeedbackView(APIView, LimitOffsetPagination):
                     "template": "client_interview_feedback_submitted_notification.html",
                 }
             )
-        send_email_to_multiple_recipients.delay(contexts, "", "")
+        queue_emails(contexts, "", "")
         return Response(
             {
                 "status": "success",
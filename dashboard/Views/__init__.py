@@ -5,6 +5,7 @@ from .ClientViews import (
     ResumeParserView,
     CandidateView,
     PotentialInterviewerAvailabilityForCandidateView,
+    AutoScheduleView,
     EngagementTemplateView,
     EngagementView,
     EngagementOperationView,
@@ -33,6 +34,7 @@ from .InternalViews import (
     DomainDesignationView,
     InternalClientDomainView,
     InternalEngagementView,
+    CapacityHeatmapView,
 )
 
 from .InterviewerViews import (
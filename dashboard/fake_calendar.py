@@ -0,0 +1,206 @@
+"""
+In-memory stand-in for the Google Calendar events API the tests use. It
+covers what the calendar sync and the batched writes need: events().list
+with pages and sync tokens, insert, patch, delete and batch requests.
+Events are edited through add_event/delete_event, and expire_sync_tokens()
+makes the next incremental list fail with 410 like a stale token does.
+
+    service = FakeCalendarService()
+    service.add_event("evt1", start, end)
+    sync_calendar(interviewer, calendar=FakeGoogleCalendar(service))
+"""
+
+import datetime
+import itertools
+import httplib2
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from googleapiclient.errors import HttpError
+from externals.google.google_calendar import GoogleCalendar
+
+
+class _Request:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), message.encode())
+
+
+def _event_time(value: Dict[str, str]) -> datetime.datetime:
+    if "dateTime" in value:
+        return datetime.datetime.fromisoformat(value["dateTime"])
+    return datetime.datetime.combine(
+        datetime.date.fromisoformat(value["date"]),
+        datetime.time.min,
+        tzinfo=datetime.timezone.utc,
+    )
+
+
+class _FakeEvents:
+    def __init__(self, service: "FakeCalendarService"):
+        self._service = service
+
+    def list(
+        self,
+        calendarId: str = "primary",
+        syncToken: Optional[str] = None,
+        timeMin: Optional[str] = None,
+        timeMax: Optional[str] = None,
+        pageToken: Optional[str] = None,
+        maxResults: int = 250,
+        **kwargs,
+    ) -> _Request:
+        service = self._service
+        if syncToken:
+            _, epoch, since = syncToken.split("-")
+            since = int(since)
+            if int(epoch) != service.token_epoch:
+                return _Request(_http_error(410, "Sync token expired"))
+            items = [
+                event
+                for sequence, event in service.changes.values()
+                if sequence > since
+            ]
+        else:
+            window_start = datetime.datetime.fromisoformat(timeMin) if timeMin else None
+            window_end = datetime.datetime.fromisoformat(timeMax) if timeMax else None
+            items = [
+                event
+                for _, event in service.changes.values()
+                if event.get("status") != "cancelled"
+                and (window_end is None or _event_time(event["start"]) < window_end)
+                and (window_start is None or _event_time(event["end"]) > window_start)
+            ]
+
+        offset = int(pageToken or 0)
+        page_size = min(maxResults, service.page_size)
+        result: Dict[str, Any] = {"items": items[offset : offset + page_size]}
+        if offset + page_size < len(items):
+            result["nextPageToken"] = str(offset + page_size)
+        else:
+            result["nextSyncToken"] = f"fake-{service.token_epoch}-{service.sequence}"
+        service.requests += 1
+        return _Request(result)
+
+    def insert(
+        self,
+        calendarId: str = "primary",
+        body=None,
+        conferenceDataVersion: int = 0,
+        **kwargs,
+    ) -> _Request:
+        event_id = body.get("id") or f"fake{next(self._service.ids)}"
+        event = {**body, "id": event_id}
+        if conferenceDataVersion and "conferenceData" in body:
+            event["hangoutLink"] = f"https://meet.google.com/{event_id}"
+        return _Request(self._service.put_event(event))
+
+    def patch(
+        self, calendarId: str = "primary", eventId: str = "", body=None, **kwargs
+    ) -> _Request:
+        current = self._service.changes.get(eventId)
+        if not current or current[1].get("status") == "cancelled":
+            return _Request(_http_error(404, "Not Found"))
+        return _Request(self._service.put_event({**current[1], **(body or {})}))
+
+    def delete(self, calendarId: str = "primary", eventId: str = "", **kwargs):
+        current = self._service.changes.get(eventId)
+        if not current:
+            return _Request(_http_error(404, "Not Found"))
+        if current[1].get("status") == "cancelled":
+            return _Request(_http_error(410, "Deleted"))
+        self._service.delete_event(eventId)
+        return _Request("")
+
+
+class _FakeBatch:
+    def __init__(self, service: "FakeCalendarService", callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request: _Request, callback=None, request_id: Optional[str] = None):
+        if len(self._requests) >= 1000:
+            raise ValueError("Exceeded the maximum calls in a batch")
+        request_id = request_id or str(len(self._requests) + 1)
+        self._requests.append((request_id, request, callback or self._callback))
+
+    def execute(self) -> None:
+        self._service.batches.append(len(self._requests))
+        for request_id, request, callback in self._requests:
+            try:
+                response, exception = request.execute(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback:
+                callback(request_id, response, exception)
+
+
+class FakeCalendarService:
+    """the events resource of one user's primary calendar."""
+
+    def __init__(self, page_size: int = 250):
+        self.page_size = page_size
+        self.sequence = 0
+        self.token_epoch = 0
+        self.requests = 0
+        # size of every executed batch
+        self.batches = []
+        self.ids = itertools.count(1)
+        # event id -> (sequence of the last change, event)
+        self.changes: Dict[str, tuple] = {}
+
+    def events(self) -> _FakeEvents:
+        return _FakeEvents(self)
+
+    def new_batch_http_request(self, callback=None) -> _FakeBatch:
+        return _FakeBatch(self, callback)
+
+    def put_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        self.sequence += 1
+        event = {"status": "confirmed", **event}
+        # a changed event moves to the end, like the real change feed
+        self.changes.pop(event["id"], None)
+        self.changes[event["id"]] = (self.sequence, event)
+        return event
+
+    def add_event(
+        self,
+        event_id: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        **extra,
+    ) -> Dict[str, Any]:
+        return self.put_event(
+            {
+                "id": event_id,
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": end.isoformat()},
+                **extra,
+            }
+        )
+
+    def delete_event(self, event_id: str) -> None:
+        _, event = self.changes[event_id]
+        self.put_event({**event, "status": "cancelled"})
+
+    def expire_sync_tokens(self) -> None:
+        self.token_epoch += 1
+
+
+class FakeGoogleCalendar(GoogleCalendar):
+    """GoogleCalendar talking to a FakeCalendarService instead of Google."""
+
+    def __init__(self, service: Optional[FakeCalendarService] = None):
+        self.service = service or FakeCalendarService()
+
+    @contextmanager
+    def _service(self, *args, **kwargs) -> Iterator[FakeCalendarService]:
+        yield self.service
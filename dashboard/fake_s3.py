@@ -0,0 +1,145 @@
+"""
+In-memory stand-ins the tests use to exercise externals.google.drive_stream
+without Google or AWS. FakeS3Storage looks like django-storages' S3Storage
+to stream_to_field, and its client keeps multipart uploads and objects in
+memory with S3's part size rules. FakeDriveDownloader serves a bytes object
+as a Drive file.
+
+    storage = FakeS3Storage()
+    interview.recording.storage = storage
+    downloader = FakeDriveDownloader({"file1": video_bytes}, part_size=5 << 20)
+    stream_to_field(interview.recording, "evt1.mp4", downloader, "file1")
+    assert storage.client.objects["media/interview_recordings/evt1.mp4"] == video_bytes
+"""
+
+import hashlib
+import itertools
+import threading
+from types import SimpleNamespace
+from typing import Dict, Optional
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from externals.google.drive_download import DownloadError, Part, RangedDownloader
+from externals.google.drive_stream import S3_MIN_PART_SIZE
+
+
+class FakeS3Error(Exception):
+    pass
+
+
+class FakeS3Client:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.objects: Dict[str, bytes] = {}
+        # upload id -> {"key": ..., "parts": {number: bytes}}
+        self.uploads: Dict[str, Dict] = {}
+        self.aborted = 0
+
+    def put_object(self, Bucket, Key, Body, **params):
+        with self._lock:
+            self.objects[Key] = bytes(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def create_multipart_upload(self, Bucket, Key, **params):
+        with self._lock:
+            upload_id = f"upload-{next(self._ids)}"
+            self.uploads[upload_id] = {"key": Key, "parts": {}}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            if UploadId not in self.uploads:
+                raise FakeS3Error("NoSuchUpload")
+            self.uploads[UploadId]["parts"][PartNumber] = bytes(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        with self._lock:
+            upload = self.uploads.pop(UploadId, None)
+            if upload is None:
+                raise FakeS3Error("NoSuchUpload")
+            numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+            if numbers != sorted(numbers):
+                raise FakeS3Error("InvalidPartOrder")
+            bodies = [upload["parts"][number] for number in numbers]
+            if any(len(body) < S3_MIN_PART_SIZE for body in bodies[:-1]):
+                raise FakeS3Error("EntityTooSmall")
+            self.objects[Key] = b"".join(bodies)
+        return {"Key": Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+            self.aborted += 1
+
+
+class FakeS3Storage(Storage):
+    def __init__(self, bucket_name: str = "recordings", location: str = "media"):
+        self.client = FakeS3Client()
+        self.location = location
+        self.bucket = SimpleNamespace(
+            name=bucket_name, meta=SimpleNamespace(client=self.client)
+        )
+
+    def _normalize_name(self, name: str) -> str:
+        return f"{self.location}/{name}" if self.location else name
+
+    def get_object_parameters(self, name: str) -> Dict:
+        return {}
+
+    def get_available_name(self, name, max_length=None):
+        # S3Storage overwrites by default
+        return name
+
+    def _open(self, name, mode="rb"):
+        return ContentFile(self.client.objects[self._normalize_name(name)], name)
+
+    def _save(self, name, content):
+        self.client.put_object(
+            Bucket=self.bucket.name,
+            Key=self._normalize_name(name),
+            Body=content.read(),
+        )
+        return name
+
+    def exists(self, name):
+        return self._normalize_name(name) in self.client.objects
+
+    def delete(self, name):
+        self.client.objects.pop(self._normalize_name(name), None)
+
+    def size(self, name):
+        return len(self.client.objects[self._normalize_name(name)])
+
+    def url(self, name):
+        return f"https://{self.bucket.name}.s3.local/{self._normalize_name(name)}"
+
+
+class FakeDriveDownloader(RangedDownloader):
+    """serves files from memory; corrupt maps a file id to a wrong md5."""
+
+    def __init__(
+        self,
+        files: Dict[str, bytes],
+        part_size: int = S3_MIN_PART_SIZE,
+        concurrency: int = 4,
+        corrupt: Optional[Dict[str, str]] = None,
+    ):
+        self.files = files
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.corrupt = corrupt or {}
+        self.parts_read = 0
+
+    def metadata(self, file_id: str) -> Dict:
+        if file_id not in self.files:
+            raise DownloadError(f"Drive returned 404 for file {file_id}")
+        data = self.files[file_id]
+        md5 = self.corrupt.get(file_id) or hashlib.md5(data).hexdigest()
+        return {"id": file_id, "size": str(len(data)), "md5Checksum": md5}
+
+    def read_part(self, file_id: str, part: Part) -> bytes:
+        start, end = part
+        self.parts_read += 1
+        return self.files[file_id][start : end + 1]
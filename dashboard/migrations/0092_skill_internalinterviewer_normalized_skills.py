@@ -0,0 +1,99 @@
+# Generated by Django 5.1.2 on 2026-10-16 20:44
+
+import re
+from django.db import migrations, models
+
+# a frozen copy of externals.scheduling.skill_index at the time of this migration
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "es6": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "node js": "nodejs",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "angular.js": "angular",
+    "next.js": "nextjs",
+    "expressjs": "express",
+    "express.js": "express",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "aws": "amazon web services",
+    "gcp": "google cloud platform",
+    "dsa": "data structures and algorithms",
+    "rn": "react native",
+}
+
+
+def normalize_skill(skill):
+    normalized = re.sub(r"\s+", " ", str(skill)).strip().casefold()
+    return SKILL_SYNONYMS.get(normalized, normalized)
+
+
+def normalize_skills(skills):
+    normalized = []
+    for skill in skills or []:
+        name = normalize_skill(skill)
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+def populate_normalized_skills(apps, schema_editor):
+    Skill = apps.get_model("dashboard", "Skill")
+    InternalInterviewer = apps.get_model("dashboard", "InternalInterviewer")
+    skill_ids = {}
+    for interviewer in InternalInterviewer.objects.all():
+        ids = []
+        for name in normalize_skills(interviewer.skills):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.get_or_create(name=name)[0].id
+            ids.append(skill_ids[name])
+        interviewer.normalized_skills.set(ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0091_alter_job_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived', models.BooleanField(default=False)),
+                ('name', models.CharField(help_text='Normalized skill name (case-folded, synonyms resolved).', max_length=100, unique=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='internalinterviewer',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, help_text='Normalized copy of skills used for skill matching.', related_name='interviewers', to='dashboard.skill'),
+        ),
+        migrations.RunPython(populate_normalized_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 5.1.2 on 2026-10-16 20:47
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+from django.utils import timezone
+
+# a frozen copy of externals.scheduling.time_grid at the time of this migration
+CELL_MINUTES = 15
+CELLS_PER_DAY = 24 * 60 // CELL_MINUTES
+GRID_BYTES = CELLS_PER_DAY // 8
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + (value.second > 0 or value.microsecond > 0)
+
+
+def _range_mask(first_cell, last_cell):
+    first_cell, last_cell = max(first_cell, 0), min(last_cell, CELLS_PER_DAY - 1)
+    if last_cell < first_cell:
+        return 0
+    return ((1 << (last_cell - first_cell + 1)) - 1) << first_cell
+
+
+def covering_mask(start, end):
+    end_minutes = _minutes(end) or 24 * 60
+    return _range_mask(
+        start.hour * 60 // CELL_MINUTES + start.minute // CELL_MINUTES,
+        -(-end_minutes // CELL_MINUTES) - 1,
+    )
+
+
+def inner_mask(start, end):
+    end_minutes = end.hour * 60 + end.minute or 24 * 60
+    return _range_mask(
+        -(-_minutes(start) // CELL_MINUTES), end_minutes // CELL_MINUTES - 1
+    )
+
+
+def point_mask(value):
+    return 1 << ((value.hour * 60 + value.minute) // CELL_MINUTES)
+
+
+def to_bytes(mask):
+    return mask.to_bytes(GRID_BYTES, "little")
+
+
+def build_day_masks(slots, interview_times):
+    available = occupied = interviews = 0
+    for start_time, end_time, is_free in slots:
+        occupied |= covering_mask(start_time, end_time)
+        if is_free:
+            available |= inner_mask(start_time, end_time)
+    for interview_time in interview_times:
+        interviews |= point_mask(interview_time)
+    return available, occupied, interviews
+
+
+def populate_day_grids(apps, schema_editor):
+    InterviewerAvailability = apps.get_model("dashboard", "InterviewerAvailability")
+    Interview = apps.get_model("dashboard", "Interview")
+    InterviewerDayGrid = apps.get_model("dashboard", "InterviewerDayGrid")
+
+    today = timezone.localdate()
+    slots, interview_times = defaultdict(list), defaultdict(list)
+    for interviewer_id, date, start_time, end_time, booked_by_id in (
+        InterviewerAvailability.objects.filter(date__gte=today)
+        .values_list("interviewer_id", "date", "start_time", "end_time", "booked_by_id")
+        .iterator()
+    ):
+        slots[(interviewer_id, date)].append(
+            (start_time, end_time, booked_by_id is None)
+        )
+    for interviewer_id, scheduled_time in (
+        Interview.objects.filter(
+            status="CSCH",
+            scheduled_time__date__gte=today,
+            interviewer__isnull=False,
+            archived=False,
+        )
+        .values_list("interviewer_id", "scheduled_time")
+        .iterator()
+    ):
+        scheduled_time = timezone.localtime(scheduled_time)
+        interview_times[(interviewer_id, scheduled_time.date())].append(
+            scheduled_time.time()
+        )
+
+    grids = []
+    for interviewer_id, date in set(slots) | set(interview_times):
+        available, occupied, interviews = build_day_masks(
+            slots[(interviewer_id, date)], interview_times[(interviewer_id, date)]
+        )
+        grids.append(
+            InterviewerDayGrid(
+                interviewer_id=interviewer_id,
+                date=date,
+                available_cells=to_bytes(available),
+                occupied_cells=to_bytes(occupied),
+                interview_cells=to_bytes(interviews),
+            )
+        )
+    InterviewerDayGrid.objects.bulk_create(grids, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0092_skill_internalinterviewer_normalized_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewerDayGrid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived', models.BooleanField(default=False)),
+                ('date', models.DateField(help_text='The day the grid covers.')),
+                ('available_cells', models.BinaryField(default=b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', help_text='Cells fully covered by free slots.', max_length=12)),
+                ('occupied_cells', models.BinaryField(default=b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', help_text='Cells touched by any slot, booked or free.', max_length=12)),
+                ('interview_cells', models.BinaryField(default=b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', help_text='Cells holding the start of a scheduled interview.', max_length=12)),
+                ('interviewer', models.ForeignKey(help_text='The interviewer the grid belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='day_grids', to='dashboard.internalinterviewer')),
+            ],
+            options={
+                'unique_together': {('interviewer', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_day_grids, migrations.RunPython.noop),
+    ]
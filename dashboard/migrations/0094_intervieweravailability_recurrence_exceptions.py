@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-16 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0093_interviewerdaygrid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intervieweravailability',
+            name='recurrence_exceptions',
+            field=models.JSONField(blank=True, default=list, help_text='ISO dates excluded from the recurrence, e.g. materialized occurrences.'),
+        ),
+    ]
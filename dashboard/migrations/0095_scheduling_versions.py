@@ -0,0 +1,61 @@
+# Generated by Django 5.1.2 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+def set_attempt_statuses(apps, schema_editor):
+    # only the latest attempt of a candidate still in scheduling stays open
+    InterviewScheduleAttempt = apps.get_model("dashboard", "InterviewScheduleAttempt")
+
+    latest = {}
+    for attempt_id, candidate_id, candidate_status in (
+        InterviewScheduleAttempt.objects.order_by("candidate_id", "created_at")
+        .values_list("id", "candidate_id", "candidate__status")
+        .iterator()
+    ):
+        latest[candidate_id] = (attempt_id, candidate_status)
+    open_ids = [
+        attempt_id
+        for attempt_id, candidate_status in latest.values()
+        if candidate_status == "SCH"
+    ]
+    booked_ids = [
+        attempt_id
+        for attempt_id, candidate_status in latest.values()
+        if candidate_status not in ["SCH", "NSCH"]
+    ]
+    InterviewScheduleAttempt.objects.exclude(pk__in=open_ids + booked_ids).update(
+        status="CANCELLED"
+    )
+    InterviewScheduleAttempt.objects.filter(pk__in=booked_ids).update(status="BOOKED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0094_intervieweravailability_recurrence_exceptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intervieweravailability',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped on booking, for compare-and-swap updates.'),
+        ),
+        migrations.AddField(
+            model_name='interviewerdaygrid',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped on every change, for compare-and-swap updates.'),
+        ),
+        migrations.AddField(
+            model_name='interviewscheduleattempt',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('BOOKED', 'Booked'), ('CANCELLED', 'Cancelled')], default='OPEN', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='interviewscheduleattempt',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_attempt_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-16 20:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0095_scheduling_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewScheduleRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected'), ('WITHDRAWN', 'Withdrawn')], default='PENDING', max_length=10)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='dashboard.interviewscheduleattempt')),
+                ('availability', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_requests', to='dashboard.intervieweravailability')),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_requests', to='dashboard.internalinterviewer')),
+            ],
+            options={
+                'unique_together': {('attempt', 'availability')},
+            },
+        ),
+    ]
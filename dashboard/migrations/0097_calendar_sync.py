@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-16 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0096_interviewschedulerecipient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived', models.BooleanField(default=False)),
+                ('sync_token', models.TextField(blank=True, help_text='nextSyncToken of the last successful sync.')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('interviewer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_sync', to='dashboard.internalinterviewer')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CalendarBusyInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived', models.BooleanField(default=False)),
+                ('event_id', models.CharField(max_length=255)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='busy_intervals', to='dashboard.internalinterviewer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start', 'end'], name='dashboard_c_start_f317c9_idx')],
+                'unique_together': {('interviewer', 'event_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.2 on 2026-10-16 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0098_calendarwriteoperation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AvailabilityCapacity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                ("date", models.DateField()),
+                (
+                    "hour",
+                    models.PositiveSmallIntegerField(
+                        help_text="Hour of the day, 0-23."
+                    ),
+                ),
+                (
+                    "domain",
+                    models.CharField(
+                        help_text="DesignationDomain name.", max_length=15
+                    ),
+                ),
+                ("strength", models.CharField(blank=True, max_length=50)),
+                ("free_minutes", models.PositiveIntegerField(default=0)),
+                (
+                    "interviewers",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Interviewers with free time in the hour."
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "domain", "strength"],
+                        name="dashboard_a_date_2b6c03_idx",
+                    )
+                ],
+                "unique_together": {("date", "hour", "domain", "strength")},
+            },
+        ),
+        migrations.CreateModel(
+            name="CandidateDemand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "domain",
+                    models.CharField(blank=True, help_text="Job name.", max_length=15),
+                ),
+                ("strength", models.CharField(blank=True, max_length=100)),
+                ("waiting_candidates", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("domain", "strength")},
+            },
+        ),
+    ]
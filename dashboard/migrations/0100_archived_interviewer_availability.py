@@ -0,0 +1,66 @@
+# Generated by Django 5.1.2 on 2026-10-16 21:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0099_capacity_cube"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedInterviewerAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "original_id",
+                    models.PositiveBigIntegerField(
+                        help_text="Id the slot had in InterviewerAvailability.",
+                        unique=True,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("start_time", models.TimeField()),
+                ("end_time", models.TimeField()),
+                ("notes", models.TextField(blank=True, null=True)),
+                ("google_calendar_id", models.CharField(blank=True, max_length=255)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="intervieweravailability",
+            index=models.Index(
+                fields=["date", "start_time"], name="dashboard_i_date_271c99_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedintervieweravailability",
+            name="interviewer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_availability",
+                to="dashboard.internalinterviewer",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedintervieweravailability",
+            index=models.Index(
+                fields=["interviewer", "date"], name="dashboard_a_intervi_3cac8f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0101_emailoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="recording_claim",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Token of the worker currently downloading the recordings.",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="recording_lease_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="The recording claim expires at this time unless renewed.",
+                null=True,
+            ),
+        ),
+    ]
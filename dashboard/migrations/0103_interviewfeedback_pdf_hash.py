@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0102_interview_recording_claim"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interviewfeedback",
+            name="pdf_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash of the content pdf_file was rendered from.",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0103_interviewfeedback_pdf_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendarwriteoperation",
+            name="retry_after",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Not sent before this time, set on retries.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0104_calendarwriteoperation_retry_after"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="interviewschedulerecipient",
+            name="availability",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Emptied when the slot is archived or merged, the outcome stays.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="schedule_requests",
+                to="dashboard.intervieweravailability",
+            ),
+        ),
+    ]
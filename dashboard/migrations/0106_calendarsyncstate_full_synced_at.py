@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0105_interviewschedulerecipient_keep_outcomes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendarsyncstate",
+            name="full_synced_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the horizon was last listed in full.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0106_calendarsyncstate_full_synced_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interviewfeedback",
+            name="is_complete",
+            field=models.BooleanField(
+                default=True,
+                help_text="False while the generated feedback lacks sections, it is generated again.",
+            ),
+        ),
+    ]
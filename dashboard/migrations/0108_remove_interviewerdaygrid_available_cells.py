@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0107_interviewfeedback_is_complete"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="interviewerdaygrid",
+            name="available_cells",
+        ),
+    ]
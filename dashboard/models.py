@@ -20,4 +20,14 @@ from .Models import (
     InterviewScheduleAttempt,
     BillingLog,
     BillPayments,
+    Skill,
+    InterviewerDayGrid,
+    ArchivedInterviewerAvailability,
+    InterviewScheduleRecipient,
+    CalendarSyncState,
+    CalendarBusyInterval,
+    CalendarWriteOperation,
+    AvailabilityCapacity,
+    CandidateDemand,
+    EmailOutbox,
 )
@@ -27,4 +27,5 @@ from .Serializers import (
     AnalyticsQuerySerializer,
     FeedbackPDFVideoSerializer,
     FinanceSerializerForInterviewer,
+    AutoScheduleSerializer,
 )
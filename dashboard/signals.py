@@ -0,0 +1,174 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import (
+    InterviewerAvailability,
+    Interview,
+    InternalInterviewer,
+    DesignationDomain,
+    Candidate,
+)
+from externals.scheduling.availability_index import availability_index
+from externals.scheduling.capacity import (
+    horizon_dates,
+    schedule_capacity_refresh,
+    schedule_demand_refresh,
+)
+from externals.scheduling.eligibility import eligibility_index
+from externals.scheduling.time_grid import schedule_day_grid_rebuild
+
+
+def _interview_day(interviewer_id, scheduled_time):
+    if not (interviewer_id and scheduled_time):
+        return None
+    return interviewer_id, timezone.localtime(scheduled_time).date()
+
+
+@receiver(pre_save, sender=InterviewerAvailability)
+def interviewer_availability_pre_save_signal(sender, instance, **kwargs):
+    instance._previous_day = instance._previous_rule = None
+    if instance.pk:
+        previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("interviewer_id", "date", "recurrence_rule")
+            .first()
+        )
+        if previous:
+            instance._previous_day = previous[:2]
+            instance._previous_rule = previous[2]
+
+
+@receiver(post_save, sender=InterviewerAvailability)
+def interviewer_availability_post_save_signal(sender, instance, **kwargs):
+    slot = (
+        instance.id,
+        instance.interviewer_id,
+        instance.date,
+        instance.start_time,
+        instance.end_time,
+        instance.booked_by_id is None,
+    )
+    transaction.on_commit(lambda: availability_index.refresh_slot(*slot))
+    if instance.recurrence_rule or getattr(instance, "_previous_rule", None):
+        transaction.on_commit(availability_index.invalidate_recurring)
+        schedule_capacity_refresh(horizon_dates())
+    schedule_day_grid_rebuild(instance.interviewer_id, instance.date)
+    schedule_capacity_refresh([instance.date])
+    previous_day = getattr(instance, "_previous_day", None)
+    if previous_day and previous_day != (instance.interviewer_id, instance.date):
+        schedule_day_grid_rebuild(*previous_day)
+        schedule_capacity_refresh([previous_day[1]])
+
+
+@receiver(post_delete, sender=InterviewerAvailability)
+def interviewer_availability_post_delete_signal(sender, instance, **kwargs):
+    # past days are never searched; the compaction job deletes them in bulk
+    if instance.date < timezone.localdate() and not instance.recurrence_rule:
+        return
+    slot_id, date = instance.id, instance.date
+    transaction.on_commit(lambda: availability_index.remove_slot(slot_id, date))
+    if instance.recurrence_rule:
+        transaction.on_commit(availability_index.invalidate_recurring)
+        schedule_capacity_refresh(horizon_dates())
+    schedule_day_grid_rebuild(instance.interviewer_id, instance.date)
+    schedule_capacity_refresh([instance.date])
+
+
+@receiver(pre_save, sender=Interview)
+def interview_pre_save_signal(sender, instance, **kwargs):
+    instance._previous_day = None
+    if instance.pk:
+        previous = (
+            sender.object_all.filter(pk=instance.pk)
+            .values_list("interviewer_id", "scheduled_time")
+            .first()
+        )
+        instance._previous_day = previous and _interview_day(*previous)
+
+
+@receiver(post_save, sender=Interview)
+def interview_post_save_signal(sender, instance, **kwargs):
+    day = _interview_day(instance.interviewer_id, instance.scheduled_time)
+    if day:
+        schedule_day_grid_rebuild(*day)
+    previous_day = getattr(instance, "_previous_day", None)
+    if previous_day and previous_day != day:
+        schedule_day_grid_rebuild(*previous_day)
+
+
+@receiver(post_delete, sender=Interview)
+def interview_post_delete_signal(sender, instance, **kwargs):
+    day = _interview_day(instance.interviewer_id, instance.scheduled_time)
+    if day:
+        schedule_day_grid_rebuild(*day)
+
+
+@receiver(pre_save, sender=InternalInterviewer)
+def interviewer_pre_save_signal(sender, instance, **kwargs):
+    instance._previous_strength = (
+        sender.object_all.filter(pk=instance.pk)
+        .values_list("strength", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=InternalInterviewer)
+def interviewer_post_save_signal(sender, instance, created, **kwargs):
+    # a new interviewer has no domains yet; those arrive through m2m_changed
+    if not created and instance.strength != getattr(
+        instance, "_previous_strength", instance.strength
+    ):
+        schedule_capacity_refresh(horizon_dates())
+
+
+@receiver(post_save, sender=InternalInterviewer)
+@receiver(post_delete, sender=InternalInterviewer)
+@receiver(post_save, sender=DesignationDomain)
+@receiver(post_delete, sender=DesignationDomain)
+def eligibility_source_changed_signal(sender, **kwargs):
+    transaction.on_commit(eligibility_index.invalidate)
+
+
+@receiver(m2m_changed, sender=InternalInterviewer.assigned_domains.through)
+def interviewer_assigned_domains_changed_signal(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(eligibility_index.invalidate)
+        schedule_capacity_refresh(horizon_dates())
+
+
+def _demand_key(candidate):
+    designation = candidate.designation
+    return (designation.name if designation else "", candidate.specialization)
+
+
+@receiver(pre_save, sender=Candidate)
+def candidate_pre_save_signal(sender, instance, **kwargs):
+    instance._previous_demand = None
+    if instance.pk:
+        previous = (
+            sender.object_all.filter(pk=instance.pk)
+            .values_list("status", "designation__name", "specialization")
+            .first()
+        )
+        if previous and previous[0] == "NSCH":
+            instance._previous_demand = (previous[1] or "", previous[2])
+
+
+@receiver(post_save, sender=Candidate)
+def candidate_post_save_signal(sender, instance, **kwargs):
+    keys = set()
+    if getattr(instance, "_previous_demand", None):
+        keys.add(instance._previous_demand)
+    if instance.status == "NSCH":
+        keys.add(_demand_key(instance))
+    if keys:
+        schedule_demand_refresh(keys)
+
+
+@receiver(post_delete, sender=Candidate)
+def candidate_post_delete_signal(sender, instance, **kwargs):
+    if instance.status == "NSCH":
+        schedule_demand_refresh([_demand_key(instance)])
@@ -1,24 +1,63 @@
+import logging
 import os
-import requests
+import random
+from contextlib import nullcontext
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail import EmailMultiAlternatives
 from django.core.files.base import ContentFile
 from django.db import transaction
 from django.db.models import F
-from django.template.loader import render_to_string
 from django.utils import timezone
 from celery import shared_task, chain, group
 from celery.exceptions import Reject
 from django.conf import settings
 from django.utils.safestring import mark_safe
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
-from .models import EngagementOperation, Interview, InterviewFeedback
-from externals.google.google_meet import download_from_google_drive
-from datetime import datetime, timedelta
-from externals.feedback.interview_feedback import (
-    analyze_transcription_and_generate_feedback,
+from .models import (
+    EngagementOperation,
+    Interview,
+    InterviewFeedback,
+    InternalInterviewer,
+    CalendarSyncState,
+    CalendarWriteOperation,
+)
+from externals.google.google_meet import (
+    download_from_google_drive,
+    store_drive_recordings,
+    build_meet_event,
+)
+from externals.google.calendar_sync import sync_calendar
+from externals.google.recording_queue import (
+    claim_recordings,
+    extend_lease,
+    heartbeat,
+    release,
+)
+from externals.scheduling.capacity import (
+    rebuild_capacity,
+    refresh_capacity,
+    refresh_demand,
+)
+from externals.scheduling.compaction import archive_past_slots, merge_free_fragments
+from externals.feedback.analysis_cache import analysis_cache
+from externals.feedback.pdf_report import render_for_interview, rerender_all
+from externals.feedback.pipeline import (
+    batches as feedback_batches,
+    generate_feedback,
+    pending_interview_ids,
+)
+from externals.mail.outbox import (
+    DISPATCH_LIMIT,
+    dispatch_pending,
+    queue_emails,
+    queue_mail,
 )
+from externals.google.calendar_writes import (
+    process_pending_writes,
+    queue_calendar_write,
+)
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
 
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
 INTERVIEW_EMAIL = (
@@ -26,9 +65,8 @@ INTERVIEW_EMAIL = (
 )
 
 
-@shared_task(bind=True, max_retries=3, rate_limit="10/m")
+@shared_task
 def send_mail(
-    self,
     to,
     subject,
     template,
@@ -37,37 +75,26 @@ def send_mail(
     bcc=None,
     **kwargs,
 ):
-    email_type = kwargs.get("type")
-    context = {
-        "email": to,
-        **kwargs,
-    }
-
-    try:
-        content = render_to_string(template, context=context)
-        email_message = EmailMultiAlternatives(
+    """
+    kept for tasks queued before the email outbox, and for their retries: the
+    message is handed to the outbox, whose dispatch takes from the shared
+    rate limit, sends over the pooled SMTP connections and retries it.
+    """
+    with transaction.atomic():
+        queue_mail(
+            to,
             subject,
-            "",
-            (
-                INTERVIEW_EMAIL
-                if email_type and email_type in ["feedback_notification"]
-                else CONTACT_EMAIL
-            ),
-            [to],
-            reply_to=[reply_to],
-            bcc=[bcc],
+            template,
+            reply_to=reply_to,
+            attachments=attachments,
+            bcc=bcc,
+            **kwargs,
         )
-        email_message.attach_alternative(content, "text/html")
-        for attachment in attachments:
-            email_message.attach_file(attachment)
-        email_message.send(fail_silently=True)
-    except Exception as exc:
-        raise self.retry(exc=exc, countdown=60, retry_jitter=True)
+    return f"Queued email to {to}."
 
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=60, retry_jitter=True)
+@shared_task
 def send_email_to_multiple_recipients(
-    self,
     contexts,
     subject,
     template,
@@ -76,45 +103,187 @@ def send_email_to_multiple_recipients(
     bcc=None,
     **kwargs,
 ):
-    emails = []
+    """
+    kept for tasks queued before the email outbox, and for their retries: the
+    messages are handed to the outbox, whose dispatch renders them in batches
+    per template, takes from the shared rate limit and retries each unsent
+    message on its own.
+    """
+    with transaction.atomic():
+        messages = queue_emails(
+            contexts,
+            subject,
+            template,
+            reply_to=reply_to,
+            attachments=attachments,
+            bcc=bcc,
+        )
+    return f"Queued {len(messages)} emails."
 
-    with get_connection() as connection:
-        for context in contexts:
-            replies_to = [reply_to]
-            email_address = context.get("email")
-            from_email = context.get("from_email")
-            recruiter_email = context.get("recruiter_email")
 
-            if recruiter_email:
-                replies_to.append(recruiter_email)
+@shared_task
+def dispatch_email_outbox():
+    """sends the committed outbox emails, one batch after another."""
+    totals = {}
+    while True:
+        result = dispatch_pending()
+        for status_, count in result.items():
+            totals[status_] = totals.get(status_, 0) + count
+        if sum(result.values()) < DISPATCH_LIMIT:
+            return totals
+
+
+@shared_task(bind=True, max_retries=3)
+def create_interview_meeting(self, interview_id, contexts):
+    """
+    queues the Google Meet invite of an accepted interview; the confirmation
+    emails go out with the link once the calendar batch has created it.
+    Queued after the accept commits; safe to retry since an already created
+    meeting is reused. When every retry failed the confirmations go out
+    without a link, the interview is booked either way.
+    """
+    try:
+        _create_interview_meeting(interview_id, contexts)
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(
+                exc=exc, countdown=30 * 2**self.request.retries + random.randint(0, 30)
+            )
+        logger.error(
+            "Queuing the Meet event of interview %s failed for good, confirmations"
+            " go out without a link",
+            interview_id,
+            exc_info=exc,
+        )
+        send_interview_confirmations(None, contexts)
 
-            if context.get("subject"):
-                subject = context["subject"]
 
-            if context.get("template"):
-                template = context["template"]
+def _create_interview_meeting(interview_id, contexts):
+    interview = (
+        Interview.objects.select_related("candidate__designation", "interviewer")
+        .filter(pk=interview_id, status="CSCH")
+        .first()
+    )
+    if not interview:
+        return
 
-            if not email_address:
-                continue
+    if interview.meeting_link:
+        send_interview_confirmations(interview.meeting_link, contexts)
+        return
 
-            html_content = render_to_string(template, context)
+    with transaction.atomic():
+        if CalendarWriteOperation.objects.filter(
+            interview=interview, action="INSERT", status__in=["PENDING", "PROCESSING"]
+        ).exists():
+            return
+        candidate = interview.candidate
+        scheduled_time = timezone.localtime(interview.scheduled_time)
+        queue_calendar_write(
+            "INSERT",
+            body=build_meet_event(
+                interview.interviewer.email,
+                candidate.email,
+                scheduled_time,
+                scheduled_time + timedelta(hours=1),
+                candidate_name=candidate.name,
+                designation_name=candidate.designation.get_name_display(),
+            ),
+            params={"conferenceDataVersion": 1},  # to generate meet link
+            interview=interview,
+            contexts=contexts,
+        )
 
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body="This is an HTML email. Please view it in an HTML-compatible email client.",
-                from_email=from_email if from_email else CONTACT_EMAIL,
-                to=[email_address],
-                reply_to=replies_to,
-                bcc=[bcc],
-                connection=connection,
+
+def send_interview_confirmations(meeting_link, contexts):
+    """queues the booking confirmations; without meeting_link they say so."""
+    for context in contexts:
+        context["meeting_link"] = meeting_link
+    queue_emails(contexts, "", "")
+
+
+@shared_task
+def process_calendar_writes():
+    """
+    sends the queued calendar writes in batches, then the confirmations of
+    the interviews whose Meet event was created or failed for good.
+    """
+    operations = [
+        operation
+        for operation in process_pending_writes()
+        if operation.contexts
+        and operation.interview_id
+        and operation.status in ("DONE", "FAILED")
+    ]
+    meeting_links = dict(
+        Interview.objects.filter(
+            pk__in=[operation.interview_id for operation in operations]
+        ).values_list("id", "meeting_link")
+    )
+    for operation in operations:
+        if operation.status == "FAILED":
+            logger.error(
+                "Creating the Meet event of interview %s failed for good (%s),"
+                " confirmations go out without a link",
+                operation.interview_id,
+                operation.last_error,
             )
-            for attachment in attachments:
-                email.attach_file(attachment)
-            email.attach_alternative(html_content, "text/html")
-            emails.append(email)
+        send_interview_confirmations(
+            meeting_links.get(operation.interview_id), operation.contexts
+        )
+
+
+@shared_task
+def sync_interviewer_calendars():
+    """queues a calendar sync for every interviewer with a connected calendar."""
+    for interviewer_id in InternalInterviewer.objects.filter(
+        user__oauth_token__isnull=False
+    ).values_list("id", flat=True):
+        sync_interviewer_calendar.delay(interviewer_id)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_jitter=True,
+    max_retries=3,
+)
+def sync_interviewer_calendar(self, interviewer_id):
+    interviewer = InternalInterviewer.objects.filter(pk=interviewer_id).first()
+    if not interviewer:
+        return
+    try:
+        sync_calendar(interviewer)
+    except Exception as e:
+        CalendarSyncState.objects.filter(interviewer=interviewer).update(
+            last_error=str(e)
+        )
+        raise
 
-        if emails:
-            connection.send_messages(emails)
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=30, max_retries=3)
+def refresh_availability_capacity(dates):
+    """recomputes the capacity cube of the given ISO dates."""
+    refresh_capacity(datetime.strptime(date, "%Y-%m-%d").date() for date in dates)
+
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=30, max_retries=3)
+def refresh_candidate_demand(keys):
+    """recounts the waiting candidates of the given [domain, strength] keys."""
+    refresh_demand((domain, strength) for domain, strength in keys)
+
+
+@shared_task
+def rebuild_capacity_forecast():
+    rebuild_capacity()
+
+
+@shared_task
+def compact_interviewer_availability():
+    """merges free slot fragments and archives the past unbooked slots."""
+    merged = merge_free_fragments()
+    archived = archive_past_slots()
+    return {"merged": merged, "archived": archived}
 
 
 @shared_task(bind=True, max_retries=4)
@@ -162,30 +331,26 @@ def send_schedule_engagement_email(self, engagement_operation_id):
 
 @shared_task
 def fetch_interview_records():
-    current_time = timezone.now()
-    before_one_and_half_an_hour = current_time - timedelta(hours=2, minutes=30)
-    interview_qs = Interview.objects.filter(
-        scheduled_time__lte=before_one_and_half_an_hour,
-        status="CSCH",
-        downloaded=False,
-        scheduled_service_account_event_id__isnull=False,
-        no_of_time_processed__lte=3,
-    ).values_list("id", "scheduled_service_account_event_id")
-    return list(interview_qs)
+    # claimed interviews are skipped by later runs until released or expired
+    return claim_recordings()
 
 
 @shared_task(bind=True, retry_backoff=10, max_retries=3)
 def download_recordings_from_google_drive(self, interview_info):
-    if not interview_info or len(interview_info) != 2:
+    if not interview_info or len(interview_info) not in (2, 3):
         raise Reject("Missing or invalid interview info")
-    interview_id, event_id = interview_info
+    interview_id, event_id, *claim = interview_info
+    token = claim[0] if claim else None
     try:
         download_recording_info = download_from_google_drive(interview_id, event_id)
         if not download_recording_info:
-            Interview.objects.filter(pk=interview_id).update(
-                no_of_time_processed=F("no_of_time_processed") + 1
-            )
-            raise Reject(f"Failed to download recordings for Interview {interview_id}")
+            # not attached yet, a later poll within RECORDING_WAIT tries again
+            if token:
+                release(interview_id, token)
+            raise Reject(f"No recordings yet for Interview {interview_id}")
+        if token and not extend_lease(interview_id, token):
+            raise Reject(f"Interview {interview_id} was claimed by another worker")
+        download_recording_info["claim"] = token
         return download_recording_info
     except Reject:
         raise
@@ -193,44 +358,79 @@ def download_recordings_from_google_drive(self, interview_info):
         print(
             f"Exception occured in download_recordings_from_google_drive:{interview_id} - {str(e)}"
         )
+        if token and self.request.retries >= self.max_retries:
+            release(
+                interview_id,
+                token,
+                no_of_time_processed=F("no_of_time_processed") + 1,
+            )
         raise self.retry(exc=e)
 
 
-@shared_task
-def store_recordings(recording_info):
+@shared_task(bind=True, max_retries=3)
+def store_recordings(self, recording_info):
     try:
         interview = Interview.objects.get(pk=recording_info["interview_id"])
     except Interview.DoesNotExist:
         raise Reject(f"Interview {recording_info['interview_id']} not found")
-    files_to_delete = []
-    with transaction.atomic():
-        for file_type, file in recording_info["files"].items():
-            try:
-                with open(file["path"], "rb") as f:
-                    if file_type == "video":
-                        interview.recording.save(file["name"], f)
-                    elif file_type == "transcript":
-                        interview.transcription.save(file["name"], f)
-            except Exception as e:
-                raise Reject(f"Error processing file {file['path']}: {str(e)}")
-            files_to_delete.append(file["path"])
-
-        interview.downloaded = True
-        interview.no_of_time_processed += 1
-        interview.save(
-            update_fields=[
-                "recording",
-                "transcription",
-                "downloaded",
-                "no_of_time_processed",
-            ]
-        )
+    files = recording_info["files"]
+    token = recording_info.get("claim")
+    try:
+        with heartbeat(interview.id, token) if token else nullcontext():
+            if all("file_id" in file for file in files.values()):
+                # straight from Drive into storage, nothing is written to /tmp
+                store_drive_recordings(interview, files)
+            else:
+                _store_downloaded_recordings(interview, files)
+    except Reject:
+        if token:
+            release(interview.id, token)
+        raise
+    except Exception as e:
+        if token and self.request.retries >= self.max_retries:
+            release(interview.id, token)
+        raise self.retry(exc=e, countdown=60)
+
+    if token:
+        # only the worker still holding the claim marks the interview done
+        if not release(
+            interview.id,
+            token,
+            recording=interview.recording.name,
+            transcription=interview.transcription.name,
+            downloaded=True,
+            no_of_time_processed=F("no_of_time_processed") + 1,
+        ):
+            raise Reject(f"Interview {interview.id} was claimed by another worker")
+        return interview.id
+
+    interview.downloaded = True
+    interview.no_of_time_processed += 1
+    interview.save(
+        update_fields=[
+            "recording",
+            "transcription",
+            "downloaded",
+            "no_of_time_processed",
+        ]
+    )
+    return interview.id
 
-    for file_path in files_to_delete:
-        if os.path.exists(file_path):
-            os.remove(file_path)
 
-    return interview.id
+def _store_downloaded_recordings(interview, files):
+    # chains queued before recordings were streamed still carry /tmp paths
+    for file_type, file in files.items():
+        try:
+            with open(file["path"], "rb") as f:
+                if file_type == "video":
+                    interview.recording.save(file["name"], f, save=False)
+                elif file_type == "transcript":
+                    interview.transcription.save(file["name"], f, save=False)
+        except Exception as e:
+            raise Reject(f"Error processing file {file['path']}: {str(e)}")
+    for file in files.values():
+        if os.path.exists(file["path"]):
+            os.remove(file["path"])
 
 
 @shared_task(bind=True)
@@ -253,100 +453,42 @@ def trigger_interview_processing():
     chain(fetch_interview_records.s(), process_interview_recordings.s()).apply_async()
 
 
-@shared_task(bind=True, retry_backoff=5, max_retries=3)
-def process_interview_video_and_generate_and_store_feedback(self):
-    interviews = (
-        Interview.objects.filter(
-            transcription__isnull=False, interview_feedback__isnull=True
-        )
-        .exclude(transcription="")
-        .only("id", "feedback")
-    )
-    print(interviews)
-    processed_ids = []
-    for interview in interviews:
-        try:
-            with interview.transcription.open("r") as f:
-                file_content = f.read()
-            extracted_data = analyze_transcription_and_generate_feedback(file_content)
+@shared_task
+def process_interview_video_and_generate_and_store_feedback():
+    # a batch per task, so a backlog is spread over the workers
+    interview_ids = pending_interview_ids()
+    for batch in feedback_batches(interview_ids):
+        generate_interview_feedback.delay(batch)
+    return f"Interview feedback queued for {interview_ids}."
 
-            InterviewFeedback.objects.update_or_create(
-                interview_id=interview.id, defaults={**extracted_data}
-            )
-            processed_ids.append(interview.id)
-            interviewer_name = interview.interviewer.name
-            candidate_name = interview.candidate.name
-            contexts = [
-                {
-                    "interviewer_name": interviewer_name,
-                    "candidate_name": candidate_name,
-                    "dashboard_link": f"https://{settings.SITE_DOMAIN}/",
-                    "type": "feedback_notification",
-                    "email": interview.interviewer.email,
-                    "from_email": INTERVIEW_EMAIL,
-                    "subject": f"Ready to Review? Feedback for {candidate_name} is Live",
-                    "template": "interview_feedback_notification_email.html",
-                },
-                {
-                    "internal_user_name": interview.candidate.organization.internal_client.assigned_to.name,
-                    "organization_name": interview.candidate.organization.name,
-                    "position": interview.candidate.designation.get_name_display(),
-                    "interviewer_name": interview.interviewer.name,
-                    "interview_date": interview.scheduled_time.strftime(
-                        "%d/%m/%Y %H:%M"
-                    ),
-                    "candidate_name": candidate_name,
-                    "email": interview.candidate.organization.internal_client.assigned_to.user.email,
-                    "from_email": INTERVIEW_EMAIL,
-                    "subject": f"Feedback Report Generated: Insights from {interviewer_name}'s Interview with {candidate_name}",
-                    "template": "internal_interview_feedback_report_generated_conformation.html",
-                },
-            ]
-            send_email_to_multiple_recipients.delay(contexts, "", "")
-        except Exception as e:
-            print(str(e))
-    return f"Interview feedback created successfully for {processed_ids}."
+
+@shared_task
+def generate_interview_feedback(interview_ids):
+    processed_ids = generate_feedback(interview_ids)
+    return (
+        f"Interview feedback created successfully for {processed_ids}. "
+        f"Analysis cache: {analysis_cache.stats.snapshot()}"
+    )
 
 
 @shared_task(bind=True, retry_backoff=5, max_retries=3)
 def download_feedback_pdf(self, interview_uid):
-    from dashboard.Serializers.InterviewerSerializers import InterviewFeedbackSerializer
-
-    interview_feedback = (
-        InterviewFeedback.objects.filter(interview_id=interview_uid)
-        .select_related(
-            "interview",
-            "interview__candidate",
-            "interview__candidate__designation",
-            "interview__interviewer",
-        )
-        .first()
-    )
-    serializer = InterviewFeedbackSerializer(interview_feedback)
-    interview_uid = urlsafe_base64_encode(
-        force_bytes(f"interview_id:{interview_feedback.interview.id}")
-    )
-    data = serializer.data
-    data["url"] = f"{interview_uid}"
-    response = requests.post(
-        "http://localhost:3000/generate-pdf", json=data, stream=True
+    try:
+        # unchanged feedback keeps its stored report
+        rendered = render_for_interview(interview_uid)
+    except Exception as e:
+        logger.exception("Generating the feedback PDF of %s failed", interview_uid)
+        raise self.retry(exc=e)
+    if rendered is None:
+        raise Reject(f"No feedback for Interview {interview_uid}")
+    return "Successfully Saved" if rendered else "Unchanged"
+
+
+@shared_task
+def rerender_feedback_pdfs(feedback_ids=None, force=False):
+    # after a report template change, with PDF_TEMPLATE_VERSION bumped
+    return rerender_all(
+        feedback_ids,
+        concurrency=getattr(settings, "FEEDBACK_PDF_CONCURRENCY", 4),
+        force=force,
     )
-    if response.status_code == 200:
-        candidate = interview_feedback.interview.candidate
-        designation = candidate.designation.get_name_display()
-        save_path = f"/tmp/{candidate.name}_{designation}_Feedback_Round 1_{timezone.now().strftime('%Y%m%d-%H%M%S')}.pdf"
-        with open(save_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        with open(save_path, "rb") as f:
-            interview_feedback.pdf_file.save(
-                f"{candidate.name}_{designation}_Feedback_Round 1_{timezone.now().strftime('%Y%m%d-%H%M%S')}.pdf",
-                f,
-            )
-        if os.path.exists(save_path):
-            os.remove(save_path)
-        return "Successfully Saved"
-    else:
-        error_message = response.content.decode("utf-8")
-        print(f"Failed to generate PDF: {error_message}")
-        self.retry(exc=Exception("Failed to generate PDF"))
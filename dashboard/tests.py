@@ -1,3 +1,358 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+from django.db import transaction
+from django.core.files.storage import InMemoryStorage
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from core.models import OAuthToken, User
+from dashboard.fake_calendar import FakeCalendarService, FakeGoogleCalendar
+from dashboard.fake_s3 import FakeDriveDownloader, FakeS3Storage
+from dashboard.models import (
+    CalendarBusyInterval,
+    CalendarSyncState,
+    CalendarWriteOperation,
+    EmailOutbox,
+    InternalInterviewer,
+    Interview,
+    InterviewerAvailability,
+)
+from externals.feedback.analysis_cache import DiskAnalysisCache, analysis_key
+from externals.feedback.segmenting import OVERALL_LIMIT, merge_analyses
+from externals.google.calendar_sync import sync_calendar
+from externals.google.calendar_writes import MAX_ATTEMPTS, process_pending_writes
+from externals.google.drive_download import DownloadError
+from externals.google.drive_stream import S3_MIN_PART_SIZE, stream_to_field
+from externals.mail.outbox import STALE_AFTER, _claim, dispatch_pending
+from externals.scheduling.time_grid import schedule_day_grid_rebuild
 
-# Create your tests here.
+
+def create_interviewer(email="interviewer@example.com", phone="+919812345670"):
+    user = User.objects.create_user(email=email, phone=phone)
+    return InternalInterviewer.objects.create(
+        user=user,
+        email=email,
+        phone_number=phone,
+        total_experience_years=5,
+        interview_experience_years=2,
+    )
+
+
+class DayGridRebuildScheduleTest(TestCase):
+    @mock.patch("externals.scheduling.time_grid.rebuild_day_grid")
+    def test_rebuild_is_scheduled_again_after_rollback(self, rebuild):
+        date = datetime.date(2030, 1, 7)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                schedule_day_grid_rebuild(1, date)
+                transaction.set_rollback(True)
+        rebuild.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                schedule_day_grid_rebuild(1, date)
+                schedule_day_grid_rebuild(1, date)
+                schedule_day_grid_rebuild(2, date)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            rebuild.call_args_list, [mock.call(1, date), mock.call(2, date)]
+        )
+
+
+class OutboxSlowBatchTest(TestCase):
+    def test_slow_batch_keeps_its_claim(self):
+        for index in range(3):
+            EmailOutbox.objects.create(
+                to=f"candidate{index}@example.com",
+                template="welcome.html",
+                dedupe_key=str(index),
+            )
+        clock = [timezone.now()]
+        claimed_by_others = []
+
+        class SlowConnection:
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def send_messages(self, emails):
+                # each message waits half of STALE_AFTER on the rate limit
+                clock[0] += STALE_AFTER / 2
+                claimed_by_others.extend(_claim(10))
+                return len(emails)
+
+        with mock.patch(
+            "externals.mail.outbox.timezone.now", lambda: clock[0]
+        ), mock.patch(
+            "externals.mail.outbox.render_many",
+            lambda template, contexts: ["<p></p>"] * len(contexts),
+        ), mock.patch(
+            "externals.mail.outbox.email_rate_limiter"
+        ) as limiter:
+            limiter.acquire.return_value = True
+            counts = dispatch_pending(connection=SlowConnection())
+
+        self.assertEqual(counts, {"SENT": 3})
+        self.assertEqual(claimed_by_others, [])
+
+
+class StreamToFieldTest(TestCase):
+    video = bytes(range(256)) * (S3_MIN_PART_SIZE * 5 // 2 // 256)
+
+    def stream(self, storage, **downloader_options):
+        interview = Interview()
+        interview.recording.storage = storage
+        downloader = FakeDriveDownloader({"file1": self.video}, **downloader_options)
+        name = stream_to_field(interview.recording, "evt1.mp4", downloader, "file1")
+        return interview, downloader, name
+
+    def test_s3_gets_the_parts_as_a_multipart_upload(self):
+        storage = FakeS3Storage()
+        interview, downloader, name = self.stream(storage)
+        self.assertEqual(name, "interview_recordings/evt1.mp4")
+        self.assertEqual(interview.recording.name, name)
+        self.assertEqual(
+            storage.client.objects["media/interview_recordings/evt1.mp4"], self.video
+        )
+        self.assertEqual(downloader.parts_read, 3)
+        self.assertEqual(storage.client.uploads, {})
+
+    def test_s3_upload_is_aborted_on_checksum_mismatch(self):
+        storage = FakeS3Storage()
+        with self.assertRaises(DownloadError):
+            self.stream(storage, corrupt={"file1": "0" * 32})
+        self.assertEqual(storage.client.objects, {})
+        self.assertEqual(storage.client.uploads, {})
+        self.assertEqual(storage.client.aborted, 1)
+
+    def test_other_storage_gets_a_sequential_file(self):
+        storage = InMemoryStorage()
+        _, downloader, name = self.stream(storage, part_size=1024 * 1024)
+        with storage.open(name) as f:
+            self.assertEqual(f.read(), self.video)
+        self.assertEqual(downloader.parts_read, 13)
+
+    def test_other_storage_file_is_deleted_on_checksum_mismatch(self):
+        storage = InMemoryStorage()
+        with self.assertRaises(DownloadError):
+            self.stream(storage, corrupt={"file1": "0" * 32})
+        self.assertFalse(storage.exists("interview_recordings/evt1.mp4"))
+
+
+class CalendarSyncTest(TestCase):
+    def setUp(self):
+        self.interviewer = create_interviewer()
+        OAuthToken.objects.create(
+            user=self.interviewer.user,
+            token_type="INTERVIEWER",
+            access_token="access",
+            refresh_token="refresh",
+            expires_at=timezone.now() + datetime.timedelta(hours=1),
+        )
+        self.service = FakeCalendarService(page_size=2)
+        self.calendar = FakeGoogleCalendar(self.service)
+        self.tomorrow = timezone.now().replace(microsecond=0) + datetime.timedelta(
+            days=1
+        )
+
+    def add_event(self, event_id, days=0, **extra):
+        start = self.tomorrow + datetime.timedelta(days=days)
+        return self.service.add_event(
+            event_id, start, start + datetime.timedelta(hours=1), **extra
+        )
+
+    def busy(self):
+        return dict(
+            CalendarBusyInterval.objects.filter(
+                interviewer=self.interviewer
+            ).values_list("event_id", "start")
+        )
+
+    def sync(self):
+        return sync_calendar(self.interviewer, calendar=self.calendar)
+
+    def test_full_sync_lists_the_horizon(self):
+        self.add_event("meeting")
+        self.add_event("lunch", days=1)
+        self.add_event("focus", days=2, transparency="transparent")
+        self.add_event("holiday", days=400)
+
+        self.assertEqual(self.sync(), 2)
+        self.assertEqual(
+            self.busy(),
+            {
+                "meeting": self.tomorrow,
+                "lunch": self.tomorrow + datetime.timedelta(days=1),
+            },
+        )
+        state = CalendarSyncState.objects.get(interviewer=self.interviewer)
+        self.assertTrue(state.sync_token)
+        self.assertIsNotNone(state.full_synced_at)
+
+    def test_incremental_sync_applies_the_changes(self):
+        self.add_event("meeting")
+        self.add_event("lunch", days=1)
+        self.sync()
+        full_synced_at = CalendarSyncState.objects.get(
+            interviewer=self.interviewer
+        ).full_synced_at
+
+        self.service.delete_event("meeting")
+        self.add_event("lunch", days=3)
+        # changes beyond the horizon are kept as well
+        self.add_event("offsite", days=200)
+        self.assertEqual(self.sync(), 3)
+        self.assertEqual(
+            self.busy(),
+            {
+                "lunch": self.tomorrow + datetime.timedelta(days=3),
+                "offsite": self.tomorrow + datetime.timedelta(days=200),
+            },
+        )
+        state = CalendarSyncState.objects.get(interviewer=self.interviewer)
+        self.assertEqual(state.full_synced_at, full_synced_at)
+
+    def test_expired_sync_token_falls_back_to_a_full_sync(self):
+        self.add_event("meeting")
+        self.add_event("lunch", days=1)
+        self.sync()
+        self.add_event("offsite", days=200)
+        self.sync()
+
+        self.service.expire_sync_tokens()
+        self.service.delete_event("meeting")
+        self.add_event("review", days=2)
+        self.sync()
+        self.assertEqual(set(self.busy()), {"lunch", "review", "offsite"})
+        state = CalendarSyncState.objects.get(interviewer=self.interviewer)
+        self.assertTrue(state.sync_token.startswith("fake-1-"))
+
+
+class CalendarWriteProcessingTest(TestCase):
+    def setUp(self):
+        self.service = FakeCalendarService()
+
+    @contextmanager
+    def service_factory(self, user):
+        yield self.service
+
+    def process(self):
+        return process_pending_writes(service_factory=self.service_factory)
+
+    def test_batch_results_are_mapped_back(self):
+        availability = InterviewerAvailability.objects.create(
+            interviewer=create_interviewer(),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(10),
+            end_time=datetime.time(11),
+        )
+        start = timezone.now().replace(microsecond=0)
+        self.service.add_event("planned", start, start + datetime.timedelta(hours=1))
+        insert = CalendarWriteOperation.objects.create(
+            action="INSERT", body={"summary": "Available"}, availability=availability
+        )
+        update = CalendarWriteOperation.objects.create(
+            action="UPDATE", event_id="planned", body={"summary": "Moved"}
+        )
+        # an event that is gone already counts as deleted
+        delete = CalendarWriteOperation.objects.create(
+            action="DELETE", event_id="gone"
+        )
+
+        operations = self.process()
+        self.assertEqual(
+            {operation.pk: operation.status for operation in operations},
+            {insert.pk: "DONE", update.pk: "DONE", delete.pk: "DONE"},
+        )
+        self.assertEqual(self.service.batches, [3])
+        insert.refresh_from_db()
+        availability.refresh_from_db()
+        self.assertTrue(insert.event_id)
+        self.assertEqual(availability.google_calendar_id, insert.event_id)
+        self.assertEqual(self.service.changes["planned"][1]["summary"], "Moved")
+
+    def test_failed_write_backs_off_and_fails_in_the_end(self):
+        operation = CalendarWriteOperation.objects.create(
+            action="UPDATE", event_id="unknown", body={"summary": "Moved"}
+        )
+        self.process()
+        operation.refresh_from_db()
+        self.assertEqual((operation.status, operation.attempts), ("PENDING", 1))
+        self.assertGreater(operation.retry_after, timezone.now())
+        # not sent again before retry_after
+        self.assertEqual(self.process(), [])
+
+        CalendarWriteOperation.objects.filter(pk=operation.pk).update(
+            attempts=MAX_ATTEMPTS - 1,
+            retry_after=timezone.now() - datetime.timedelta(seconds=1),
+        )
+        self.process()
+        operation.refresh_from_db()
+        self.assertEqual(
+            (operation.status, operation.attempts), ("FAILED", MAX_ATTEMPTS)
+        )
+
+
+class DiskAnalysisCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_hit_and_miss(self):
+        cache = DiskAnalysisCache(self.directory)
+        key = analysis_key("transcript", "v1", "model")
+        self.assertIsNone(cache.get(key))
+        cache.set(key, {"strength": "Clear answers"}, tokens=1200)
+        self.assertEqual(cache.get(key), {"strength": "Clear answers"})
+        self.assertIsNone(cache.get(analysis_key("transcript", "v2", "model")))
+        self.assertEqual(
+            cache.stats.snapshot(),
+            {"hits": 1, "misses": 2, "hit_rate": 0.333, "tokens_saved": 1200},
+        )
+
+    def test_expired_entry_is_a_miss_and_removed(self):
+        cache = DiskAnalysisCache(self.directory, ttl=-1)
+        cache.set("expired", {"strength": "Clear answers"})
+        self.assertIsNone(cache.get("expired"))
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(cache.stats.snapshot()["misses"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = DiskAnalysisCache(self.directory, max_entries=2)
+        for age, key in enumerate(["first", "second"]):
+            cache.set(key, {"key": key})
+            os.utime(cache._path(key), (1000 + age, 1000 + age))
+        # reading first makes second the least recently used
+        cache.get("first")
+        cache.set("third", {"key": "third"})
+        self.assertEqual(cache.get("first"), {"key": "first"})
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), {"key": "third"})
+
+    def test_snapshot_without_lookups(self):
+        self.assertEqual(
+            DiskAnalysisCache(self.directory).stats.snapshot(),
+            {"hits": 0, "misses": 0, "hit_rate": 0.0, "tokens_saved": 0},
+        )
+
+
+class MergeAnalysesTest(SimpleTestCase):
+    def test_every_segment_keeps_a_share_of_the_limit(self):
+        first = "Explained generators clearly. " * 30
+        merged = merge_analyses(
+            [
+                {"strength": first},
+                {"strength": "Good grasp of SQL indexes."},
+                {"strength": "Designed a sound cache. Weighed the trade-offs."},
+            ]
+        )
+        strength = merged["strength"]
+        self.assertLessEqual(len(strength), OVERALL_LIMIT)
+        self.assertTrue(strength.startswith("Explained generators clearly."))
+        self.assertIn("Good grasp of SQL indexes.", strength)
+        self.assertTrue(strength.endswith("Weighed the trade-offs."))
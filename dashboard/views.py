@@ -15,6 +15,7 @@ from dashboard.Views import (
     JobView,
     InterviewerAvailabilityView,
     PotentialInterviewerAvailabilityForCandidateView,
+    AutoScheduleView,
     InterviewerReqeustView,
     InterviewerRequestResponseView,
     EngagementOperationUpdateView,
@@ -27,6 +28,7 @@ from dashboard.Views import (
     DomainDesignationView,
     InternalClientDomainView,
     InternalEngagementView,
+    CapacityHeatmapView,
     InterviewerAcceptedInterviewsView,
     InterviewerPendingFeedbackView,
     InterviewerInterviewHistoryView,
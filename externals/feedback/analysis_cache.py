@@ -0,0 +1,172 @@
+"""
+Content-addressed cache of transcript analyses. An entry is keyed by the
+sha256 of the model, the prompt version and the transcript text. A rerun
+after a failed batch or a reprocessed interview therefore reuses the stored
+analysis, and a prompt change (a new PROMPT_VERSION) misses on its own.
+
+RedisAnalysisCache keeps entries in Django's cache with a TTL, and Redis
+evicts them under memory pressure. DiskAnalysisCache keeps one JSON file per
+entry and evicts the least recently used beyond max_entries; it needs no
+server, for offline runs and tests. Set FEEDBACK_ANALYSIS_CACHE_DIR to use
+it. analysis_cache.stats.snapshot() reports hits, misses, the hit rate and
+the model tokens the hits saved.
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "feedback:analysis:"
+TTL = 30 * 24 * 60 * 60
+MAX_DISK_ENTRIES = 1000
+
+
+def analysis_key(transcript: str, prompt_version: str, model: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, transcript):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnalysisCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def record(self, hit: bool, tokens: int = 0) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.tokens_saved += tokens
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+            }
+
+
+class AnalysisCache(ABC):
+    def __init__(self):
+        self.stats = AnalysisCacheStats()
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[Dict]:
+        """the stored entry of key, None when there is none."""
+
+    @abstractmethod
+    def _write(self, key: str, entry: Dict) -> None:
+        """stores entry under key."""
+
+    def get(self, key: str) -> Optional[Dict]:
+        """the cached analysis, None on a miss or when the cache can't be read."""
+        try:
+            entry = self._read(key)
+        except Exception as e:
+            logger.warning("Reading the analysis cache failed: %s", e)
+            entry = None
+        self.stats.record(entry is not None, (entry or {}).get("tokens", 0))
+        return entry["data"] if entry is not None else None
+
+    def set(self, key: str, data: Dict, tokens: int = 0) -> None:
+        """stores an analysis with the model tokens it cost."""
+        try:
+            self._write(key, {"data": data, "tokens": tokens})
+        except Exception as e:
+            logger.warning("Writing the analysis cache failed: %s", e)
+
+
+class RedisAnalysisCache(AnalysisCache):
+    def __init__(self, ttl: int = TTL):
+        super().__init__()
+        self.ttl = ttl
+
+    def _read(self, key: str) -> Optional[Dict]:
+        return cache.get(KEY_PREFIX + key)
+
+    def _write(self, key: str, entry: Dict) -> None:
+        cache.set(KEY_PREFIX + key, entry, timeout=self.ttl)
+
+
+class DiskAnalysisCache(AnalysisCache):
+    def __init__(
+        self, directory: str, ttl: int = TTL, max_entries: int = MAX_DISK_ENTRIES
+    ):
+        super().__init__()
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        if entry.get("expires_at", float("inf")) < time.time():
+            os.remove(path)
+            return None
+        # the access time orders the eviction
+        os.utime(path)
+        return entry
+
+    def _write(self, key: str, entry: Dict) -> None:
+        path = self._path(key)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({**entry, "expires_at": time.time() + self.ttl}, f)
+        os.replace(f"{path}.tmp", path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".json")
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                os.remove(entry.path)
+
+
+def _default_cache() -> AnalysisCache:
+    directory = getattr(settings, "FEEDBACK_ANALYSIS_CACHE_DIR", None)
+    ttl = getattr(settings, "FEEDBACK_ANALYSIS_CACHE_TTL", TTL)
+    if directory:
+        return DiskAnalysisCache(directory, ttl=ttl)
+    return RedisAnalysisCache(ttl=ttl)
+
+
+analysis_cache = _default_cache()
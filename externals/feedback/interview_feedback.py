@@ -1,6 +1,11 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 import google.generativeai as genai
-import json
+from externals.ratelimit import TokenBucket
+from .analysis_cache import analysis_cache, analysis_key
+from .segmenting import MAX_SEGMENT_CHARS, merge_analyses, segment_transcript
+from .streaming import stream_feedback
 
 # import assemblyai as aai
 
@@ -8,6 +13,23 @@ import json
 # aai.settings.api_key = os.getenv("ASSEMBLYAI_API_KEY")
 genai.configure(api_key=settings.GOOGLE_API_KEY)
 
+logger = logging.getLogger(__name__)
+
+# the Gemini quota is per project, so every worker takes from one bucket
+gemini_rate_limiter = TokenBucket(
+    "gemini:rate-limit",
+    rate_setting="GEMINI_REQUESTS_PER_MINUTE",
+    burst_setting="GEMINI_REQUEST_BURST",
+    default_rate=10,
+    default_burst=2,
+)
+# longest a call waits for the quota before it gives up for this run
+RATE_LIMIT_WAIT = 120
+MODEL_NAME = "gemini-2.0-flash-thinking-exp-01-21"
+# bump whenever the prompt changes, cached analyses of the old one are then missed
+PROMPT_VERSION = "1"
+SEGMENT_CONCURRENCY = 4
+
 
 # def transcribe_video(video_path):
 #     """
@@ -22,11 +44,45 @@ genai.configure(api_key=settings.GOOGLE_API_KEY)
 #         return None
 
 
-def analyze_transcription_and_generate_feedback(transcription):
+def analyze_transcription_and_generate_feedback(transcription, cache=None):
+    """
+    Analyze the transcription and generate feedback grouped by skills. Long
+    transcripts are split into segments that are analyzed in parallel and
+    merged, so the slowest segment bounds the latency rather than the whole
+    interview. None when any segment could not be analyzed.
+    """
+    max_chars = getattr(settings, "FEEDBACK_SEGMENT_CHARS", MAX_SEGMENT_CHARS)
+    segments = segment_transcript(transcription, max_chars)
+    if len(segments) == 1:
+        return analyze_segment(transcription, cache)
+
+    texts = [
+        f"(Part {number} of {len(segments)} of the interview; timestamps are "
+        f"relative to the start of the whole interview.)\n{segment}"
+        for number, segment in enumerate(segments, start=1)
+    ]
+    with ThreadPoolExecutor(
+        max_workers=min(SEGMENT_CONCURRENCY, len(texts))
+    ) as executor:
+        analyses = list(executor.map(lambda text: analyze_segment(text, cache), texts))
+    if any(analysis is None for analysis in analyses):
+        # the analyzed segments stay cached for the next run
+        return None
+    return merge_analyses(analyses)
+
+
+def analyze_segment(transcription, cache=None):
     """
     Analyze the transcription and generate feedback for all questions in a single API request.
-    Group questions by skills.
+    Group questions by skills. Analyses are cached by transcript and prompt
+    version, cache defaults to analysis_cache.
     """
+    cache = cache or analysis_cache
+    key = analysis_key(transcription, PROMPT_VERSION, MODEL_NAME)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
     prompt = f"""
         Below is a transcription of an interview. Perform the following tasks:
 
@@ -92,24 +148,25 @@ def analyze_transcription_and_generate_feedback(transcription):
         {transcription}
     """
 
+    model = genai.GenerativeModel(MODEL_NAME)
+
+    def generate(request):
+        if not gemini_rate_limiter.acquire(timeout=RATE_LIMIT_WAIT):
+            raise RuntimeError("Gemini quota exhausted, analyzed on a later run.")
+        return model.generate_content(request, stream=True)
+
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp-01-21")
-        response = model.generate_content(prompt)
-
-        # Clean the response text
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-
-        # Parse the JSON response
-        data = json.loads(response_text)
-        return data
-    except json.JSONDecodeError:
-        print(
-            "The API response is not valid JSON. Please check the prompt or API output."
-        )
-        print("Raw API Response:", response_text)
-        return None
+        # skill blocks are validated as they stream in; a follow-up request
+        # asks only for the sections that never arrived complete
+        data, tokens, missing = stream_feedback(generate, prompt)
     except Exception as e:
-        print(f"An error occurred while analyzing the transcription: {e}")
+        logger.exception("Analyzing the transcription failed: %s", e)
+        return None
+    if data is None:
+        logger.warning("The API response held no usable feedback.")
         return None
+    if missing:
+        # salvaged partial feedback is used but not cached, a rerun may complete it
+        return {**data, "missing": missing}
+    cache.set(key, data, tokens=tokens)
+    return data
@@ -0,0 +1,206 @@
+"""
+Feedback report PDFs. A report is rendered from the InterviewFeedbackSerializer
+output, either by the Node service (FEEDBACK_PDF_RENDERER = "node", the
+default, which keeps the layout reports have always had) or in process from
+templates/feedback_report.html with WeasyPrint ("python"), which is not in
+requirements.txt since it needs system Pango libraries. Both stream the PDF
+straight into InterviewFeedback.pdf_file, nothing goes through /tmp.
+
+Each stored report carries pdf_hash, the sha256 of the serializer output,
+the renderer and PDF_TEMPLATE_VERSION. Unchanged feedback is therefore never
+rendered again. After a template change, bump PDF_TEMPLATE_VERSION and run
+rerender_all, which renders every stale report on a thread pool.
+"""
+
+import hashlib
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATE = "feedback_report.html"
+# bump after changing the report layout, every report is then rendered again
+PDF_TEMPLATE_VERSION = "1"
+SERVICE_URL = "http://localhost:3000/generate-pdf"
+SERVICE_TIMEOUT = (10, 120)
+BATCH_CONCURRENCY = 4
+# serializer fields hashed by their stored file name instead, or not at all
+UNHASHED_FIELDS = ("pdf_file", "recording_link", "attachment")
+
+
+class PDFRenderError(Exception):
+    pass
+
+
+def get_renderer() -> str:
+    return getattr(settings, "FEEDBACK_PDF_RENDERER", "node")
+
+
+def report_payload(feedback) -> Dict:
+    """what the renderers get: the serialized feedback and its share url."""
+    from dashboard.Serializers.InterviewerSerializers import (
+        InterviewFeedbackSerializer,
+    )
+
+    data = dict(InterviewFeedbackSerializer(feedback).data)
+    data["url"] = urlsafe_base64_encode(
+        force_bytes(f"interview_id:{feedback.interview.id}")
+    )
+    return data
+
+
+def content_hash(feedback, payload: Dict, renderer: str) -> str:
+    hashed = {
+        key: value for key, value in payload.items() if key not in UNHASHED_FIELDS
+    }
+    # signed storage urls change on every request, the file names do not
+    hashed["recording"] = feedback.interview.recording.name or ""
+    hashed["attachment"] = feedback.attachment.name or ""
+    material = json.dumps(
+        [renderer, PDF_TEMPLATE_VERSION, hashed],
+        sort_keys=True,
+        cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _render_node(payload: Dict) -> File:
+    url = getattr(settings, "FEEDBACK_PDF_SERVICE_URL", SERVICE_URL)
+    response = requests.post(url, json=payload, stream=True, timeout=SERVICE_TIMEOUT)
+    if response.status_code != 200:
+        message = response.content.decode("utf-8", "replace")[:500]
+        raise PDFRenderError(f"Failed to generate PDF: {message}")
+    response.raw.decode_content = True
+    # the storage reads the response body as it arrives
+    return File(response.raw)
+
+
+def _render_python(payload: Dict) -> File:
+    # optional dependency, only needed with FEEDBACK_PDF_RENDERER = "python"
+    try:
+        from weasyprint import HTML
+    except ImportError as e:
+        raise ImproperlyConfigured(
+            'FEEDBACK_PDF_RENDERER = "python" needs WeasyPrint and its Pango '
+            "libraries, see https://doc.courtbouillon.org/weasyprint/stable/"
+            "first_steps.html"
+        ) from e
+
+    html = render_to_string(PDF_TEMPLATE, {"feedback": payload})
+    buffer = io.BytesIO()
+    HTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf(target=buffer)
+    buffer.seek(0)
+    return File(buffer)
+
+
+RENDERERS = {"node": _render_node, "python": _render_python}
+
+
+def _file_name(feedback) -> str:
+    candidate = feedback.interview.candidate
+    designation = candidate.designation.get_name_display()
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    return f"{candidate.name}_{designation}_Feedback_Round 1_{stamp}.pdf"
+
+
+def render_feedback_pdf(feedback, force: bool = False) -> bool:
+    """
+    renders and stores the report of feedback unless the stored one is of
+    the same content; returns whether it rendered.
+    """
+    from dashboard.models import InterviewFeedback
+
+    renderer = get_renderer()
+    payload = report_payload(feedback)
+    digest = content_hash(feedback, payload, renderer)
+    if not force and feedback.pdf_file and feedback.pdf_hash == digest:
+        return False
+
+    content = RENDERERS[renderer](payload)
+    previous = feedback.pdf_file.name
+    try:
+        feedback.pdf_file.save(_file_name(feedback), content, save=False)
+    finally:
+        content.close()
+    # a plain update, saving the model would also rewrite the interview status
+    InterviewFeedback.objects.filter(pk=feedback.pk).update(
+        pdf_file=feedback.pdf_file.name, pdf_hash=digest
+    )
+    feedback.pdf_hash = digest
+    if previous and previous != feedback.pdf_file.name:
+        feedback.pdf_file.storage.delete(previous)
+    return True
+
+
+def _feedback_queryset():
+    from dashboard.models import InterviewFeedback
+
+    return InterviewFeedback.objects.select_related(
+        "interview",
+        "interview__candidate",
+        "interview__candidate__designation",
+        "interview__interviewer",
+    )
+
+
+def render_for_interview(interview_id: int, force: bool = False) -> Optional[bool]:
+    """render_feedback_pdf for the interview's feedback; None without feedback."""
+    feedback = _feedback_queryset().filter(interview_id=interview_id).first()
+    if feedback is None:
+        return None
+    return render_feedback_pdf(feedback, force=force)
+
+
+def _render_one(feedback_id: int, force: bool) -> str:
+    try:
+        feedback = _feedback_queryset().get(pk=feedback_id)
+        rendered = render_feedback_pdf(feedback, force=force)
+        return "rendered" if rendered else "unchanged"
+    except Exception as e:
+        logger.warning("Rendering the report of feedback %s failed: %s", feedback_id, e)
+        return "failed"
+    finally:
+        # every pool thread has a database connection of its own
+        connection.close()
+
+
+def rerender_all(
+    feedback_ids: Optional[Iterable[int]] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    renders every submitted report whose content or template changed, or
+    only those of feedback_ids; returns how many ended rendered, unchanged
+    and failed.
+    """
+    if feedback_ids is None:
+        feedback_ids = (
+            _feedback_queryset()
+            .filter(is_submitted=True)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+    feedback_ids = list(feedback_ids)
+    counts = {"rendered": 0, "unchanged": 0, "failed": 0}
+    if not feedback_ids:
+        return counts
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency, len(feedback_ids))
+    ) as executor:
+        for outcome in executor.map(lambda pk: _render_one(pk, force), feedback_ids):
+            counts[outcome] += 1
+    return counts
@@ -0,0 +1,192 @@
+"""
+Feedback generation for interviews with a transcript but no feedback yet,
+or only generated feedback that lacks sections (is_complete is False).
+pending_interview_ids lists them and the beat task hands them out in
+batches. generate_feedback handles one batch:
+- the interviews, with everything the notification emails need, are loaded
+  in one query
+- transcripts are read and analyzed on FEEDBACK_CONCURRENCY threads, each
+  Gemini call taking from the shared gemini_rate_limiter
+- the results go out as one bulk_create/bulk_update, in the same
+  transaction as their emails
+A cache lock per interview keeps overlapping runs from paying for the same
+transcript twice.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from .interview_feedback import analyze_transcription_and_generate_feedback
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10
+CONCURRENCY = 4
+LOCK_KEY = "feedback:generating:{}"
+# longer than a batch can take, a crashed worker's lock still expires
+LOCK_TIMEOUT = 30 * 60
+FEEDBACK_FIELDS = (
+    "skill_based_performance",
+    "skill_evaluation",
+    "strength",
+    "improvement_points",
+)
+
+
+def get_concurrency() -> int:
+    return max(1, getattr(settings, "FEEDBACK_CONCURRENCY", CONCURRENCY))
+
+
+def _needs_feedback() -> Q:
+    """no feedback, or generated feedback the interviewer has not submitted that
+    lacks sections."""
+    return Q(interview_feedback__isnull=True) | Q(
+        interview_feedback__is_complete=False,
+        interview_feedback__is_submitted=False,
+    )
+
+
+def pending_interview_ids() -> List[int]:
+    from dashboard.models import Interview
+
+    return list(
+        Interview.objects.filter(_needs_feedback(), transcription__isnull=False)
+        .exclude(transcription="")
+        .order_by("scheduled_time", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def batches(ids: List[int], size: int = BATCH_SIZE) -> Iterable[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def _lock(interview_ids: Iterable[int]) -> List[int]:
+    return [
+        pk
+        for pk in interview_ids
+        if cache.add(LOCK_KEY.format(pk), 1, timeout=LOCK_TIMEOUT)
+    ]
+
+
+def _analyze(interview) -> Optional[Dict]:
+    try:
+        with interview.transcription.open("r") as f:
+            content = f.read()
+        data = analyze_transcription_and_generate_feedback(content)
+    except Exception as e:
+        logger.warning("Feedback of interview %s failed: %s", interview.id, e)
+        return None
+    if not isinstance(data, dict):
+        return None
+    result = {field: data[field] for field in FEEDBACK_FIELDS if field in data}
+    # partial feedback is stored, and generated again on a later run
+    result["is_complete"] = not data.get("missing")
+    return result
+
+
+def notification_contexts(interview) -> List[Dict]:
+    from dashboard.tasks import INTERVIEW_EMAIL
+
+    interviewer_name = interview.interviewer.name
+    candidate = interview.candidate
+    candidate_name = candidate.name
+    assigned_to = candidate.organization.internal_client.assigned_to
+    return [
+        {
+            "interviewer_name": interviewer_name,
+            "candidate_name": candidate_name,
+            "dashboard_link": f"https://{settings.SITE_DOMAIN}/",
+            "type": "feedback_notification",
+            "email": interview.interviewer.email,
+            "from_email": INTERVIEW_EMAIL,
+            "subject": f"Ready to Review? Feedback for {candidate_name} is Live",
+            "template": "interview_feedback_notification_email.html",
+        },
+        {
+            "internal_user_name": assigned_to.name,
+            "organization_name": candidate.organization.name,
+            "position": candidate.designation.get_name_display(),
+            "interviewer_name": interviewer_name,
+            "interview_date": interview.scheduled_time.strftime("%d/%m/%Y %H:%M"),
+            "candidate_name": candidate_name,
+            "email": assigned_to.user.email,
+            "from_email": INTERVIEW_EMAIL,
+            "subject": f"Feedback Report Generated: Insights from {interviewer_name}'s Interview with {candidate_name}",
+            "template": "internal_interview_feedback_report_generated_conformation.html",
+        },
+    ]
+
+
+def generate_feedback(interview_ids: List[int]) -> List[int]:
+    """generates and stores the feedback of a batch; returns the stored ids."""
+    from dashboard.models import Interview, InterviewFeedback
+    from externals.mail.outbox import queue_emails
+
+    locked = _lock(interview_ids)
+    if not locked:
+        return []
+    try:
+        interviews = list(
+            Interview.objects.filter(_needs_feedback(), pk__in=locked)
+            .select_related(
+                "interviewer",
+                "candidate__designation",
+                "candidate__organization__internal_client__assigned_to__user",
+            )
+            .order_by("id")
+        )
+        if not interviews:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(get_concurrency(), len(interviews))
+        ) as executor:
+            results = list(executor.map(_analyze, interviews))
+        analyzed = [
+            (interview, data) for interview, data in zip(interviews, results) if data
+        ]
+        if not analyzed:
+            return []
+
+        with transaction.atomic():
+            # feedback entered meanwhile is overwritten, as update_or_create did,
+            # unless the interviewer submitted it
+            existing = {
+                feedback.interview_id: feedback
+                for feedback in InterviewFeedback.objects.select_for_update().filter(
+                    interview_id__in=[interview.id for interview, _ in analyzed]
+                )
+            }
+            created, updated, contexts = [], [], []
+            for interview, data in analyzed:
+                feedback = existing.get(interview.id)
+                if feedback is None:
+                    created.append(InterviewFeedback(interview=interview, **data))
+                    try:
+                        contexts.extend(notification_contexts(interview))
+                    except Exception as e:
+                        # a missing recipient must not cost the generated feedback
+                        logger.warning(
+                            "No notification for interview %s: %s", interview.id, e
+                        )
+                    continue
+                if feedback.is_submitted:
+                    continue
+                for field, value in data.items():
+                    setattr(feedback, field, value)
+                updated.append(feedback)
+            InterviewFeedback.objects.bulk_create(created)
+            if updated:
+                InterviewFeedback.objects.bulk_update(
+                    updated, [*FEEDBACK_FIELDS, "is_complete"]
+                )
+            if contexts:
+                queue_emails(contexts, "", "")
+        return [feedback.interview_id for feedback in [*created, *updated]]
+    finally:
+        cache.delete_many([LOCK_KEY.format(pk) for pk in locked])
@@ -0,0 +1,187 @@
+"""
+Splitting long transcripts for analysis and merging the results back.
+segment_transcript cuts a transcript at its timestamp lines, or at speaker
+turns where there are none, and packs the pieces into segments of at most
+max_chars. A turn longer than that is cut at whitespace. merge_analyses
+folds the per-segment analyses, in segment order, into one result of the
+usual shape:
+- skills are matched case-insensitively and their questions ordered by
+  start time
+- summaries, strengths and improvement points are joined within their
+  limits, every segment keeping a share that is cut at a sentence end
+- the Communication and Attitude ratings are averaged on the
+  poor..excellent scale
+The same analyses always merge to the same result.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+MAX_SEGMENT_CHARS = 40000
+SUMMARY_LIMIT = 900
+OVERALL_LIMIT = 400
+RATINGS = ["poor", "average", "good", "excellent"]
+
+# Meet writes a bare "00:05:12" line every few minutes
+TIMESTAMP_LINE = re.compile(r"^\s*(\d{1,2}:)?\d{1,2}:\d{2}\s*$")
+SPEAKER_LINE = re.compile(r"^\s*[^:\n]{1,60}:\s")
+SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
+def _blocks(transcript: str) -> List[str]:
+    lines = transcript.splitlines(keepends=True)
+    boundary = TIMESTAMP_LINE
+    if not any(boundary.match(line) for line in lines):
+        boundary = SPEAKER_LINE
+    blocks, current = [], []
+    for line in lines:
+        if boundary.match(line) and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def _split_long(block: str, max_chars: int) -> List[str]:
+    pieces = []
+    while len(block) > max_chars:
+        cut = block.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(block[:cut])
+        block = block[cut:]
+    pieces.append(block)
+    return pieces
+
+
+def segment_transcript(
+    transcript: str, max_chars: int = MAX_SEGMENT_CHARS
+) -> List[str]:
+    """the transcript in consecutive segments of at most max_chars each."""
+    segments, current, size = [], [], 0
+    for block in _blocks(transcript):
+        for piece in _split_long(block, max_chars):
+            if current and size + len(piece) > max_chars:
+                segments.append("".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+    if current:
+        segments.append("".join(current))
+    return segments or [transcript]
+
+
+def _seconds(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def _shorten(text: str, limit: int) -> str:
+    """text cut to limit characters at its last sentence end, else at a space."""
+    if len(text) <= limit:
+        return text
+    ends = [
+        match.end()
+        for match in SENTENCE_END.finditer(text)
+        if match.end() <= limit
+    ]
+    if ends:
+        return text[: ends[-1]]
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut].rstrip() if cut > 0 else text[:limit]
+
+
+def _join(texts: List[Optional[str]], limit: int) -> str:
+    """
+    the distinct texts joined in at most limit characters. Each text gets an
+    equal share, what the shorter ones leave over goes to the longer ones.
+    """
+    unique = []
+    for text in texts:
+        text = (text or "").strip()
+        if text and text not in unique:
+            unique.append(text)
+    budget = limit - max(len(unique) - 1, 0)
+    shares = {}
+    remaining = sorted(range(len(unique)), key=lambda index: len(unique[index]))
+    while remaining:
+        share = max(budget, 0) // len(remaining)
+        if len(unique[remaining[0]]) > share:
+            shares.update(dict.fromkeys(remaining, share))
+            break
+        index = remaining.pop(0)
+        shares[index] = len(unique[index])
+        budget -= shares[index]
+    parts = [_shorten(text, shares[index]) for index, text in enumerate(unique)]
+    return " ".join(part for part in parts if part)[:limit]
+
+
+def _rating(values: List[Optional[str]]) -> Optional[str]:
+    scores = [
+        RATINGS.index(value.strip().lower())
+        for value in values
+        if isinstance(value, str) and value.strip().lower() in RATINGS
+    ]
+    if not scores:
+        return None
+    # half way between two ratings rounds up
+    return RATINGS[int(sum(scores) / len(scores) + 0.5)]
+
+
+def merge_analyses(analyses: List[Dict]) -> Dict:
+    """one analysis out of the analyses of consecutive segments."""
+    if len(analyses) == 1:
+        return analyses[0]
+
+    skills: Dict[str, Dict] = {}
+    names: Dict[str, str] = {}
+    summaries: Dict[str, List[str]] = {}
+    for analysis in analyses:
+        performances = analysis.get("skill_based_performance") or {}
+        for name, performance in performances.items():
+            if not isinstance(performance, dict):
+                continue
+            # the first spelling of a skill names it
+            name = names.setdefault(name.strip().lower(), name.strip())
+            skill = skills.setdefault(name, {"summary": "", "questions": []})
+            summaries.setdefault(name, []).append(performance.get("summary"))
+            skill["questions"].extend(
+                question
+                for question in performance.get("questions") or []
+                if isinstance(question, dict)
+            )
+
+    for name, skill in skills.items():
+        skill["summary"] = _join(summaries[name], SUMMARY_LIMIT)
+        # questions without a usable time go last, in the order they came
+        skill["questions"] = sorted(
+            skill["questions"],
+            key=lambda question: _seconds(question.get("start_time")),
+        )
+
+    evaluation = {}
+    for trait in ("Communication", "Attitude"):
+        rating = _rating(
+            [
+                (analysis.get("skill_evaluation") or {}).get(trait)
+                for analysis in analyses
+            ]
+        )
+        if rating:
+            evaluation[trait] = rating
+
+    return {
+        "skill_based_performance": skills,
+        "skill_evaluation": evaluation,
+        "strength": _join(
+            [analysis.get("strength") for analysis in analyses], OVERALL_LIMIT
+        ),
+        "improvement_points": _join(
+            [analysis.get("improvement_points") for analysis in analyses],
+            OVERALL_LIMIT,
+        ),
+    }
@@ -0,0 +1,261 @@
+"""
+Incremental parsing of the feedback JSON as Gemini streams it. The parser
+scans the text as it arrives. Every skill block of skill_based_performance
+and every other top-level field is validated against the InterviewFeedback
+schema as soon as its JSON value closes, so a response cut short or spoiled
+by a stray character still yields everything complete before that point.
+Code fences and text around the object are ignored.
+
+stream_feedback runs a prompt through that parser. When sections are
+missing it asks the model again for only those sections, naming the skills
+it already has, and merges the answer in. That costs far fewer tokens than
+a full rerun.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FIELDS = (
+    "skill_based_performance",
+    "skill_evaluation",
+    "strength",
+    "improvement_points",
+)
+RATINGS = ("poor", "average", "good", "excellent")
+TRAITS = ("Communication", "Attitude")
+MAX_FOLLOW_UPS = 2
+
+
+def _max_length(field: str) -> Optional[int]:
+    from dashboard.models import InterviewFeedback
+
+    return InterviewFeedback._meta.get_field(field).max_length
+
+
+def validate_skill(block: Any) -> Optional[Dict]:
+    """the skill block with its well-formed questions, None when unusable."""
+    if not isinstance(block, dict) or not isinstance(block.get("summary"), str):
+        return None
+    questions = block.get("questions")
+    if not isinstance(questions, list):
+        return None
+    return {
+        **block,
+        "questions": [
+            question
+            for question in questions
+            if isinstance(question, dict)
+            and isinstance(question.get("que"), str)
+            and isinstance(question.get("ans"), str)
+        ],
+    }
+
+
+def validate_field(field: str, value: Any) -> Tuple[bool, Any]:
+    """(valid, cleaned value) of a top-level field other than the skills."""
+    if field == "skill_evaluation":
+        if not isinstance(value, dict):
+            return False, None
+        ratings = {}
+        for trait in TRAITS:
+            rating = value.get(trait)
+            if not isinstance(rating, str) or rating.strip().lower() not in RATINGS:
+                return False, None
+            ratings[trait] = rating.strip().lower()
+        return True, ratings
+    if field in ("strength", "improvement_points"):
+        if value is None:
+            return True, None
+        if not isinstance(value, str):
+            return False, None
+        return True, value[: _max_length(field)]
+    return False, None
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect", "value_start")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.key = None
+        # "key", "colon" or "value"
+        self.expect = "key" if kind == "{" else "value"
+        self.value_start = None
+
+
+class FeedbackStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self.skills: Dict[str, Dict] = {}
+        self.fields: Dict[str, Any] = {}
+        # skill_based_performance closed, every skill in it was seen
+        self.skills_closed = False
+        self.closed = False
+        self.invalid: List[str] = []
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._string_start = None
+        self._escaped = False
+        self._literal_start = None
+
+    def feed(self, text: str) -> None:
+        self.buffer += text
+        while self._pos < len(self.buffer) and not self.closed:
+            self._step(self._pos, self.buffer[self._pos])
+            self._pos += 1
+
+    def _step(self, i: int, c: str) -> None:
+        if self._string_start is not None:
+            if self._escaped:
+                self._escaped = False
+            elif c == "\\":
+                self._escaped = True
+            elif c == '"':
+                start, self._string_start = self._string_start, None
+                frame = self._stack[-1]
+                if frame.kind == "{" and frame.expect == "key":
+                    try:
+                        frame.key = json.loads(self.buffer[start : i + 1])
+                    except ValueError:
+                        frame.key = None
+                    frame.expect = "colon"
+                else:
+                    self._value_done(start, i + 1)
+            return
+        if self._literal_start is not None and c in ",}] \t\r\n":
+            start, self._literal_start = self._literal_start, None
+            self._value_done(start, i)
+        if not self._stack:
+            # text before the object, such as a code fence
+            if c == "{":
+                self._stack.append(_Frame("{"))
+            return
+        frame = self._stack[-1]
+        if c == '"':
+            self._string_start = i
+        elif c in "{[":
+            frame.value_start = i
+            self._stack.append(_Frame(c))
+        elif c in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self.closed = True
+                return
+            self._value_done(self._stack[-1].value_start, i + 1)
+        elif c == ":":
+            frame.expect = "value"
+        elif c == ",":
+            frame.expect = "key" if frame.kind == "{" else "value"
+        elif not c.isspace() and self._literal_start is None:
+            self._literal_start = i
+
+    def _value_done(self, start: int, end: int) -> None:
+        depth = len(self._stack)
+        root = self._stack[0]
+        try:
+            value = json.loads(self.buffer[start:end])
+        except ValueError:
+            self.invalid.append(self.buffer[start:end][:80])
+            return
+        if depth == 1:
+            self._field(root.key, value)
+        elif (
+            depth == 2
+            and root.key == "skill_based_performance"
+            and self._stack[1].kind == "{"
+        ):
+            skill = validate_skill(value)
+            if skill is not None:
+                self.skills[self._stack[1].key] = skill
+
+    def _field(self, field: str, value: Any) -> None:
+        if field == "skill_based_performance":
+            if isinstance(value, dict):
+                # the blocks were collected as they closed
+                self.skills_closed = True
+            return
+        if field not in FIELDS:
+            return
+        valid, value = validate_field(field, value)
+        if valid:
+            self.fields[field] = value
+
+    def missing(self) -> List[str]:
+        missing = [field for field in FIELDS[1:] if field not in self.fields]
+        if not self.skills_closed:
+            missing.insert(0, "skill_based_performance")
+        return missing
+
+    def result(self) -> Dict:
+        return {"skill_based_performance": dict(self.skills), **self.fields}
+
+
+def follow_up_prompt(prompt: str, parser: FeedbackStreamParser) -> str:
+    missing = parser.missing()
+    skills = ", ".join(json.dumps(name) for name in parser.skills) or "none"
+    return (
+        f"{prompt}\n\n"
+        "An earlier answer to this request was cut off. Return ONLY a JSON "
+        f"object with the keys {', '.join(missing)}, in the structure given above. "
+        "In skill_based_performance leave out these skills, which are already "
+        f"done: {skills}."
+    )
+
+
+def stream_feedback(
+    generate: Callable[[str], Any],
+    prompt: str,
+    max_follow_ups: int = MAX_FOLLOW_UPS,
+) -> Tuple[Optional[Dict], int, List[str]]:
+    """
+    (feedback, tokens used, sections still missing) for the prompt.
+    generate(prompt) returns a streamed Gemini response. Feedback is None
+    when no skill and no field could be salvaged.
+    """
+    salvaged = FeedbackStreamParser()
+    tokens = 0
+    current = prompt
+    for attempt in range(max_follow_ups + 1):
+        parser = FeedbackStreamParser()
+        try:
+            response = generate(current)
+        except Exception as e:
+            if attempt == 0:
+                raise
+            # a failed follow-up leaves what was salvaged so far
+            logger.warning("Feedback follow-up failed: %s", e)
+            break
+        try:
+            for chunk in response:
+                parser.feed(chunk.text)
+        except Exception as e:
+            # whatever closed before the failure is kept
+            logger.warning("Feedback stream broke off: %s", e)
+        usage = getattr(response, "usage_metadata", None)
+        tokens += getattr(usage, "total_token_count", 0) or 0
+
+        for name, skill in parser.skills.items():
+            salvaged.skills.setdefault(name, skill)
+        for field, value in parser.fields.items():
+            salvaged.fields.setdefault(field, value)
+        salvaged.skills_closed = salvaged.skills_closed or parser.skills_closed
+        if parser.invalid:
+            logger.warning("Dropped unparsable feedback values: %s", parser.invalid)
+        if not salvaged.missing():
+            break
+        logger.info(
+            "Feedback is missing %s, asking again (%s)",
+            salvaged.missing(),
+            attempt + 1,
+        )
+        current = follow_up_prompt(prompt, salvaged)
+
+    missing = salvaged.missing()
+    if not salvaged.skills and not salvaged.fields:
+        return None, tokens, missing
+    if missing:
+        logger.warning("Feedback stays incomplete: %s", missing)
+    return salvaged.result(), tokens, missing
@@ -0,0 +1,200 @@
+"""
+Incremental import of the interviewers' busy time from Google Calendar. The
+first sync lists the events of the scheduling horizon, later ones only the
+changes since the stored sync token. Busy time is kept per event in
+CalendarBusyInterval, which the availability index subtracts from the free
+slots of every date it touches. Changes beyond the horizon are kept too,
+and every FULL_SYNC_INTERVAL the horizon is listed again, so events the
+horizon rolled over are never missed.
+"""
+
+import datetime
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+from django.db import transaction
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+from externals.scheduling.availability_index import availability_index
+from externals.scheduling.capacity import schedule_capacity_refresh
+from externals.scheduling.recurrence import get_horizon_days
+from .google_calendar import GoogleCalendar
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+
+FULL_SYNC_INTERVAL = datetime.timedelta(days=1)
+
+
+def _event_time(value: Dict[str, str]) -> datetime.datetime:
+    if "dateTime" in value:
+        moment = datetime.datetime.fromisoformat(value["dateTime"])
+        return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+    # all-day events are busy for the whole local day
+    return timezone.make_aware(
+        datetime.datetime.combine(
+            datetime.date.fromisoformat(value["date"]), datetime.time.min
+        )
+    )
+
+
+def busy_interval(event: Dict, ignored_event_ids: Set[str]) -> Optional[Interval]:
+    """
+    the busy time of an event, None for cancelled and free ("transparent")
+    events and for the availability events the platform created itself.
+    """
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return None
+    if ignored_event_ids & {event.get("id"), event.get("recurringEventId")}:
+        return None
+    try:
+        start, end = _event_time(event["start"]), _event_time(event["end"])
+    except (KeyError, ValueError):
+        return None
+    return (start, end) if start < end else None
+
+
+def _local_dates(intervals: Iterable[Interval], last: datetime.date):
+    dates = set()
+    for start, end in intervals:
+        day = timezone.localtime(start).date()
+        end_day = min(
+            timezone.localtime(end - datetime.timedelta(microseconds=1)).date(), last
+        )
+        while day <= end_day:
+            dates.add(day)
+            day += datetime.timedelta(days=1)
+    return dates
+
+
+def _invalidate_dates(dates: Iterable[datetime.date]) -> None:
+    for date in dates:
+        availability_index.invalidate(date)
+
+
+def sync_calendar(interviewer, calendar: Optional[GoogleCalendar] = None) -> int:
+    """
+    pulls the changes of the interviewer's calendar and applies them to the
+    stored busy intervals; returns how many intervals changed. Interviewers
+    without a connected calendar are skipped.
+    """
+    from core.models import OAuthToken
+    from dashboard.models import (
+        CalendarBusyInterval,
+        CalendarSyncState,
+        InterviewerAvailability,
+    )
+
+    oauth = OAuthToken.objects.filter(user_id=interviewer.user_id).first()
+    if not oauth:
+        return 0
+    calendar = calendar or GoogleCalendar()
+    state, _ = CalendarSyncState.objects.get_or_create(interviewer=interviewer)
+
+    now = timezone.now()
+    horizon_end = now + datetime.timedelta(days=get_horizon_days())
+
+    def full_sync():
+        return calendar.list_event_changes(
+            oauth.access_token,
+            oauth.refresh_token,
+            oauth.user,
+            time_min=now,
+            time_max=horizon_end,
+        )
+
+    full = (
+        not state.sync_token
+        or state.full_synced_at is None
+        or state.full_synced_at <= now - FULL_SYNC_INTERVAL
+    )
+    try:
+        if full:
+            events, sync_token = full_sync()
+        else:
+            events, sync_token = calendar.list_event_changes(
+                oauth.access_token,
+                oauth.refresh_token,
+                oauth.user,
+                sync_token=state.sync_token,
+            )
+    except HttpError as e:
+        # 410 Gone: the token expired and the calendar has to be listed again
+        if e.resp.status != 410:
+            raise
+        logger.info("Sync token of interviewer %s expired", interviewer.pk)
+        full = True
+        events, sync_token = full_sync()
+
+    ignored_event_ids = set(
+        InterviewerAvailability.objects.filter(interviewer=interviewer)
+        .exclude(google_calendar_id="")
+        .values_list("google_calendar_id", flat=True)
+    )
+    incoming: Dict[str, Optional[Interval]] = {}
+    for event in events:
+        interval = busy_interval(event, ignored_event_ids)
+        if interval and interval[1] <= now:
+            interval = None
+        incoming[event["id"]] = interval
+
+    with transaction.atomic():
+        existing = {
+            row.event_id: row
+            for row in CalendarBusyInterval.objects.select_for_update().filter(
+                interviewer=interviewer
+            )
+        }
+        removed = {
+            event_id
+            for event_id, row in existing.items()
+            if (event_id in incoming and incoming[event_id] is None)
+            # a full sync lists the horizon only, later events stay
+            or (full and event_id not in incoming and row.start < horizon_end)
+            or row.end <= now
+        }
+        touched = [
+            (existing[event_id].start, existing[event_id].end) for event_id in removed
+        ]
+        CalendarBusyInterval.objects.filter(
+            interviewer=interviewer, event_id__in=removed
+        ).delete()
+
+        created, updated = [], []
+        for event_id, interval in incoming.items():
+            if interval is None:
+                continue
+            row = existing.get(event_id) if event_id not in removed else None
+            if row is None:
+                created.append(
+                    CalendarBusyInterval(
+                        interviewer=interviewer,
+                        event_id=event_id,
+                        start=interval[0],
+                        end=interval[1],
+                    )
+                )
+            elif (row.start, row.end) != interval:
+                touched.append((row.start, row.end))
+                row.start, row.end = interval
+                row.updated_at = now
+                updated.append(row)
+            else:
+                continue
+            touched.append(interval)
+        CalendarBusyInterval.objects.bulk_create(created)
+        CalendarBusyInterval.objects.bulk_update(
+            updated, ["start", "end", "updated_at"]
+        )
+
+        state.sync_token = sync_token or ""
+        state.last_synced_at = now
+        if full:
+            state.full_synced_at = now
+        state.last_error = ""
+        state.save()
+
+        dates = _local_dates(touched, timezone.localtime(horizon_end).date())
+        transaction.on_commit(lambda: _invalidate_dates(dates))
+        schedule_capacity_refresh(dates)
+    return len(removed) + len(created) + len(updated)
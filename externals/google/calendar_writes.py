@@ -0,0 +1,241 @@
+"""
+Queue of Google Calendar event writes. Callers store a CalendarWriteOperation
+and return; a Celery worker claims the pending operations, groups them by
+calendar owner and sends each group as Google batch requests of up to
+BATCH_SIZE calls. A failed call is retried with exponential backoff, up to
+MAX_ATTEMPTS times. Every result is mapped back through the operation's
+availability or interview: inserted event ids land in
+InterviewerAvailability.google_calendar_id and
+Interview.scheduled_service_account_event_id (with the Meet link).
+"""
+
+import datetime
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Google accepts up to 1000 calls per batch but recommends at most 50
+BATCH_SIZE = 50
+CLAIM_LIMIT = 500
+MAX_ATTEMPTS = 5
+# writes queued within this delay share the same batches
+BATCH_DELAY = 5
+# operations left processing this long by a dead worker are claimed again
+STALE_AFTER = datetime.timedelta(minutes=10)
+# a failed write waits this long before its first retry, doubling after that
+RETRY_DELAY = datetime.timedelta(minutes=1)
+
+
+def queue_calendar_write(
+    action: str,
+    user=None,
+    body: Optional[Dict[str, Any]] = None,
+    event_id: str = "",
+    params: Optional[Dict[str, Any]] = None,
+    availability=None,
+    interview=None,
+    contexts: Optional[List[Dict[str, Any]]] = None,
+):
+    """
+    stores an event write for the batch processor, which is started once the
+    surrounding transaction commits. user None writes to the service
+    account's calendar.
+    """
+    from dashboard.models import CalendarWriteOperation
+    from dashboard.tasks import process_calendar_writes
+
+    operation = CalendarWriteOperation.objects.create(
+        action=action,
+        user=user,
+        body=body or {},
+        event_id=event_id,
+        params=params or {},
+        availability=availability,
+        interview=interview,
+        contexts=contexts or [],
+    )
+    transaction.on_commit(
+        lambda: process_calendar_writes.apply_async(countdown=BATCH_DELAY)
+    )
+    return operation
+
+
+@contextmanager
+def calendar_service(user) -> Iterator[Any]:
+    """the pooled Calendar service writing to user's calendar."""
+    if user is None:
+        from .google_meet import service_account_service
+
+        with service_account_service("calendar", "v3") as service:
+            yield service
+        return
+
+    from core.models import OAuthToken
+    from .google_calendar import GoogleCalendar
+
+    oauth = OAuthToken.objects.get(user=user)
+    with GoogleCalendar()._service(
+        oauth.access_token,
+        oauth.refresh_token,
+        settings.GOOGLE_CLIENT_ID,
+        settings.GOOGLE_CLIENT_SECRET,
+        user,
+    ) as service:
+        yield service
+
+
+def _claim(limit: int) -> list:
+    from dashboard.models import CalendarWriteOperation
+
+    now = timezone.now()
+    with transaction.atomic():
+        operations = list(
+            CalendarWriteOperation.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="PENDING", retry_after__isnull=True)
+                | Q(status="PENDING", retry_after__lte=now)
+                | Q(status="PROCESSING", updated_at__lt=now - STALE_AFTER)
+            )
+            .select_related("user")
+            .order_by("created_at", "id")[:limit]
+        )
+        CalendarWriteOperation.objects.filter(
+            pk__in=[operation.pk for operation in operations]
+        ).update(status="PROCESSING", updated_at=now)
+    return operations
+
+
+def _request(events, operation):
+    if operation.action == "INSERT":
+        return events.insert(
+            calendarId="primary", body=operation.body, **operation.params
+        )
+    if operation.action == "UPDATE":
+        return events.patch(
+            calendarId="primary",
+            eventId=operation.event_id,
+            body=operation.body,
+            **operation.params,
+        )
+    return events.delete(
+        calendarId="primary", eventId=operation.event_id, **operation.params
+    )
+
+
+def _send(operations: list, service_factory) -> Dict[str, tuple]:
+    """sends the operations of one calendar as batches; request id -> (response, error)"""
+    results = {}
+
+    def callback(request_id, response, exception):
+        results[request_id] = (response, exception)
+
+    try:
+        with service_factory(operations[0].user) as service:
+            for start in range(0, len(operations), BATCH_SIZE):
+                batch = service.new_batch_http_request(callback=callback)
+                for operation in operations[start : start + BATCH_SIZE]:
+                    batch.add(
+                        _request(service.events(), operation),
+                        request_id=str(operation.pk),
+                    )
+                batch.execute()
+    except Exception as e:
+        logger.warning("Calendar batch of user %s failed: %s", operations[0].user_id, e)
+        for operation in operations:
+            results.setdefault(str(operation.pk), (None, e))
+    return results
+
+
+def process_pending_writes(
+    limit: int = CLAIM_LIMIT, service_factory=calendar_service
+) -> list:
+    """
+    sends the pending writes and records their results; returns the claimed
+    operations with their new status, DONE, PENDING for a retry or FAILED.
+    service_factory(user) yields the Calendar
+    service of a calendar, e.g. a FakeCalendarService in tests.
+    """
+    from dashboard.models import (
+        CalendarWriteOperation,
+        Interview,
+        InterviewerAvailability,
+    )
+
+    operations = _claim(limit)
+    by_user = defaultdict(list)
+    for operation in operations:
+        by_user[operation.user_id].append(operation)
+
+    now = timezone.now()
+    availability_events, interview_events = {}, {}
+    for user_operations in by_user.values():
+        results = _send(user_operations, service_factory)
+        for operation in user_operations:
+            response, error = results.get(
+                str(operation.pk), (None, RuntimeError("No response in batch."))
+            )
+            operation.updated_at = now
+            gone = isinstance(error, HttpError) and error.resp.status in (404, 410)
+            if error is not None and not (operation.action == "DELETE" and gone):
+                operation.attempts += 1
+                operation.last_error = str(error)[:2000]
+                operation.status = (
+                    "FAILED" if operation.attempts >= MAX_ATTEMPTS else "PENDING"
+                )
+                # backing off keeps an outage or exhausted quota from
+                # being hit again every minute
+                operation.retry_after = now + RETRY_DELAY * 2 ** (
+                    operation.attempts - 1
+                )
+                continue
+
+            operation.status = "DONE"
+            operation.last_error = ""
+            operation.retry_after = None
+            if operation.action == "INSERT" and response:
+                operation.event_id = response.get("id", "")
+                if operation.availability_id:
+                    availability_events[operation.availability_id] = operation.event_id
+                if operation.interview_id:
+                    interview_events[operation.interview_id] = (
+                        operation.event_id,
+                        response.get("hangoutLink"),
+                    )
+
+    with transaction.atomic():
+        CalendarWriteOperation.objects.bulk_update(
+            operations,
+            [
+                "status",
+                "attempts",
+                "last_error",
+                "retry_after",
+                "event_id",
+                "updated_at",
+            ],
+        )
+        availabilities = list(
+            InterviewerAvailability.objects.filter(pk__in=availability_events)
+        )
+        for availability in availabilities:
+            availability.google_calendar_id = availability_events[availability.pk]
+        InterviewerAvailability.objects.bulk_update(
+            availabilities, ["google_calendar_id"]
+        )
+        interviews = list(Interview.objects.filter(pk__in=interview_events))
+        for interview in interviews:
+            event_id, meeting_link = interview_events[interview.pk]
+            interview.scheduled_service_account_event_id = event_id
+            interview.meeting_link = meeting_link or interview.meeting_link
+        Interview.objects.bulk_update(
+            interviews, ["scheduled_service_account_event_id", "meeting_link"]
+        )
+    return operations
@@ -0,0 +1,214 @@
+"""
+Pool of Google API service clients. Building a client parses the discovery
+document and opens a new HTTP transport, so clients are built once per
+credential identity and reused: discovery documents are parsed once per
+process, and every pooled client keeps its own keep-alive httplib2
+connection. A client is checked out by one thread at a time because httplib2
+is not thread-safe.
+
+An access token refreshed by a pooled client is written back to OAuthToken
+by flush_refreshed_tokens() as soon as the client is checked in (after the
+current transaction commits), so a worker that exits loses no rotated token.
+Tokens whose write failed stay queued and go out with the next flush.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+import google_auth_httplib2
+import httplib2
+from django.db import transaction
+from django.utils import timezone
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = 60
+MAX_IDLE_PER_KEY = 4
+MAX_KEYS = 512
+IDLE_TIMEOUT = 15 * 60
+# tokens left queued by a failed write are retried once this many are
+# queued or this old
+FLUSH_BATCH = 50
+FLUSH_INTERVAL = 30
+
+
+def credential_key(*parts: Optional[str]) -> str:
+    """
+    stable identity of a credential that never holds the secret itself, e.g.
+    credential_key(client_id, refresh_token).
+    """
+    return hashlib.sha256("\0".join(part or "" for part in parts).encode()).hexdigest()
+
+
+class ServiceClientPool:
+    def __init__(
+        self,
+        max_idle_per_key: int = MAX_IDLE_PER_KEY,
+        max_keys: int = MAX_KEYS,
+        idle_timeout: float = IDLE_TIMEOUT,
+    ):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_keys = max_keys
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # key -> [(returned at, client, credentials)], least recently used key first
+        self._idle: "OrderedDict[Tuple, list]" = OrderedDict()
+        self._documents: Dict[Tuple[str, str], Optional[dict]] = {}
+        # user id -> (access token, expiry, refresh token)
+        self._refreshed: Dict[int, Tuple[str, Any, Optional[str]]] = {}
+        self._last_flush = time.monotonic()
+        self._stats = defaultdict(int)
+
+    def _document(self, api: str, version: str) -> Optional[dict]:
+        key = (api, version)
+        with self._lock:
+            if key in self._documents:
+                return self._documents[key]
+        document = discovery_cache.get_static_doc(api, version)
+        document = json.loads(document) if document else None
+        with self._lock:
+            self._documents[key] = document
+        return document
+
+    def _build(self, api: str, version: str, credentials) -> Any:
+        http = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT)
+        )
+        document = self._document(api, version)
+        if document is None:
+            return build(api, version, http=http, cache_discovery=False)
+        return build_from_document(document, http=http)
+
+    def _checkout(self, key: Tuple) -> Optional[Tuple[Any, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                returned_at, client, credentials = idle.pop()
+                if now - returned_at < self.idle_timeout:
+                    self._idle.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return client, credentials
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def _checkin(self, key: Tuple, client: Any, credentials) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self.max_idle_per_key:
+                idle.append((time.monotonic(), client, credentials))
+            else:
+                self._stats["discarded"] += 1
+            while len(self._idle) > self.max_keys:
+                _, evicted = self._idle.popitem(last=False)
+                self._stats["evicted"] += len(evicted)
+
+    @contextmanager
+    def service(
+        self,
+        api: str,
+        version: str,
+        key: str,
+        credentials_factory,
+        user_id: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        checks out a client of api/version for the credential identified by
+        key, building it with credentials_factory() on a miss. When user_id is
+        given, a token the client refreshed is queued for write-back.
+        """
+        pool_key = (api, version, key)
+        pooled = self._checkout(pool_key)
+        if pooled is None:
+            credentials = credentials_factory()
+            pooled = self._build(api, version, credentials), credentials
+            with self._lock:
+                self._stats["built"] += 1
+        client, credentials = pooled
+
+        token = credentials.token
+        try:
+            yield client
+        finally:
+            refreshed = user_id is not None and credentials.token != token
+            if refreshed:
+                self._queue_refreshed(user_id, credentials)
+            self._checkin(pool_key, client, credentials)
+            if refreshed or self._flush_due():
+                transaction.on_commit(self.flush_refreshed_tokens)
+
+    def _queue_refreshed(self, user_id: int, credentials) -> None:
+        expiry = credentials.expiry
+        if expiry is not None and timezone.is_naive(expiry):
+            expiry = timezone.make_aware(expiry, datetime.timezone.utc)
+        with self._lock:
+            self._refreshed[user_id] = (
+                credentials.token,
+                expiry,
+                credentials.refresh_token,
+            )
+            self._stats["refreshed"] += 1
+
+    def _flush_due(self) -> bool:
+        with self._lock:
+            return bool(self._refreshed) and (
+                len(self._refreshed) >= FLUSH_BATCH
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+
+    def flush_refreshed_tokens(self) -> int:
+        """writes the queued refreshed tokens back in one bulk update."""
+        from core.models import OAuthToken
+
+        with self._lock:
+            refreshed, self._refreshed = self._refreshed, {}
+            self._last_flush = time.monotonic()
+        if not refreshed:
+            return 0
+
+        tokens = list(OAuthToken.objects.filter(user_id__in=refreshed))
+        now = timezone.now()
+        for token in tokens:
+            access_token, expiry, refresh_token = refreshed[token.user_id]
+            token.access_token = access_token
+            token.expires_at = expiry or token.expires_at
+            token.refresh_token = refresh_token or token.refresh_token
+            token.updated_at = now
+        try:
+            OAuthToken.objects.bulk_update(
+                tokens, ["access_token", "expires_at", "refresh_token", "updated_at"]
+            )
+        except Exception:
+            logger.exception("Writing back %s refreshed tokens failed", len(tokens))
+            with self._lock:
+                # newer refreshes queued meanwhile win
+                for user_id, values in refreshed.items():
+                    self._refreshed.setdefault(user_id, values)
+            return 0
+        return len(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = sum(len(idle) for idle in self._idle.values())
+            stats["pending_tokens"] = len(self._refreshed)
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = round(stats.get("hits", 0) / lookups, 4) if lookups else 0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+
+service_client_pool = ServiceClientPool()
@@ -0,0 +1,180 @@
+"""
+Parallel ranged reads of Drive files. The file is split into parts of
+DRIVE_DOWNLOAD_PART_SIZE bytes which are fetched with HTTP Range requests,
+each retried on its own with backoff. drive_stream hands the parts on to
+storage as they arrive.
+
+A download that fails after its part retries is not resumed: the recording
+task retries it from the start. Resuming would mean writing the parts to the
+worker's disk (or listing the parts of the aborted S3 multipart upload), and
+recordings are no longer kept on disk at all; a rerun costs one more read of
+the file from Drive.
+
+Google Docs exports (the transcripts) have no size and cannot be ranged;
+those are exported in one request.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import requests
+from django.conf import settings
+from google.auth.transport.requests import Request
+
+logger = logging.getLogger(__name__)
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{file_id}"
+PART_SIZE = 16 * 1024 * 1024
+CONCURRENCY = 4
+PART_ATTEMPTS = 4
+RETRY_DELAY = 1
+READ_CHUNK = 1024 * 1024
+HTTP_TIMEOUT = (10, 60)
+
+Part = Tuple[int, int]
+
+
+class DownloadError(Exception):
+    pass
+
+
+def get_part_size() -> int:
+    return max(
+        256 * 1024, getattr(settings, "DRIVE_DOWNLOAD_PART_SIZE", PART_SIZE) or 0
+    )
+
+
+def get_concurrency() -> int:
+    return max(1, getattr(settings, "DRIVE_DOWNLOAD_CONCURRENCY", CONCURRENCY) or 0)
+
+
+def split_parts(size: int, part_size: int) -> List[Part]:
+    """inclusive (start, end) byte ranges covering size bytes."""
+    return [
+        (start, min(start + part_size, size) - 1)
+        for start in range(0, size, part_size)
+    ]
+
+
+class _Token:
+    """one access token shared by the download threads, refreshed on expiry."""
+
+    def __init__(self, credentials_factory: Callable):
+        self._credentials = credentials_factory()
+        self._lock = threading.Lock()
+
+    def header(self, force_refresh: bool = False) -> Dict[str, str]:
+        with self._lock:
+            if force_refresh or not self._credentials.valid:
+                self._credentials.refresh(Request())
+            return {"Authorization": f"Bearer {self._credentials.token}"}
+
+
+class RangedDownloader:
+    def __init__(
+        self,
+        credentials_factory: Callable,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.part_size = part_size or get_part_size()
+        self.concurrency = concurrency or get_concurrency()
+        self._token = _Token(credentials_factory)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests sessions are not shared between threads
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def metadata(self, file_id: str) -> Dict:
+        response = self._get(file_id, params={"fields": "id,size,md5Checksum,mimeType"})
+        return response.json()
+
+    def _get(self, file_id: str, params: Dict, headers=None, stream=False):
+        url = DRIVE_FILES_URL.format(file_id=file_id)
+        auth = self._token.header()
+        for refreshed in (False, True):
+            response = self._session().get(
+                url,
+                params=params,
+                headers={**auth, **(headers or {})},
+                stream=stream,
+                timeout=HTTP_TIMEOUT,
+            )
+            if response.status_code == 401 and not refreshed:
+                response.close()
+                auth = self._token.header(force_refresh=True)
+                continue
+            break
+        if response.status_code >= 400:
+            response.close()
+            raise DownloadError(
+                f"Drive returned {response.status_code} for file {file_id}"
+            )
+        return response
+
+    def fetch_part(self, file_id: str, part: Part) -> requests.Response:
+        """streaming response of one byte range of the file."""
+        start, end = part
+        response = self._get(
+            file_id,
+            params={"alt": "media"},
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+        )
+        if response.status_code != 206 and not (
+            start == 0 and response.status_code == 200
+        ):
+            response.close()
+            raise DownloadError(f"Drive ignored the range request for {file_id}")
+        return response
+
+    def _fetch_into(
+        self, file_id: str, part: Part, write: Callable[[bytes, int], None]
+    ) -> None:
+        """
+        fetches one part, retrying it, and hands every chunk with its file
+        offset to write.
+        """
+        start, end = part
+        for attempt in range(1, PART_ATTEMPTS + 1):
+            offset = start
+            try:
+                with self.fetch_part(file_id, part) as response:
+                    for chunk in response.iter_content(READ_CHUNK):
+                        if offset + len(chunk) > end + 1:
+                            raise DownloadError("Drive sent more than the range")
+                        write(chunk, offset)
+                        offset += len(chunk)
+                if offset != end + 1:
+                    raise DownloadError(
+                        f"Part {start}-{end} ended after {offset - start} bytes"
+                    )
+                return
+            except (requests.RequestException, DownloadError) as e:
+                if attempt == PART_ATTEMPTS:
+                    raise
+                logger.info(
+                    "Part %s-%s of %s failed (%s), attempt %s",
+                    start,
+                    end,
+                    file_id,
+                    e,
+                    attempt,
+                )
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+    def read_part(self, file_id: str, part: Part) -> bytes:
+        """one part of the file in memory."""
+        start, end = part
+        buffer = bytearray(end + 1 - start)
+
+        def write(chunk: bytes, offset: int) -> None:
+            buffer[offset - start : offset - start + len(chunk)] = chunk
+
+        self._fetch_into(file_id, part, write)
+        return bytes(buffer)
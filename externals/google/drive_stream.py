@@ -0,0 +1,181 @@
+"""
+Streams Drive files straight into a Django storage backend, so recordings
+never touch the worker's disk. RangedDownloader fetches the parts in
+parallel, and they are handed on in file order through a window of
+`concurrency` parts. Memory therefore stays at a few parts, however long the
+recording is.
+
+On S3 (django-storages' S3Storage) every part is sent as one part of an S3
+multipart upload while the following parts download. Any other storage gets
+the parts as one sequential, non-seekable file through storage.save. Either
+way the bytes are checked against Drive's md5Checksum, and a mismatching
+upload is aborted or deleted.
+"""
+
+import hashlib
+import io
+import itertools
+import mimetypes
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+from django.core.files import File
+from .drive_download import DownloadError, Part, RangedDownloader, split_parts
+
+# S3 rejects multipart parts below 5 MB, except for the last one
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def ordered_parts(
+    downloader: RangedDownloader, file_id: str, parts: Iterable[Part]
+) -> Iterator[bytes]:
+    """
+    the bytes of each part in file order, with at most downloader.concurrency
+    parts downloading ahead of the consumer.
+    """
+    parts = iter(parts)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=downloader.concurrency) as executor:
+        try:
+            for part in itertools.islice(parts, downloader.concurrency):
+                pending.append(executor.submit(downloader.read_part, file_id, part))
+            while pending:
+                data = pending.popleft().result()
+                part = next(parts, None)
+                if part is not None:
+                    pending.append(
+                        executor.submit(downloader.read_part, file_id, part)
+                    )
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class PartStream(io.RawIOBase):
+    """read-only, forward-only file over a sequence of byte strings."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = memoryview(b"")
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self.md5.update(chunk)
+            self.size += len(chunk)
+            self._buffer = memoryview(chunk)
+        count = min(len(b), len(self._buffer))
+        b[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+
+def _is_s3(storage) -> bool:
+    return hasattr(storage, "bucket") and hasattr(storage, "_normalize_name")
+
+
+def _check_md5(digest, expected: Optional[str], file_id: str) -> None:
+    if expected and digest.hexdigest() != expected:
+        raise DownloadError(f"Checksum mismatch for file {file_id}")
+
+
+def _upload_s3(
+    storage, name: str, downloader: RangedDownloader, file_id: str, meta: dict
+) -> None:
+    from storages.utils import clean_name
+
+    client = storage.bucket.meta.client
+    bucket = storage.bucket.name
+    key = storage._normalize_name(clean_name(name))
+    params = dict(storage.get_object_parameters(name))
+    params.setdefault(
+        "ContentType", mimetypes.guess_type(name)[0] or "application/octet-stream"
+    )
+    size = int(meta["size"])
+    parts = split_parts(size, max(downloader.part_size, S3_MIN_PART_SIZE))
+    if not parts:
+        client.put_object(Bucket=bucket, Key=key, Body=b"", **params)
+        return
+
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **params)[
+        "UploadId"
+    ]
+    # parts downloaded but not uploaded yet are bounded as well
+    slots = threading.BoundedSemaphore(downloader.concurrency)
+
+    def upload(number: int, data: bytes) -> dict:
+        try:
+            response = client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=data,
+            )
+            return {"PartNumber": number, "ETag": response["ETag"]}
+        finally:
+            slots.release()
+
+    try:
+        digest = hashlib.md5()
+        futures = []
+        with ThreadPoolExecutor(max_workers=downloader.concurrency) as executor:
+            for number, data in enumerate(
+                ordered_parts(downloader, file_id, parts), start=1
+            ):
+                digest.update(data)
+                slots.acquire()
+                futures.append(executor.submit(upload, number, data))
+            uploaded: List[dict] = [future.result() for future in futures]
+        _check_md5(digest, meta.get("md5Checksum"), file_id)
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": uploaded},
+        )
+    except BaseException:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
+def stream_to_field(
+    field_file, name: str, downloader: RangedDownloader, file_id: str
+) -> str:
+    """
+    streams the Drive file into a FileField without saving the model, like
+    field_file.save(name, content, save=False); returns the stored name.
+    """
+    meta = downloader.metadata(file_id)
+    if "size" not in meta:
+        raise DownloadError(f"File {file_id} has no size, it cannot be ranged")
+    storage = field_file.storage
+    max_length = field_file.field.max_length
+    name = field_file.field.generate_filename(field_file.instance, name)
+
+    if _is_s3(storage):
+        name = storage.get_available_name(name, max_length=max_length)
+        _upload_s3(storage, name, downloader, file_id, meta)
+    else:
+        parts = split_parts(int(meta["size"]), downloader.part_size)
+        stream = PartStream(ordered_parts(downloader, file_id, parts))
+        name = storage.save(name, File(stream, name), max_length=max_length)
+        try:
+            _check_md5(stream.md5, meta.get("md5Checksum"), file_id)
+        except DownloadError:
+            storage.delete(name)
+            raise
+
+    field_file.name = name
+    setattr(field_file.instance, field_file.field.attname, name)
+    field_file._committed = True
+    return name
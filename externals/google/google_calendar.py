@@ -1,13 +1,11 @@
 import os
 from datetime import datetime, timedelta
 from django.conf import settings
-from django.utils import timezone
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from typing import List, Optional, Tuple, Dict, Any
-from core.models import OAuthToken
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple, Dict, Any
+from .client_pool import credential_key, service_client_pool
 
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 
@@ -52,39 +50,37 @@ class GoogleCalendar:
         # Return the credentials (or store them for later use)
         return access_token, refresh_token, expired_time
 
-    def _get_service(
+    @contextmanager
+    def _service(
         self,
         access_token: str,
         refresh_token: str,
         client_id: str,
         client_secret: str,
         user,
-    ) -> Any:
-        """return the respective google calender service with updateed access refresh token"""
-        credentials = Credentials(
-            token=access_token,
-            refresh_token=refresh_token,
-            client_id=client_id,
-            client_secret=client_secret,
-            token_uri="https://oauth2.googleapis.com/token",
-        )
+    ) -> Iterator[Any]:
+        """
+        checks out a pooled Google Calendar service for the user's tokens; the
+        pooled credentials refresh themselves and are written back in bulk
+        """
 
-        if credentials.expired and credentials.refresh_token:
-            credentials.refresh(Request())
-            expiry = credentials.expiry
-            if timezone.is_naive(expiry):
-                expiry = timezone.make_aware(expiry)
-            OAuthToken.objects.update_or_create(
-                user=user,
-                defaults={
-                    "access_token": credentials.token,
-                    "expires_at": expiry,
-                    "refresh_token": credentials.refresh_token,
-                },
+        def credentials_factory():
+            return Credentials(
+                token=access_token,
+                refresh_token=refresh_token,
+                client_id=client_id,
+                client_secret=client_secret,
+                token_uri="https://oauth2.googleapis.com/token",
             )
 
-        service = build("calendar", "v3", credentials=credentials)
-        return service
+        with service_client_pool.service(
+            "calendar",
+            "v3",
+            credential_key(client_id, refresh_token or access_token),
+            credentials_factory,
+            user_id=getattr(user, "pk", None),
+        ) as service:
+            yield service
 
     """ -> keep this for future implementation
         def _check_availability(
@@ -101,7 +97,7 @@ class GoogleCalendar:
 
     def generate_rrule_string(self, recurrence_data):
         freq = recurrence_data["frequency"]
-        interval = recurrence_data["intervals"]
+        interval = recurrence_data.get("intervals", 1)
         until = recurrence_data.get("until")
 
         rrule_string = f"RRULE:FREQ={freq};INTERVAL={interval}"
@@ -130,17 +126,18 @@ class GoogleCalendar:
         Creates an event on the user's Google Calendar.
         """
         # Set up the credentials and the Google Calendar API client
-        service = self._get_service(
+        with self._service(
             access_token,
             refresh_token,
             settings.GOOGLE_CLIENT_ID,
             settings.GOOGLE_CLIENT_SECRET,
             user,
-        )
-
-        created_event = (
-            service.events().insert(calendarId="primary", body=event_details).execute()
-        )
+        ) as service:
+            created_event = (
+                service.events()
+                .insert(calendarId="primary", body=event_details)
+                .execute()
+            )
         # with open("CREATE_EVENT_DETAILS_FROM_GOOGLE.txt", "w") as e:
         #     e.write(str(created_event))
         return {
@@ -159,26 +156,26 @@ class GoogleCalendar:
         """
         Fetches events from the user's Google Calendar and returns them in a paginated list.
         """
-        service = self._get_service(
+        with self._service(
             access_token,
             refresh_token,
             settings.GOOGLE_CLIENT_ID,
             settings.GOOGLE_CLIENT_SECRET,
             user,
-        )
-        events_result = (
-            service.events()
-            .list(
-                calendarId="primary",
-                timeMin=datetime.utcnow().isoformat() + "Z",
-                timeMax=(datetime.utcnow() + timedelta(days=365)).isoformat() + "Z",
-                maxResults=10,
-                singleEvents=True,
-                orderBy="startTime",
-                pageToken=page_token,
+        ) as service:
+            events_result = (
+                service.events()
+                .list(
+                    calendarId="primary",
+                    timeMin=datetime.utcnow().isoformat() + "Z",
+                    timeMax=(datetime.utcnow() + timedelta(days=365)).isoformat() + "Z",
+                    maxResults=10,
+                    singleEvents=True,
+                    orderBy="startTime",
+                    pageToken=page_token,
+                )
+                .execute()
             )
-            .execute()
-        )
 
         events = []
         for idx, event in enumerate(events_result.get("items", [])):
@@ -203,3 +200,43 @@ class GoogleCalendar:
         }
 
         return response
+
+    def list_event_changes(
+        self,
+        access_token: str,
+        refresh_token: str,
+        user,
+        sync_token: Optional[str] = None,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lists the events changed since sync_token, or every event in
+        [time_min, time_max] without one, following all pages. Returns the
+        events, cancelled ones included, and the token for the next sync.
+        A stale token raises HttpError 410 and needs a full sync.
+        """
+        params = {"calendarId": "primary", "singleEvents": True, "maxResults": 250}
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            if time_min:
+                params["timeMin"] = time_min.isoformat()
+            if time_max:
+                params["timeMax"] = time_max.isoformat()
+
+        events = []
+        page_token = None
+        with self._service(
+            access_token,
+            refresh_token,
+            settings.GOOGLE_CLIENT_ID,
+            settings.GOOGLE_CLIENT_SECRET,
+            user,
+        ) as service:
+            while True:
+                result = service.events().list(pageToken=page_token, **params).execute()
+                events.extend(result.get("items", []))
+                page_token = result.get("nextPageToken")
+                if not page_token:
+                    return events, result.get("nextSyncToken")
@@ -1,8 +1,10 @@
-import time
+from contextlib import contextmanager
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from django.conf import settings
+from django.core.files.base import ContentFile
+from .client_pool import service_client_pool
+from .drive_download import RangedDownloader
+from .drive_stream import stream_to_field
 
 SCOPES = [
     "https://www.googleapis.com/auth/calendar",
@@ -13,14 +15,25 @@ credentials = service_account.Credentials.from_service_account_file(
     settings.GOOGLE_SERVICE_ACCOUNT_CRED, scopes=SCOPES
 )
 credentials = credentials.with_subject(IMPERSONATE_USER)
+SERVICE_ACCOUNT_KEY = f"service_account:{IMPERSONATE_USER}"
 
-calendar_service = build("calendar", "v3", credentials=credentials)
-drive_service = build("drive", "v3", credentials=credentials)
 
+@contextmanager
+def service_account_service(api, version):
+    # every pooled client gets its own copy of the credentials to refresh
+    with service_client_pool.service(
+        api,
+        version,
+        SERVICE_ACCOUNT_KEY,
+        lambda: credentials.with_subject(IMPERSONATE_USER),
+    ) as service:
+        yield service
 
-def create_meet_and_calendar_invite(
+
+def build_meet_event(
     interviewer_email, candidate_email, start_time, end_time, **kwargs
 ):
+    """body of the interview event with a Meet conference to be created"""
     candidate_name = kwargs.get("candidate_name")
     designation_name = kwargs.get("designation_name")
     event = {
@@ -61,52 +74,55 @@ def create_meet_and_calendar_invite(
         },
         "transparency": "transparent",
     }
+    return event
 
-    event = (
-        calendar_service.events()
-        .insert(
-            calendarId="primary",
-            body=event,
-            conferenceDataVersion=1,  # to generate meet link
-        )
-        .execute()
+
+def create_meet_and_calendar_invite(
+    interviewer_email, candidate_email, start_time, end_time, **kwargs
+):
+    event = build_meet_event(
+        interviewer_email, candidate_email, start_time, end_time, **kwargs
     )
+    with service_account_service("calendar", "v3") as calendar_service:
+        event = (
+            calendar_service.events()
+            .insert(
+                calendarId="primary",
+                body=event,
+                conferenceDataVersion=1,  # to generate meet link
+            )
+            .execute()
+        )
 
     return event.get("hangoutLink"), event.get("id")
 
 
 def get_meeting_info(event_id):
-    event = (
-        calendar_service.events().get(calendarId="primary", eventId=event_id).execute()
-    )
+    with service_account_service("calendar", "v3") as calendar_service:
+        event = (
+            calendar_service.events()
+            .get(calendarId="primary", eventId=event_id)
+            .execute()
+        )
     return event
 
 
-def download_file(file_id, mime_type=None, save_path=None):
-    if mime_type:
-        request = drive_service.files().export_media(fileId=file_id, mimeType=mime_type)
-    else:
-        request = drive_service.files().get_media(fileId=file_id)
+def drive_downloader():
+    return RangedDownloader(lambda: credentials.with_subject(IMPERSONATE_USER))
 
-    # instead of lading the cotent directly to ram we save it in temp file by reading chunk of data size 1MB using resumable download which help to resume if download fails in the middle
-    with open(save_path, "ab") as file:
-        downloader = MediaIoBaseDownload(
-            fd=file, request=request, chunksize=4 * 1024 * 1024
-        )
-        done = False
-        while not done:
-            try:
-                status, done = downloader.next_chunk()  # Resume if interrupted
-                print(f"Download {int(status.progress() * 100)}% complete.")
-            except Exception as e:
-                print(f"Chunk download failed: {e}")
-                time.sleep(5)
-                continue
 
-    return save_path
+RECORDING_FILES = {
+    "video": {"ext": "mp4", "mime_type": None},
+    "transcript": {"ext": "txt", "mime_type": "text/plain"},
+}
 
 
 def download_from_google_drive(interview_id, event_id):
+    """
+    the Drive files of the interview's Meet recording and transcript, {} while
+    they are not both attached to the event. Nothing is downloaded here,
+    store_drive_recordings streams them into storage.
+    """
     event_info = get_meeting_info(event_id)
     attachments = event_info.get("attachments", [])
 
@@ -132,28 +148,45 @@ def download_from_google_drive(interview_id, event_id):
     if None in required_files.values():
         return {}
 
-    downloaded_files = {}
-    file_configs = {
-        "video": {"ext": "mp4", "mime_type": None},
-        "transcript": {"ext": "txt", "mime_type": "text/plain"},
+    files = {
+        file_type: {
+            "file_id": file_id,
+            "name": f"{event_id}.{RECORDING_FILES[file_type]['ext']}",
+        }
+        for file_type, file_id in required_files.items()
     }
+    return {"interview_id": interview_id, "files": files}
 
-    for file_type, file_id in required_files.items():
-        save_path = f"/tmp/{event_id}.{file_configs[file_type]['ext']}"
-        download_file(
-            file_id, mime_type=file_configs[file_type]["mime_type"], save_path=save_path
-        )
-        downloaded_files[file_type] = {
-            "path": save_path,
-            "name": f"{event_id}.{file_configs[file_type]['ext']}",
-        }
 
-    return {"interview_id": interview_id, "files": downloaded_files}
+def export_file(file_id, mime_type):
+    """a Google Docs file exported to mime_type, in memory (exports are <10 MB)"""
+    with service_account_service("drive", "v3") as drive_service:
+        request = drive_service.files().export_media(fileId=file_id, mimeType=mime_type)
+        return request.execute()
+
+
+def store_drive_recordings(interview, files, downloader=None):
+    """
+    streams the video into interview.recording and the exported transcript
+    into interview.transcription without saving the interview.
+    """
+    video, transcript = files["video"], files["transcript"]
+    stream_to_field(
+        interview.recording,
+        video["name"],
+        downloader or drive_downloader(),
+        video["file_id"],
+    )
+    content = export_file(
+        transcript["file_id"], RECORDING_FILES["transcript"]["mime_type"]
+    )
+    interview.transcription.save(transcript["name"], ContentFile(content), save=False)
 
 
 # keep below funcation for testing purpose
 def list_all_files():
-    results = drive_service.files().list().execute()
+    with service_account_service("drive", "v3") as drive_service:
+        results = drive_service.files().list().execute()
     files = results.get("files", [])
     if not files:
         print("❌ No files found.")
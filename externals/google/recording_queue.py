@@ -0,0 +1,123 @@
+"""
+Claims on the interviews whose Meet recordings are due for download. The
+beat task claims a batch with SELECT ... FOR UPDATE SKIP LOCKED and stamps
+every row with a claim token and a lease. The download and store tasks
+extend the lease with heartbeats while they work and release it when they
+are done. Other claimers skip rows with a live lease, so an interview is
+processed by one worker however often the beat runs. A claim left by a dead
+worker is picked up again once its lease runs out.
+
+An interview is polled from RECORDING_DELAY after its scheduled time for
+RECORDING_WAIT, whatever the beat's cadence. Polls that find no recording
+yet are not counted; no_of_time_processed counts downloads that failed.
+"""
+
+import datetime
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CLAIM_LIMIT = 20
+LEASE = datetime.timedelta(minutes=10)
+HEARTBEAT_INTERVAL = 60
+# Meet attaches the recording to the event a while after the interview
+RECORDING_DELAY = datetime.timedelta(hours=2, minutes=30)
+# how long after RECORDING_DELAY an interview keeps being polled for it
+RECORDING_WAIT = datetime.timedelta(hours=6)
+# downloads that failed this often are given up
+MAX_PROCESSED = 3
+
+
+def claim_recordings(limit: int = CLAIM_LIMIT) -> List[Tuple[int, str, str]]:
+    """
+    claims up to limit interviews due for download; returns (interview id,
+    event id, claim token) for each.
+    """
+    from dashboard.models import Interview
+
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        claimed = list(
+            Interview.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(recording_lease_until__isnull=True)
+                | Q(recording_lease_until__lt=now),
+                scheduled_time__lte=now - RECORDING_DELAY,
+                scheduled_time__gte=now - RECORDING_DELAY - RECORDING_WAIT,
+                status="CSCH",
+                downloaded=False,
+                scheduled_service_account_event_id__isnull=False,
+                no_of_time_processed__lte=MAX_PROCESSED,
+            )
+            .order_by("scheduled_time", "id")
+            .values_list("id", "scheduled_service_account_event_id")[:limit]
+        )
+        Interview.objects.filter(pk__in=[pk for pk, _ in claimed]).update(
+            recording_claim=token, recording_lease_until=now + LEASE
+        )
+    return [(pk, event_id, token) for pk, event_id in claimed]
+
+
+def extend_lease(interview_id: int, token: str) -> bool:
+    """renews the lease; False when the claim is no longer this token's."""
+    from dashboard.models import Interview
+
+    return bool(
+        Interview.objects.filter(pk=interview_id, recording_claim=token).update(
+            recording_lease_until=timezone.now() + LEASE
+        )
+    )
+
+
+def release(interview_id: int, token: str, **fields) -> bool:
+    """
+    drops the claim, writing fields with it; False and nothing written when
+    the claim is no longer this token's.
+    """
+    from dashboard.models import Interview
+
+    return bool(
+        Interview.objects.filter(pk=interview_id, recording_claim=token).update(
+            recording_claim="", recording_lease_until=None, **fields
+        )
+    )
+
+
+@contextmanager
+def heartbeat(
+    interview_id: int, token: str, interval: float = HEARTBEAT_INTERVAL
+) -> Iterator[threading.Event]:
+    """
+    keeps the lease alive from a background thread for the block; the event
+    it yields is set once the claim was lost.
+    """
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                if not extend_lease(interview_id, token):
+                    lost.set()
+                    return
+        except Exception as e:
+            logger.warning("Heartbeat of interview %s failed: %s", interview_id, e)
+        finally:
+            # the thread's own database connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
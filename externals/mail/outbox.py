@@ -0,0 +1,320 @@
+"""
+Transactional email outbox. queue_mail and queue_emails only write
+EmailOutbox rows, inside the caller's transaction, so a rolled back request
+sends nothing and no request waits on the broker. dispatch_pending, run by
+a beat task, claims the committed rows in batches, coalesces duplicates and
+sends the rest over a pooled SMTP connection, recording the outcome per message.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+from django.core.mail import EmailMultiAlternatives
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .rendering import render, render_many
+from .smtp import email_rate_limiter, smtp_pool
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_LIMIT = 200
+MAX_ATTEMPTS = 5
+RETRY_DELAY = datetime.timedelta(minutes=1)
+# the same message queued again within this window is not sent twice
+DEDUPE_WINDOW = datetime.timedelta(minutes=10)
+# messages left sending this long by a dead worker are claimed again
+STALE_AFTER = datetime.timedelta(minutes=10)
+# a live batch renews its claim this often, a slow one is never taken as stale
+CLAIM_RENEWAL = datetime.timedelta(minutes=1)
+# longest a batch waits on the shared rate limit for one message
+RATE_LIMIT_WAIT = 10
+RATE_LIMITED_DELAY = datetime.timedelta(seconds=15)
+PLAIN_TEXT_BODY = (
+    "This is an HTML email. Please view it in an HTML-compatible email client."
+)
+
+
+def _sender_addresses():
+    from dashboard.tasks import CONTACT_EMAIL, INTERVIEW_EMAIL
+
+    return CONTACT_EMAIL, INTERVIEW_EMAIL
+
+
+def _dedupe_key(to, subject, template, from_email, context) -> str:
+    payload = json.dumps(
+        [to, subject, template, from_email, context],
+        sort_keys=True,
+        cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _message(to, subject, template, context, from_email, reply_to, bcc, attachments):
+    from dashboard.models import EmailOutbox
+
+    # stored the way the broker used to carry it, e.g. dates as ISO strings
+    context = json.loads(json.dumps(context, cls=DjangoJSONEncoder))
+    return EmailOutbox(
+        to=to,
+        subject=subject or "",
+        template=template,
+        context=context,
+        from_email=from_email,
+        reply_to=[address for address in reply_to if address],
+        bcc=[bcc] if bcc else [],
+        attachments=list(attachments or []),
+        dedupe_key=_dedupe_key(to, subject, template, from_email, context),
+    )
+
+
+def queue_mail(
+    to: str,
+    subject: str,
+    template: str,
+    reply_to: Optional[str] = None,
+    attachments: Optional[Iterable[str]] = None,
+    bcc: Optional[str] = None,
+    **kwargs,
+):
+    """outbox counterpart of the send_mail task, taking the same arguments."""
+    contact_email, interview_email = _sender_addresses()
+    from_email = (
+        interview_email
+        if kwargs.get("type") in ["feedback_notification"]
+        else contact_email
+    )
+    message = _message(
+        to,
+        subject,
+        template,
+        {"email": to, **kwargs},
+        from_email,
+        [reply_to or contact_email],
+        bcc,
+        attachments,
+    )
+    message.save()
+    return message
+
+
+def queue_emails(
+    contexts: List[Dict[str, Any]],
+    subject: str,
+    template: str,
+    reply_to: Optional[str] = None,
+    attachments: Optional[Iterable[str]] = None,
+    bcc: Optional[str] = None,
+) -> list:
+    """
+    outbox counterpart of the send_email_to_multiple_recipients task: one
+    message per context with an email, which may override subject, template
+    and from_email, and add its recruiter_email to reply_to.
+    """
+    from dashboard.models import EmailOutbox
+
+    contact_email, _ = _sender_addresses()
+    messages = [
+        _message(
+            context["email"],
+            context.get("subject") or subject,
+            context.get("template") or template,
+            context,
+            context.get("from_email") or contact_email,
+            [reply_to or contact_email, context.get("recruiter_email")],
+            bcc,
+            attachments,
+        )
+        for context in contexts
+        if context.get("email")
+    ]
+    return EmailOutbox.objects.bulk_create(messages)
+
+
+def _claim(limit: int) -> list:
+    from dashboard.models import EmailOutbox
+
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="PENDING", send_after__isnull=True)
+                | Q(status="PENDING", send_after__lte=now)
+                | Q(status="SENDING", updated_at__lt=now - STALE_AFTER)
+            )
+            .order_by("created_at", "id")[:limit]
+        )
+        EmailOutbox.objects.filter(pk__in=[message.pk for message in messages]).update(
+            status="SENDING", updated_at=now
+        )
+    return messages
+
+
+def _renew_claim(messages: list) -> None:
+    """moves updated_at of the claimed messages on, see STALE_AFTER."""
+    from dashboard.models import EmailOutbox
+
+    EmailOutbox.objects.filter(
+        pk__in=[message.pk for message in messages], status="SENDING"
+    ).update(updated_at=timezone.now())
+
+
+def _coalesce(messages: list, now) -> list:
+    """marks the duplicates among messages and returns the ones to send."""
+    from dashboard.models import EmailOutbox
+
+    recently_sent = set(
+        EmailOutbox.objects.filter(
+            status="SENT",
+            dedupe_key__in={message.dedupe_key for message in messages},
+            sent_at__gte=now - DEDUPE_WINDOW,
+        ).values_list("dedupe_key", flat=True)
+    )
+    unique = []
+    for message in messages:
+        if message.dedupe_key in recently_sent:
+            message.status = "DUPLICATE"
+            continue
+        recently_sent.add(message.dedupe_key)
+        unique.append(message)
+    return unique
+
+
+def build_email(message, html_content: str, connection=None) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        subject=message.subject,
+        body=PLAIN_TEXT_BODY,
+        from_email=message.from_email,
+        to=[message.to],
+        reply_to=message.reply_to,
+        bcc=message.bcc,
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    for attachment in message.attachments:
+        email.attach_file(attachment)
+    return email
+
+
+def _failed(message, error, now) -> None:
+    message.attempts += 1
+    message.last_error = str(error)[:2000]
+    if message.attempts >= MAX_ATTEMPTS:
+        message.status = "FAILED"
+    else:
+        message.status = "PENDING"
+        message.send_after = now + RETRY_DELAY * 2 ** (message.attempts - 1)
+
+
+@contextmanager
+def _connection(connection=None):
+    if connection is None:
+        with smtp_pool.connection() as connection:
+            yield connection
+        return
+    connection.open()
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def dispatch_pending(limit: int = DISPATCH_LIMIT, connection=None) -> Dict[str, int]:
+    """
+    sends one batch of the outbox; returns how many messages ended in each
+    status. connection defaults to one from the worker's SMTP pool; every
+    message waits its turn on the shared email rate limit.
+    """
+    from dashboard.models import EmailOutbox
+
+    messages = _claim(limit)
+    if not messages:
+        return {}
+    now = timezone.now()
+    to_send = _coalesce(messages, now)
+
+    by_template = defaultdict(list)
+    for message in to_send:
+        by_template[message.template].append(message)
+    emails = []
+    for template_name, template_messages in by_template.items():
+        try:
+            html_contents = render_many(
+                template_name, [message.context for message in template_messages]
+            )
+        except Exception:
+            # find the contexts that fail, the others still go out
+            html_contents = []
+            for message in template_messages:
+                try:
+                    html_contents.append(render(template_name, message.context))
+                except Exception as e:
+                    html_contents.append(e)
+        for message, html_content in zip(template_messages, html_contents):
+            try:
+                if isinstance(html_content, Exception):
+                    raise html_content
+                emails.append((message, build_email(message, html_content)))
+            except Exception as e:
+                # a template or attachment that fails now fails on every retry
+                message.status = "FAILED"
+                message.attempts += 1
+                message.last_error = str(e)[:2000]
+
+    renewed_at = now
+    try:
+        with _connection(connection) as connection:
+            for index, (message, email) in enumerate(emails):
+                # the rate limit can stretch a batch past STALE_AFTER
+                if timezone.now() - renewed_at >= CLAIM_RENEWAL:
+                    _renew_claim(messages)
+                    renewed_at = timezone.now()
+                if not email_rate_limiter.acquire(timeout=RATE_LIMIT_WAIT):
+                    # out of sending budget, the rest waits without using an attempt
+                    for later, _ in emails[index:]:
+                        later.status = "PENDING"
+                        later.send_after = now + RATE_LIMITED_DELAY
+                    break
+                email.connection = connection
+                try:
+                    if not connection.send_messages([email]):
+                        raise RuntimeError("The mail backend sent nothing.")
+                except Exception as e:
+                    _failed(message, e, now)
+                    # the connection may be broken, the next message gets a new one
+                    connection.close()
+                    connection.open()
+                    continue
+                message.status = "SENT"
+                message.sent_at = timezone.now()
+                message.last_error = ""
+    except Exception as e:
+        logger.warning("Mail connection lost: %s", e)
+        for message, _ in emails:
+            if message.status == "SENDING":
+                _failed(message, e, now)
+
+    for message in messages:
+        message.updated_at = timezone.now()
+        # contexts may hold temporary passwords, nothing needs them once sent
+        if message.status in ("SENT", "DUPLICATE"):
+            message.context = {}
+    EmailOutbox.objects.bulk_update(
+        messages,
+        [
+            "status",
+            "attempts",
+            "last_error",
+            "send_after",
+            "sent_at",
+            "context",
+            "updated_at",
+        ],
+    )
+    return dict(Counter(message.status for message in messages))
@@ -0,0 +1,132 @@
+"""
+Email template rendering. Compiled templates are cached per process and
+keyed by template name and source file mtime, so an edited template is
+picked up without a restart even where Django's cached loader is off
+(DEBUG). render_many renders a batch of contexts for one template:
+identical contexts are rendered once, the rest in a thread pool. Every
+render is timed per template; render_stats.snapshot() shows the slow ones and
+renders slower than SLOW_RENDER_SECONDS are logged.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = 4
+# batches smaller than this are rendered inline, a pool costs more than it saves
+MIN_PARALLEL_BATCH = 8
+SLOW_RENDER_SECONDS = 0.5
+
+
+class TemplateCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> (mtime of the source file, compiled template)
+        self._templates: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _mtime(template) -> Optional[float]:
+        try:
+            return os.path.getmtime(template.origin.name)
+        except (AttributeError, OSError, TypeError):
+            return None
+
+    def get(self, name: str):
+        with self._lock:
+            cached = self._templates.get(name)
+        if cached:
+            mtime, template = cached
+            if mtime is not None and self._mtime(template) == mtime:
+                return template
+        template = get_template(name)
+        with self._lock:
+            self._templates[name] = (self._mtime(template), template)
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+class RenderStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"renders": 0, "seconds": 0.0, "max": 0.0})
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats["renders"] += 1
+            stats["seconds"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+        if seconds >= SLOW_RENDER_SECONDS:
+            logger.warning("Rendering %s took %.3fs", name, seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """per template: renders, total and max seconds and the mean in ms, slowest first."""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        for values in stats.values():
+            values["mean_ms"] = round(values["seconds"] / values["renders"] * 1000, 3)
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["mean_ms"]))
+
+
+template_cache = TemplateCache()
+render_stats = RenderStats()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=RENDER_WORKERS, thread_name_prefix="email-render"
+            )
+        return _pool
+
+
+def render(template_name: str, context: Dict[str, Any]) -> str:
+    """render_to_string through the compiled template cache."""
+    template = template_cache.get(template_name)
+    started = time.perf_counter()
+    content = template.render(context)
+    render_stats.record(template_name, time.perf_counter() - started)
+    return content
+
+
+def _context_key(context: Dict[str, Any]) -> str:
+    return json.dumps(context, sort_keys=True, default=repr)
+
+
+def render_many(template_name: str, contexts: Iterable[Dict[str, Any]]) -> List[str]:
+    """renders template_name with every context, in order."""
+    contexts = list(contexts)
+    unique: Dict[str, Dict[str, Any]] = {}
+    keys = []
+    for context in contexts:
+        key = _context_key(context)
+        unique.setdefault(key, context)
+        keys.append(key)
+
+    if len(unique) < MIN_PARALLEL_BATCH:
+        rendered = {
+            key: render(template_name, context) for key, context in unique.items()
+        }
+    else:
+        # compile once up front rather than in every worker
+        template_cache.get(template_name)
+        results = _get_pool().map(
+            lambda context: render(template_name, context), unique.values()
+        )
+        rendered = dict(zip(unique, results))
+    return [rendered[key] for key in keys]
@@ -0,0 +1,115 @@
+"""
+Outgoing mail throttling and connection reuse shared by every email task.
+
+email_rate_limiter is a token bucket kept in Redis (see externals.ratelimit),
+so the provider limit (EMAIL_SEND_RATE_PER_MINUTE, with bursts of
+EMAIL_SEND_BURST) holds across all workers rather than per worker as
+Celery's rate_limit does.
+
+smtp_pool keeps open connections of the email backend per worker process,
+so a task does not pay the SMTP handshake and login for every message.
+Connections idle for a while are checked with NOOP before they are reused
+and a connection that failed is closed rather than returned.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from django.core.mail import get_connection
+from externals.ratelimit import TokenBucket
+
+BUCKET_KEY = "email:rate-limit"
+POOL_SIZE = 2
+# idle connections older than this are closed, servers drop them anyway
+MAX_IDLE_SECONDS = 120
+# idle connections older than this get a NOOP before being handed out
+CHECK_AFTER_SECONDS = 15
+
+
+class SMTPConnectionPool:
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        # (connection, time it was returned), most recently used last
+        self._idle: List[Tuple[object, float]] = []
+
+    @staticmethod
+    def _alive(connection) -> bool:
+        smtp = getattr(connection, "connection", None)
+        if smtp is None:
+            # not an SMTP backend, or one that was never opened
+            return not hasattr(connection, "connection")
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> Optional[object]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, returned_at = self._idle.pop()
+            idle = now - returned_at
+            if idle <= MAX_IDLE_SECONDS and (
+                idle <= CHECK_AFTER_SECONDS or self._alive(connection)
+            ):
+                return connection
+            self._discard(connection)
+
+    @staticmethod
+    def _discard(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        an open connection of the email backend for the block; it goes back
+        to the pool unless the block raised.
+        """
+        connection = self._checkout()
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+        try:
+            yield connection
+        except BaseException:
+            self._discard(connection)
+            raise
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._discard(connection)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+email_rate_limiter = TokenBucket(
+    BUCKET_KEY,
+    rate_setting="EMAIL_SEND_RATE_PER_MINUTE",
+    burst_setting="EMAIL_SEND_BURST",
+    default_rate=30,
+    default_burst=10,
+)
+smtp_pool = SMTPConnectionPool()
+
+
+def _after_fork() -> None:
+    # a forked worker must not share the parent's sockets
+    smtp_pool._idle = []
+    smtp_pool._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,161 @@
+"""
+Rate limits shared by every worker. A TokenBucket is kept in Redis, so a
+provider limit holds across all workers rather than per worker as Celery's
+rate_limit does. The bucket is refilled and taken from in one Lua script on
+Redis' own clock. When Redis cannot be reached each process falls back to a
+local bucket, which keeps work going at the same rate per process.
+
+Redis is the default cache's, or RATE_LIMIT_REDIS_URL when set.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# after a failed connection Redis is tried again this much later
+REDIS_RETRY_SECONDS = 30
+# every bucket of the process, reset after a fork
+_buckets: "weakref.WeakSet[TokenBucket]" = weakref.WeakSet()
+
+TOKEN_BUCKET_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class _LocalBucket:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = None
+        self._ts = None
+
+    def reserve(self, rate: float, burst: float, requested: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if self._tokens is None:
+                self._tokens, self._ts = burst, now
+            self._tokens = min(burst, self._tokens + (now - self._ts) * rate)
+            self._ts = now
+            if self._tokens >= requested:
+                self._tokens -= requested
+                return 0.0
+            return (requested - self._tokens) / rate
+
+
+class TokenBucket:
+    """
+    a limit shared through Redis under key; rate_setting and burst_setting
+    name the settings holding the tokens per minute and the bucket size.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        rate_setting: str,
+        burst_setting: str,
+        default_rate: float,
+        default_burst: float,
+    ):
+        self.key = key
+        self.rate_setting = rate_setting
+        self.burst_setting = burst_setting
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._local = _LocalBucket()
+        self._lock = threading.Lock()
+        self._script = None
+        self._redis_down_until = 0.0
+        _buckets.add(self)
+
+    def _reset(self) -> None:
+        # a forked worker must not share the parent's Redis connection
+        self._local = _LocalBucket()
+        self._lock = threading.Lock()
+        self._script = None
+
+    @property
+    def rate(self) -> float:
+        """tokens per second."""
+        return getattr(settings, self.rate_setting, self.default_rate) / 60
+
+    @property
+    def burst(self) -> float:
+        return max(1, getattr(settings, self.burst_setting, self.default_burst))
+
+    def _redis_script(self):
+        with self._lock:
+            if self._script is not None or time.monotonic() < self._redis_down_until:
+                return self._script
+            url = getattr(settings, "RATE_LIMIT_REDIS_URL", None) or (
+                settings.CACHES["default"].get("LOCATION")
+            )
+            if not isinstance(url, str) or not url.startswith(
+                ("redis://", "rediss://", "unix://")
+            ):
+                # no Redis configured at all, the local bucket is all there is
+                self._redis_down_until = float("inf")
+                return None
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=2)
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            return self._script
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        takes tokens if they are there and returns 0, otherwise takes nothing
+        and returns the seconds until they will be.
+        """
+        script = self._redis_script()
+        if script is not None:
+            try:
+                return float(
+                    script(keys=[self.key], args=[self.rate, self.burst, tokens])
+                )
+            except Exception as e:
+                logger.warning("Rate limiter %s falls back to local: %s", self.key, e)
+                with self._lock:
+                    self._script = None
+                    self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._local.reserve(self.rate, self.burst, tokens)
+
+    def acquire(self, tokens: int = 1, timeout: float = 30) -> bool:
+        """waits up to timeout seconds for tokens; returns whether it got them."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.reserve(tokens)
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def _after_fork() -> None:
+    for bucket in list(_buckets):
+        bucket._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
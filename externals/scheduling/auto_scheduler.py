@@ -0,0 +1,262 @@
+import datetime
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from django.utils import timezone
+from .availability_index import availability_index
+from .eligibility import get_eligible_interviewer_ids
+
+INTERVIEW_DURATION = datetime.timedelta(hours=1)
+# the accept flow keeps one free hour around every interview
+INTERVIEW_GAP = datetime.timedelta(hours=1)
+POSITION_STEP = INTERVIEW_DURATION + INTERVIEW_GAP
+# cost of the k-th interview of an interviewer on the day is LOAD_WEIGHT * k * k,
+# which outweighs any time-of-day preference so load is balanced first
+LOAD_WEIGHT = 100
+
+INFINITY = float("inf")
+
+
+class MinCostFlow:
+    """
+    successive shortest paths with Dijkstra on reduced costs. Edge costs must
+    be non-negative when added.
+    """
+
+    def __init__(self, size: int):
+        self.graph: List[List[list]] = [[] for _ in range(size)]
+
+    def add_edge(self, source: int, target: int, capacity: int, cost: int):
+        self.graph[source].append([target, capacity, cost, len(self.graph[target])])
+        self.graph[target].append([source, 0, -cost, len(self.graph[source]) - 1])
+        return source, len(self.graph[source]) - 1
+
+    def flow(self, edge: Tuple[int, int]) -> int:
+        source, index = edge
+        target, _, _, reverse = self.graph[source][index]
+        return self.graph[target][reverse][1]
+
+    def solve(self, source: int, sink: int) -> Tuple[int, int]:
+        """pushes the maximum flow at minimum cost; returns (flow, cost)."""
+        size = len(self.graph)
+        potential = [0] * size
+        total_flow = total_cost = 0
+        while True:
+            distance = [INFINITY] * size
+            previous: List[Optional[Tuple[int, int]]] = [None] * size
+            distance[source] = 0
+            heap = [(0, source)]
+            while heap:
+                node_distance, node = heapq.heappop(heap)
+                if node_distance > distance[node]:
+                    continue
+                for index, (target, capacity, cost, _) in enumerate(self.graph[node]):
+                    if capacity <= 0:
+                        continue
+                    candidate = (
+                        node_distance + cost + potential[node] - potential[target]
+                    )
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        previous[target] = (node, index)
+                        heapq.heappush(heap, (candidate, target))
+            if distance[sink] == INFINITY:
+                return total_flow, total_cost
+            for node in range(size):
+                if distance[node] < INFINITY:
+                    potential[node] += distance[node]
+
+            push, node = INFINITY, sink
+            while node != source:
+                parent, index = previous[node]
+                push = min(push, self.graph[parent][index][1])
+                node = parent
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                edge = self.graph[parent][index]
+                edge[1] -= push
+                self.graph[node][edge[3]][1] += push
+                node = parent
+            total_flow += push
+            total_cost += push * (potential[sink] - potential[source])
+
+
+class Position(NamedTuple):
+    interviewer_id: int
+    availability_id: int
+    start: datetime.datetime
+
+
+def _conflicts(start: datetime.datetime, others: Iterable[datetime.datetime]) -> bool:
+    # same rule as the accept flow: no other interview within an hour either side
+    return any(abs(start - other) <= INTERVIEW_GAP for other in others)
+
+
+def build_positions(
+    date: datetime.date,
+    interviewer_ids: Iterable[int],
+    start_time: Optional[datetime.time] = None,
+    end_time: Optional[datetime.time] = None,
+) -> Tuple[List[Position], Dict[int, int]]:
+    """
+    bookable interview starts of the interviewers on date, plus their current
+    interview count. Starts are laid two hours apart inside every free slot and
+    clipped to [start_time, end_time]; starts clashing with a scheduled
+    interview or with an earlier start of the same interviewer are dropped, so
+    any subset of the returned positions can be booked together.
+    """
+    from dashboard.models import Interview
+
+    interviewer_ids = set(interviewer_ids)
+    now = timezone.localtime()
+    window_start = timezone.make_aware(
+        datetime.datetime.combine(date, start_time or datetime.time.min)
+    )
+    window_end = timezone.make_aware(
+        datetime.datetime.combine(date, end_time or datetime.time.max)
+    )
+
+    scheduled = defaultdict(list)
+    for interviewer_id, scheduled_time in Interview.objects.filter(
+        interviewer_id__in=interviewer_ids,
+        status="CSCH",
+        scheduled_time__date=date,
+    ).values_list("interviewer_id", "scheduled_time"):
+        scheduled[interviewer_id].append(scheduled_time)
+
+    starts = defaultdict(list)
+    for slot in availability_index.find_slots(date, interviewer_ids=interviewer_ids):
+        slot_start = timezone.make_aware(
+            datetime.datetime.combine(date, slot.start_time)
+        )
+        slot_end = timezone.make_aware(datetime.datetime.combine(date, slot.end_time))
+        start = max(slot_start, window_start)
+        if start < now:
+            start += -(-(now - start) // POSITION_STEP) * POSITION_STEP
+        while start + INTERVIEW_DURATION <= min(slot_end, window_end):
+            starts[slot.interviewer_id].append((start, slot.id))
+            start += POSITION_STEP
+
+    positions = []
+    for interviewer_id, interviewer_starts in starts.items():
+        kept = list(scheduled[interviewer_id])
+        for start, availability_id in sorted(interviewer_starts):
+            if not _conflicts(start, kept):
+                kept.append(start)
+                positions.append(Position(interviewer_id, availability_id, start))
+    loads = {
+        interviewer_id: len(scheduled[interviewer_id]) for interviewer_id in starts
+    }
+    return positions, loads
+
+
+def plan_auto_schedule(
+    candidates: Iterable,
+    date: datetime.date,
+    start_time: Optional[datetime.time] = None,
+    end_time: Optional[datetime.time] = None,
+    max_interviews_per_interviewer: int = 3,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    assigns as many candidates as possible to distinct, conflict-free interview
+    positions of eligible interviewers, balancing the interviewers' load and
+    then preferring earlier starts. Nothing is booked; returns the proposed
+    (assignments, unassigned) lists.
+    """
+    candidates = list(candidates)
+    unassigned = []
+    eligibility_cache = {}
+    eligible = {}
+    for candidate in candidates:
+        if not candidate.designation:
+            unassigned.append(
+                {"candidate_id": candidate.id, "reason": "Candidate has no job."}
+            )
+            continue
+        key = (
+            candidate.organization_id,
+            candidate.designation_id,
+            candidate.specialization,
+            candidate.year or 0,
+            (candidate.company or "").casefold(),
+        )
+        if key not in eligibility_cache:
+            eligibility_cache[key] = get_eligible_interviewer_ids(
+                candidate.designation,
+                candidate.specialization,
+                candidate.year or 0,
+                candidate.company or "",
+                candidate.organization.internal_client.client_level,
+            )
+        if not eligibility_cache[key]:
+            unassigned.append(
+                {"candidate_id": candidate.id, "reason": "No eligible interviewer."}
+            )
+            continue
+        eligible[candidate.id] = eligibility_cache[key]
+
+    positions, loads = build_positions(
+        date, set().union(*eligible.values()), start_time, end_time
+    )
+    interviewer_ids = sorted({position.interviewer_id for position in positions})
+
+    # source -> candidate -> position -> interviewer -> sink
+    source, sink = 0, 1
+    candidate_nodes = {
+        candidate_id: 2 + index for index, candidate_id in enumerate(eligible)
+    }
+    position_base = 2 + len(candidate_nodes)
+    interviewer_nodes = {
+        interviewer_id: position_base + len(positions) + index
+        for index, interviewer_id in enumerate(interviewer_ids)
+    }
+    network = MinCostFlow(position_base + len(positions) + len(interviewer_nodes))
+
+    first_start = min((position.start for position in positions), default=None)
+    candidate_edges = []
+    for candidate_id, node in candidate_nodes.items():
+        network.add_edge(source, node, 1, 0)
+        for index, position in enumerate(positions):
+            if position.interviewer_id in eligible[candidate_id]:
+                cost = int((position.start - first_start).total_seconds() // 900)
+                edge = network.add_edge(node, position_base + index, 1, cost)
+                candidate_edges.append((candidate_id, index, edge))
+    for index, position in enumerate(positions):
+        network.add_edge(
+            position_base + index, interviewer_nodes[position.interviewer_id], 1, 0
+        )
+    for interviewer_id, node in interviewer_nodes.items():
+        load = loads.get(interviewer_id, 0)
+        for extra in range(1, max_interviews_per_interviewer - load + 1):
+            network.add_edge(node, sink, 1, LOAD_WEIGHT * (load + extra) ** 2)
+
+    network.solve(source, sink)
+
+    assignments = []
+    assigned = set()
+    for candidate_id, index, edge in candidate_edges:
+        if network.flow(edge):
+            position = positions[index]
+            local_start = timezone.localtime(position.start)
+            assignments.append(
+                {
+                    "candidate_id": candidate_id,
+                    "interviewer_id": position.interviewer_id,
+                    "availability_id": position.availability_id,
+                    "date": local_start.date(),
+                    "start_time": local_start.time(),
+                    "end_time": (local_start + INTERVIEW_DURATION).time(),
+                }
+            )
+            assigned.add(candidate_id)
+    for candidate_id in candidate_nodes:
+        if candidate_id not in assigned:
+            unassigned.append(
+                {
+                    "candidate_id": candidate_id,
+                    "reason": "No conflict-free interviewer slot left.",
+                }
+            )
+    assignments.sort(key=lambda item: (item["start_time"], item["interviewer_id"]))
+    return assignments, unassigned
@@ -0,0 +1,306 @@
+import bisect
+import datetime
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from django.utils import timezone
+from .generation import get_generation, bump_generation
+from .recurrence import occurrence_dates
+
+GENERATION_CACHE_KEY = "availability_index:generation:{date}"
+# moves whenever a recurring slot changes, since that can touch any date
+RECURRING_GENERATION_CACHE_KEY = "availability_index:generation:recurring"
+# what is left of a slot around calendar busy time is only offered if an
+# interview still fits in it
+MIN_FREE_MINUTES = 60
+
+
+class AvailabilitySlot(NamedTuple):
+    start_time: datetime.time
+    end_time: datetime.time
+    id: int
+    interviewer_id: int
+    date: datetime.date
+    # virtual occurrence of a recurring slot; id is then the recurring slot's id
+    is_recurring: bool = False
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "date": self.date,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+        }
+
+
+class _DateBucket:
+    __slots__ = ("generation", "recurring_generation", "slots")
+
+    def __init__(
+        self,
+        generation: Optional[int],
+        recurring_generation: Optional[int],
+        slots: List[AvailabilitySlot],
+    ):
+        self.generation = generation
+        self.recurring_generation = recurring_generation
+        self.slots = slots
+
+
+def _minutes(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _busy_times(
+    date: datetime.date, interviewer_ids: Optional[Iterable[int]] = None
+) -> Dict[int, List[Tuple[datetime.time, datetime.time]]]:
+    """the synced calendar busy times on date, clipped to the day, by interviewer."""
+    from dashboard.models import CalendarBusyInterval
+
+    day_start = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+    day_end = day_start + datetime.timedelta(days=1)
+    rows = CalendarBusyInterval.objects.filter(start__lt=day_end, end__gt=day_start)
+    if interviewer_ids is not None:
+        rows = rows.filter(interviewer_id__in=interviewer_ids)
+
+    busy = defaultdict(list)
+    for interviewer_id, start, end in rows.values_list(
+        "interviewer_id", "start", "end"
+    ):
+        busy[interviewer_id].append(
+            (
+                (
+                    timezone.localtime(start).time()
+                    if start > day_start
+                    else datetime.time.min
+                ),
+                timezone.localtime(end).time() if end < day_end else datetime.time.max,
+            )
+        )
+    return busy
+
+
+def _free_parts(
+    slot: AvailabilitySlot, busy: Sequence[Tuple[datetime.time, datetime.time]]
+) -> List[AvailabilitySlot]:
+    """
+    the parts of slot outside the busy times; a slot split by a meeting stays
+    one slot id with several parts.
+    """
+    if not busy:
+        return [slot]
+    parts = [(slot.start_time, slot.end_time)]
+    for busy_start, busy_end in busy:
+        remaining = []
+        for start, end in parts:
+            if busy_end <= start or busy_start >= end:
+                remaining.append((start, end))
+                continue
+            if start < busy_start:
+                remaining.append((start, busy_start))
+            if busy_end < end:
+                remaining.append((busy_end, end))
+        parts = remaining
+    return [
+        slot._replace(start_time=start, end_time=end)
+        for start, end in parts
+        if _minutes(end) - _minutes(start) >= MIN_FREE_MINUTES
+    ]
+
+
+def _get_generation(date: datetime.date) -> Optional[int]:
+    return get_generation(GENERATION_CACHE_KEY.format(date=date.isoformat()))
+
+
+def _bump_generation(date: datetime.date) -> Optional[int]:
+    return bump_generation(GENERATION_CACHE_KEY.format(date=date.isoformat()))
+
+
+class AvailabilityIndex:
+    """
+    Per-process index of the free (unbooked) InterviewerAvailability slots,
+    bucketed by date. Every bucket keeps its slots sorted by start time, so the
+    "which free slots cover [start, end)" question is a bisect plus a short scan
+    instead of a multi-join query. Buckets are loaded lazily on first use and
+    kept in sync through the availability signals. Recurring slots contribute
+    virtual occurrences expanded from their rule, never materialized rows.
+    Time the interviewer is busy in Google Calendar is cut out of the slots.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._buckets: Dict[datetime.date, _DateBucket] = {}
+        self._slot_dates: Dict[int, datetime.date] = {}
+
+    def _load(self, date: datetime.date) -> List[AvailabilitySlot]:
+        from dashboard.models import InterviewerAvailability
+
+        rows = (
+            InterviewerAvailability.objects.filter(date=date, booked_by__isnull=True)
+            .order_by("start_time", "end_time", "id")
+            .values_list("start_time", "end_time", "id", "interviewer_id")
+        )
+        slots = [AvailabilitySlot(*row, date) for row in rows]
+
+        recurring = (
+            InterviewerAvailability.objects.filter(
+                recurrence_rule__isnull=False, date__lt=date, booked_by__isnull=True
+            )
+            .exclude(recurrence_rule="")
+            .values_list(
+                "start_time",
+                "end_time",
+                "id",
+                "interviewer_id",
+                "date",
+                "recurrence_rule",
+                "recurrence_exceptions",
+            )
+        )
+        for start_time, end_time, slot_id, interviewer_id, *series in recurring:
+            if date in occurrence_dates(series[1], series[0], start_time, series[2]):
+                slots.append(
+                    AvailabilitySlot(
+                        start_time, end_time, slot_id, interviewer_id, date, True
+                    )
+                )
+
+        busy = _busy_times(date)
+        return sorted(
+            part
+            for slot in slots
+            for part in _free_parts(slot, busy.get(slot.interviewer_id, ()))
+        )
+
+    def _evict_past(self) -> None:
+        today = datetime.date.today()
+        for date in [date for date in self._buckets if date < today]:
+            self._drop(date)
+
+    def _drop(self, date: datetime.date) -> None:
+        bucket = self._buckets.pop(date, None)
+        if bucket:
+            for slot in bucket.slots:
+                if not slot.is_recurring:
+                    self._slot_dates.pop(slot.id, None)
+
+    def _bucket(self, date: datetime.date) -> _DateBucket:
+        generation = _get_generation(date)
+        recurring_generation = get_generation(RECURRING_GENERATION_CACHE_KEY)
+        with self._lock:
+            bucket = self._buckets.get(date)
+            if (
+                bucket
+                and generation is not None
+                and bucket.generation == generation
+                and bucket.recurring_generation == recurring_generation
+            ):
+                return bucket
+
+        slots = self._load(date)
+        bucket = _DateBucket(generation, recurring_generation, slots)
+        with self._lock:
+            self._drop(date)
+            if generation is not None and recurring_generation is not None:
+                self._evict_past()
+                self._buckets[date] = bucket
+                for slot in slots:
+                    if not slot.is_recurring:
+                        self._slot_dates[slot.id] = date
+        return bucket
+
+    def find_slots(
+        self,
+        date: datetime.date,
+        interviewer_ids: Optional[Iterable[int]] = None,
+        start_time: Optional[datetime.time] = None,
+        end_time: Optional[datetime.time] = None,
+    ) -> List[AvailabilitySlot]:
+        """
+        returns the free slots of the date that start at or before start_time and
+        end at or after end_time, optionally limited to the given interviewers.
+        """
+        slots = self._bucket(date).slots
+        if start_time is not None:
+            slots = slots[: bisect.bisect_right(slots, start_time, key=lambda s: s[0])]
+        if end_time is not None:
+            slots = [slot for slot in slots if slot.end_time >= end_time]
+        if interviewer_ids is not None:
+            interviewer_ids = set(interviewer_ids)
+            slots = [slot for slot in slots if slot.interviewer_id in interviewer_ids]
+        return list(slots)
+
+    def load_slots(self, date: datetime.date) -> List[AvailabilitySlot]:
+        """the free slots of the date read from the database, bypassing the cache."""
+        return self._load(date)
+
+    def refresh_slot(
+        self,
+        slot_id: int,
+        interviewer_id: int,
+        date: datetime.date,
+        start_time: datetime.time,
+        end_time: datetime.time,
+        is_free: bool,
+    ) -> None:
+        """
+        applies a saved slot to the index. Call it after the transaction that
+        saved the slot has committed.
+        """
+        with self._lock:
+            previous_date = self._slot_dates.get(slot_id)
+        if previous_date and previous_date != date:
+            self.remove_slot(slot_id, previous_date)
+        busy = _busy_times(date, [interviewer_id]) if is_free else {}
+
+        generation = _bump_generation(date)
+        with self._lock:
+            bucket = self._buckets.get(date)
+            if not bucket:
+                return
+            if generation is None or bucket.generation != generation - 1:
+                self._drop(date)
+                return
+            bucket.slots = [
+                slot for slot in bucket.slots if slot.id != slot_id or slot.is_recurring
+            ]
+            self._slot_dates.pop(slot_id, None)
+            if is_free:
+                slot = AvailabilitySlot(
+                    start_time, end_time, slot_id, interviewer_id, date
+                )
+                for part in _free_parts(slot, busy.get(interviewer_id, ())):
+                    bisect.insort(bucket.slots, part)
+                self._slot_dates[slot_id] = date
+            bucket.generation = generation
+
+    def remove_slot(self, slot_id: int, date: datetime.date) -> None:
+        generation = _bump_generation(date)
+        with self._lock:
+            bucket = self._buckets.get(date)
+            if not bucket:
+                return
+            if generation is None or bucket.generation != generation - 1:
+                self._drop(date)
+                return
+            bucket.slots = [
+                slot for slot in bucket.slots if slot.id != slot_id or slot.is_recurring
+            ]
+            self._slot_dates.pop(slot_id, None)
+            bucket.generation = generation
+
+    def invalidate(self, date: datetime.date) -> None:
+        """drops the date everywhere; used after bulk writes that skip signals."""
+        _bump_generation(date)
+        with self._lock:
+            self._drop(date)
+
+    def invalidate_recurring(self) -> None:
+        """drops every date everywhere; used when a recurring slot changes."""
+        bump_generation(RECURRING_GENERATION_CACHE_KEY)
+        with self._lock:
+            for date in list(self._buckets):
+                self._drop(date)
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,144 @@
+"""
+Compare-and-swap transitions of the booking flow. Each helper issues a single
+conditional UPDATE guarded by the row's version and returns whether it won,
+so the losers of a race back off without any row held locked across the flow.
+A closed attempt is also flagged in the cache, so the clicks that lose a
+fan-out race are turned away before they touch the database.
+"""
+
+import datetime
+from typing import Iterable
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .availability_index import availability_index
+from .capacity import schedule_capacity_refresh
+from .time_grid import schedule_day_grid_rebuild
+
+# links of an attempt expire after an hour, the flag only has to outlive them
+ATTEMPT_CLOSED_TIMEOUT = 60 * 60 * 24
+
+
+def _closed_key(attempt_id) -> str:
+    return f"schedule_attempt:{attempt_id}:closed"
+
+
+def mark_attempts_closed(attempt_ids: Iterable) -> None:
+    """flags the attempts as closed once the surrounding transaction commits."""
+    keys = {_closed_key(attempt_id): True for attempt_id in attempt_ids}
+    if not keys:
+        return
+
+    def _flag():
+        try:
+            cache.set_many(keys, timeout=ATTEMPT_CLOSED_TIMEOUT)
+        except Exception:
+            # the attempt status check still rejects late clicks, just slower
+            pass
+
+    transaction.on_commit(_flag)
+
+
+def is_attempt_closed(attempt_id) -> bool:
+    """
+    cheap negative check for a link click: True only when the attempt is known
+    to be closed, False when it is open or the cache can't tell.
+    """
+    try:
+        return bool(cache.get(_closed_key(attempt_id)))
+    except Exception:
+        return False
+
+
+def transition_attempt(attempt, from_status: str, to_status: str) -> bool:
+    from dashboard.models import InterviewScheduleAttempt
+
+    updated = InterviewScheduleAttempt.objects.filter(
+        pk=attempt.pk, status=from_status, version=attempt.version
+    ).update(status=to_status, version=F("version") + 1, updated_at=timezone.now())
+    if updated and to_status != "OPEN":
+        mark_attempts_closed([attempt.pk])
+    return bool(updated)
+
+
+def cancel_open_attempts(candidate) -> None:
+    """closes every open attempt of the candidate, e.g. before a new one starts."""
+    from dashboard.models import InterviewScheduleAttempt, InterviewScheduleRecipient
+
+    attempts = InterviewScheduleAttempt.objects.filter(
+        candidate=candidate, status="OPEN"
+    )
+    attempt_ids = list(attempts.values_list("pk", flat=True))
+    if not attempt_ids:
+        return
+    attempts.filter(pk__in=attempt_ids).update(
+        status="CANCELLED", version=F("version") + 1, updated_at=timezone.now()
+    )
+    InterviewScheduleRecipient.objects.filter(
+        attempt_id__in=attempt_ids, status="PENDING"
+    ).update(status="WITHDRAWN", updated_at=timezone.now())
+    mark_attempts_closed(attempt_ids)
+
+
+def withdraw_other_recipients(attempt, availability_id: int) -> list:
+    """
+    marks the accepting recipient of a booked attempt and withdraws the other
+    pending ones; returns the withdrawn recipients with their interviewers.
+    """
+    from dashboard.models import InterviewScheduleRecipient
+
+    now = timezone.now()
+    recipients = InterviewScheduleRecipient.objects.filter(attempt=attempt)
+    recipients.filter(availability_id=availability_id).update(
+        status="ACCEPTED", updated_at=now
+    )
+    withdrawn = list(
+        recipients.filter(status="PENDING")
+        .exclude(availability_id=availability_id)
+        .select_related("interviewer")
+    )
+    recipients.filter(pk__in=[recipient.pk for recipient in withdrawn]).update(
+        status="WITHDRAWN", updated_at=now
+    )
+    return withdrawn
+
+
+def book_slot(
+    availability,
+    booked_by_id: int,
+    start_time: datetime.time,
+    end_time: datetime.time,
+) -> bool:
+    """
+    marks a free slot booked and narrows it to the interview time, unless it was
+    booked or changed since it was read. Only bookings move version, so the
+    slot's date and times are compared as well: an ordinary save() or a
+    compaction that moved them makes the before/after split of the caller stale.
+    """
+    from dashboard.models import InterviewerAvailability
+
+    updated = InterviewerAvailability.objects.filter(
+        pk=availability.pk,
+        version=availability.version,
+        booked_by__isnull=True,
+        date=availability.date,
+        start_time=availability.start_time,
+        end_time=availability.end_time,
+    ).update(
+        booked_by_id=booked_by_id,
+        is_scheduled=True,
+        start_time=start_time,
+        end_time=end_time,
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        return False
+
+    # update() skips the signals that keep the slot index and day grid in sync
+    slot_id, date = availability.pk, availability.date
+    transaction.on_commit(lambda: availability_index.remove_slot(slot_id, date))
+    schedule_day_grid_rebuild(availability.interviewer_id, date)
+    schedule_capacity_refresh([date])
+    return True
@@ -0,0 +1,215 @@
+"""
+Precomputed capacity cube for the ops heatmap: free interviewer minutes per
+date x hour x domain x strength (AvailabilityCapacity), next to the NSCH
+candidates waiting per domain x strength (CandidateDemand). Supply is read
+from the availability index, so recurring occurrences count and calendar busy
+time does not; a free slot counts once in every domain its interviewer is
+assigned to. Both tables are refreshed per changed date or demand key once the
+transaction that changed them commits, and rebuilt in full every night.
+"""
+
+import datetime
+import threading
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, Q
+from .availability_index import availability_index
+from .recurrence import get_horizon_days
+
+_pending = threading.local()
+
+
+def _interviewer_profiles(
+    interviewer_ids: Iterable[int],
+) -> Dict[int, Tuple[str, List[str]]]:
+    """interviewer id -> (strength, assigned domain names)."""
+    from dashboard.models import InternalInterviewer
+
+    profiles: Dict[int, Tuple[str, List[str]]] = {}
+    rows = InternalInterviewer.objects.filter(id__in=set(interviewer_ids)).values_list(
+        "id", "strength", "assigned_domains__name"
+    )
+    for interviewer_id, strength, domain in rows:
+        profile = profiles.setdefault(interviewer_id, (strength or "", []))
+        if domain:
+            profile[1].append(domain)
+    return profiles
+
+
+def _hour_parts(start: datetime.time, end: datetime.time):
+    """(hour, minutes) of [start, end) split at the hour boundaries."""
+    start_minute = start.hour * 60 + start.minute
+    end_minute = end.hour * 60 + end.minute if end != datetime.time.min else 24 * 60
+    while start_minute < end_minute:
+        hour = start_minute // 60
+        part_end = min(end_minute, (hour + 1) * 60)
+        yield hour, part_end - start_minute
+        start_minute = part_end
+
+
+def compute_capacity(date: datetime.date) -> list:
+    """the unsaved AvailabilityCapacity rows of date."""
+    from dashboard.models import AvailabilityCapacity
+
+    # read past the cache: a refresh may run before this process saw the change
+    slots = availability_index.load_slots(date)
+    profiles = _interviewer_profiles(slot.interviewer_id for slot in slots)
+    # (hour, domain, strength) -> interviewer id -> free minutes in the hour
+    cells: Dict[Tuple[int, str, str], Dict[int, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    for slot in slots:
+        strength, domains = profiles.get(slot.interviewer_id, ("", []))
+        for hour, length in _hour_parts(slot.start_time, slot.end_time):
+            for domain in domains:
+                cells[(hour, domain, strength)][slot.interviewer_id] += length
+    return [
+        AvailabilityCapacity(
+            date=date,
+            hour=hour,
+            domain=domain,
+            strength=strength,
+            # overlapping slots of one interviewer count once
+            free_minutes=sum(min(length, 60) for length in free.values()),
+            interviewers=len(free),
+        )
+        for (hour, domain, strength), free in cells.items()
+    ]
+
+
+def refresh_capacity(dates: Iterable[datetime.date]) -> int:
+    """recomputes the cube rows of the given dates; past dates are dropped."""
+    from dashboard.models import AvailabilityCapacity
+
+    today = datetime.date.today()
+    dates = sorted(set(dates))
+    rows = [row for date in dates if date >= today for row in compute_capacity(date)]
+    with transaction.atomic():
+        AvailabilityCapacity.objects.filter(date__in=dates).delete()
+        AvailabilityCapacity.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_demand(keys: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+    """
+    recounts the waiting candidates of the given (domain, strength) keys, or
+    of every key when none are given; returns the number of rows written.
+    """
+    from dashboard.models import Candidate, CandidateDemand
+
+    candidates = Candidate.objects.filter(status="NSCH")
+    stale = CandidateDemand.objects.all()
+    if keys is not None:
+        keys = set(keys)
+        if not keys:
+            return 0
+        domains = {domain for domain, _ in keys}
+        matching = Q(designation__name__in=domains)
+        if "" in domains:
+            matching |= Q(designation__isnull=True)
+        candidates = candidates.filter(matching)
+        stale = stale.filter(
+            reduce(
+                or_, (Q(domain=domain, strength=strength) for domain, strength in keys)
+            )
+        )
+
+    counts = defaultdict(int)
+    for domain, strength, total in (
+        candidates.values_list("designation__name", "specialization")
+        .annotate(total=Count("id"))
+        .order_by()
+    ):
+        counts[(domain or "", strength or "")] += total
+    rows = [
+        CandidateDemand(domain=domain, strength=strength, waiting_candidates=total)
+        for (domain, strength), total in counts.items()
+        if keys is None or (domain, strength) in keys
+    ]
+    with transaction.atomic():
+        stale.delete()
+        CandidateDemand.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_capacity() -> None:
+    """full rebuild: every date from today to the last future slot or horizon."""
+    from dashboard.models import AvailabilityCapacity, InterviewerAvailability
+
+    today = datetime.date.today()
+    last = max(
+        InterviewerAvailability.objects.filter(date__gte=today)
+        .order_by("-date")
+        .values_list("date", flat=True)
+        .first()
+        or today,
+        today + datetime.timedelta(days=get_horizon_days()),
+    )
+    AvailabilityCapacity.objects.filter(date__lt=today).delete()
+    refresh_capacity(
+        today + datetime.timedelta(days=offset)
+        for offset in range((last - today).days + 1)
+    )
+    refresh_demand()
+
+
+def horizon_dates() -> List[datetime.date]:
+    today = datetime.date.today()
+    return [
+        today + datetime.timedelta(days=offset) for offset in range(get_horizon_days())
+    ]
+
+
+def _schedule(kind: str, values: Iterable) -> None:
+    """
+    adds values to the refresh of this thread's transaction, queuing the
+    refresh task on the first call. A rolled back transaction drops its
+    on_commit callback, and with it the pending values.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(_pending, kind, None)
+    if pending is not None and any(
+        entry[1] is pending[1] for entry in connection.run_on_commit
+    ):
+        pending[0].update(values)
+        return
+
+    values = set(values)
+
+    def enqueue():
+        from dashboard.tasks import (
+            refresh_availability_capacity,
+            refresh_candidate_demand,
+        )
+
+        if getattr(_pending, kind, None) is state:
+            setattr(_pending, kind, None)
+        if not values:
+            return
+        if kind == "dates":
+            refresh_availability_capacity.delay(
+                sorted(date.isoformat() for date in values)
+            )
+        else:
+            refresh_candidate_demand.delay(sorted(values))
+
+    state = (values, enqueue)
+    setattr(_pending, kind, state)
+    transaction.on_commit(enqueue)
+
+
+def schedule_capacity_refresh(dates: Iterable[datetime.date]) -> None:
+    """
+    refreshes the cube of the dates once the current transaction commits;
+    every date queued within one transaction goes to a single task.
+    """
+    today = datetime.date.today()
+    _schedule("dates", (date for date in dates if date and date >= today))
+
+
+def schedule_demand_refresh(keys: Iterable[Tuple[str, str]]) -> None:
+    """refreshes the demand of the (domain, strength) keys after commit."""
+    _schedule("keys", ((domain or "", strength or "") for domain, strength in keys))
@@ -0,0 +1,192 @@
+"""
+Housekeeping of InterviewerAvailability. Accepting a request splits the slot
+into the booked part and free before/after fragments, and nothing ever
+removed past rows, so the table only grew. The nightly job
+
+- merges touching free fragments of an interviewer day back into one slot,
+  as long as they come from the same calendar event and nothing refers to
+  them, and
+- moves past unbooked slots to ArchivedInterviewerAvailability in chunks.
+  Slots an Interview refers to stay, as do recurring series, whose past
+  first row still yields future occurrences.
+
+Answered interview requests of a removed slot stay too, with their slot
+emptied (SET_NULL): interviewer ranking counts them.
+
+Neither step touches Google Calendar: fragments share the event of the slot
+they were cut from, and past events are left as history.
+"""
+
+import datetime
+from itertools import groupby
+from typing import Dict, List, Set, Tuple
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from .availability_index import availability_index
+from .capacity import schedule_capacity_refresh
+from .time_grid import schedule_day_grid_rebuild
+
+CHUNK_SIZE = 1000
+
+
+def _unreferenced(queryset):
+    """slots no interview, pending request or pending calendar write points at."""
+    from dashboard.models import (
+        CalendarWriteOperation,
+        Interview,
+        InterviewScheduleRecipient,
+    )
+
+    return queryset.exclude(
+        Exists(Interview.object_all.filter(availability=OuterRef("pk")))
+    ).exclude(
+        Exists(
+            InterviewScheduleRecipient.objects.filter(
+                availability=OuterRef("pk"), status="PENDING"
+            )
+        )
+        | Exists(
+            CalendarWriteOperation.objects.filter(
+                availability=OuterRef("pk"), status__in=["PENDING", "PROCESSING"]
+            )
+        )
+    )
+
+
+def _merge_groups(rows: List[tuple]) -> Tuple[Dict[int, datetime.time], Set[int]]:
+    """
+    folds the rows of one interviewer day, sorted by start time, into
+    (kept slot id -> new end time, ids of the slots merged into it).
+    """
+    extended, merged = {}, set()
+    keeper = None
+    for slot_id, start_time, end_time, calendar_id in rows:
+        if keeper and start_time <= keeper[2] and calendar_id == keeper[3]:
+            merged.add(slot_id)
+            if end_time > keeper[2]:
+                keeper[2] = end_time
+                extended[keeper[0]] = end_time
+            continue
+        keeper = [slot_id, start_time, end_time, calendar_id]
+    return extended, merged
+
+
+def merge_free_fragments(chunk_size: int = CHUNK_SIZE) -> int:
+    """merges the touching free fragments of today and later; returns rows removed."""
+    from dashboard.models import InterviewerAvailability
+
+    slots = _unreferenced(
+        InterviewerAvailability.objects.filter(
+            date__gte=timezone.localdate(), booked_by__isnull=True
+        ).filter(Q(recurrence_rule__isnull=True) | Q(recurrence_rule=""))
+    )
+    rows = slots.order_by(
+        "interviewer_id", "date", "start_time", "end_time"
+    ).values_list(
+        "interviewer_id", "date", "id", "start_time", "end_time", "google_calendar_id"
+    )
+
+    removed = 0
+    # (interviewer id, date) -> (kept slot id -> new end time, merged ids)
+    days: Dict[Tuple[int, datetime.date], tuple] = {}
+
+    def flush():
+        nonlocal removed
+        if not days:
+            return
+        with transaction.atomic():
+            ids = {
+                slot_id
+                for extended, merged in days.values()
+                for slot_id in [*extended, *merged]
+            }
+            # a slot booked since it was read keeps its whole day as it is
+            still_free = set(
+                InterviewerAvailability.objects.select_for_update()
+                .filter(pk__in=ids, booked_by__isnull=True)
+                .values_list("pk", flat=True)
+            )
+            extended, merged = {}, set()
+            for day, (day_extended, day_merged) in list(days.items()):
+                if still_free.issuperset([*day_extended, *day_merged]):
+                    extended.update(day_extended)
+                    merged.update(day_merged)
+                else:
+                    del days[day]
+
+            # deleting first keeps the extended slots clear of the unique key
+            removed += (
+                InterviewerAvailability.objects.filter(pk__in=merged)
+                .delete()[1]
+                .get(InterviewerAvailability._meta.label, 0)
+            )
+            keepers = list(InterviewerAvailability.objects.filter(pk__in=extended))
+            for slot in keepers:
+                slot.end_time = extended[slot.pk]
+            InterviewerAvailability.objects.bulk_update(keepers, ["end_time"])
+            # bulk_update skips the signals that keep the index and grids in sync
+            dates = {date for _, date in days}
+            transaction.on_commit(
+                lambda: [availability_index.invalidate(date) for date in dates]
+            )
+            for interviewer_id, date in days:
+                schedule_day_grid_rebuild(interviewer_id, date)
+            schedule_capacity_refresh(dates)
+        days.clear()
+
+    pending = 0
+    for day, day_rows in groupby(rows.iterator(), key=lambda row: row[:2]):
+        day_extended, day_merged = _merge_groups([row[2:] for row in day_rows])
+        if day_merged:
+            days[day] = (day_extended, day_merged)
+            pending += len(day_merged)
+        if pending >= chunk_size:
+            flush()
+            pending = 0
+    flush()
+    return removed
+
+
+def archive_past_slots(chunk_size: int = CHUNK_SIZE) -> int:
+    """moves the past unbooked slots to the archive; returns rows moved."""
+    from dashboard.models import (
+        ArchivedInterviewerAvailability,
+        InterviewerAvailability,
+    )
+
+    past = _unreferenced(
+        InterviewerAvailability.objects.filter(
+            date__lt=timezone.localdate(), booked_by__isnull=True
+        ).filter(Q(recurrence_rule__isnull=True) | Q(recurrence_rule=""))
+    )
+    moved = 0
+    while True:
+        with transaction.atomic():
+            slots = list(
+                past.select_for_update(skip_locked=True)
+                .order_by("id")
+                .values(
+                    "id",
+                    "interviewer_id",
+                    "date",
+                    "start_time",
+                    "end_time",
+                    "notes",
+                    "google_calendar_id",
+                )[:chunk_size]
+            )
+            if not slots:
+                return moved
+            ids = [slot["id"] for slot in slots]
+            ArchivedInterviewerAvailability.objects.bulk_create(
+                [
+                    ArchivedInterviewerAvailability(original_id=slot.pop("id"), **slot)
+                    for slot in slots
+                ],
+                ignore_conflicts=True,
+            )
+            # past slots are out of the index and grids already, so the
+            # delete signals have nothing to update (see signals.py)
+            InterviewerAvailability.objects.filter(pk__in=ids).delete()
+        moved += len(ids)
@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from .generation import get_generation, bump_generation
+from .skill_index import skill_index
+
+GENERATION_CACHE_KEY = "eligibility_index:generation"
+
+
+def get_interviewer_levels(client_level: int) -> List[int]:
+    """interviewer levels allowed to take interviews of a client of this level."""
+    if client_level in [2, 3]:
+        return list(range(client_level - 1, client_level + 1))
+    return [client_level]
+
+
+class _EligibilityEntry(NamedTuple):
+    # column arrays aligned on interviewer id, ids sorted ascending
+    ids: np.ndarray
+    experience: np.ndarray
+    companies: np.ndarray
+
+
+class EligibilityIndex:
+    """
+    Per-process cache of the interviewers matching a (job name, specialization,
+    client level) key. The per-candidate rules, experience gap and company
+    exclusion, are applied as vectorized masks over the cached columns, so a
+    lookup costs no query once the key is warm. Interviewer and domain changes
+    move the shared generation, which drops every key.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._entries: Dict[Tuple[str, str, int], _EligibilityEntry] = {}
+
+    def _load(self, job_name: str, specialization: str, client_level: int):
+        from dashboard.models import InternalInterviewer
+
+        rows = list(
+            InternalInterviewer.object_all.filter(
+                assigned_domains__name=job_name,
+                strength=specialization,
+                interviewer_level__in=get_interviewer_levels(client_level),
+            )
+            .order_by("id")
+            .distinct()
+            .values_list("id", "total_experience_years", "current_company")
+        )
+        return _EligibilityEntry(
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([row[1] or 0 for row in rows], dtype=np.int64),
+            np.array([(row[2] or "").casefold() for row in rows], dtype=object),
+        )
+
+    def _entry(self, job_name: str, specialization: str, client_level: int):
+        generation = get_generation(GENERATION_CACHE_KEY)
+        key = (job_name, specialization, client_level)
+        with self._lock:
+            if generation is None or generation != self._generation:
+                self._entries = {}
+                self._generation = generation
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(job_name, specialization, client_level)
+            if generation is not None:
+                with self._lock:
+                    if self._generation == generation:
+                        self._entries[key] = entry
+        return entry
+
+    def lookup(
+        self,
+        job_name: str,
+        specialization: str,
+        client_level: int,
+        experience: int,
+        company: str,
+    ) -> np.ndarray:
+        """sorted ids of the interviewers eligible for the candidate."""
+        entry = self._entry(job_name, specialization, client_level)
+        mask = (entry.experience >= experience + 2) & (
+            entry.companies != (company or "").casefold()
+        )
+        return entry.ids[mask]
+
+    def invalidate(self) -> None:
+        bump_generation(GENERATION_CACHE_KEY)
+        with self._lock:
+            self._entries = {}
+            self._generation = None
+
+
+eligibility_index = EligibilityIndex()
+
+
+def get_eligible_interviewer_ids(
+    job, specialization: str, experience: int, company: str, client_level: int
+) -> Set[int]:
+    """
+    ids of the interviewers allowed to interview a candidate: at least one of
+    the job's mandatory skills, the job's domain, the candidate's strength,
+    two more years of experience, a matching level and a different company.
+    """
+    skilled_interviewer_ids = skill_index.match_any(job.mandatory_skills or [])
+    if not skilled_interviewer_ids:
+        return set()
+
+    eligible_ids = eligibility_index.lookup(
+        job.name, specialization, client_level, experience, company
+    )
+    skilled = np.fromiter(skilled_interviewer_ids, dtype=np.int64)
+    return set(eligible_ids[np.isin(eligible_ids, skilled)].tolist())
@@ -0,0 +1,30 @@
+import time
+from typing import Optional
+from django.core.cache import cache
+
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def get_generation(key: str) -> Optional[int]:
+    """
+    returns the shared generation stored under key, 0 when it was never bumped
+    and None when the cache can't be reached (callers should not keep local state then).
+    """
+    try:
+        return cache.get(key, 0)
+    except Exception:
+        return None
+
+
+def bump_generation(key: str) -> Optional[int]:
+    """
+    increments the shared generation so every process drops its local copy on
+    the next lookup. The counter is seeded from the clock so an expired key never
+    comes back with a value somebody is still holding.
+    """
+    try:
+        if cache.add(key, time.time_ns(), timeout=GENERATION_TIMEOUT):
+            return cache.get(key)
+        return cache.incr(key)
+    except Exception:
+        return None
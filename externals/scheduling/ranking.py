@@ -0,0 +1,185 @@
+import datetime
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from django.db.models import Count, Q
+from django.utils import timezone
+from .availability_index import AvailabilitySlot
+from .skill_index import normalize_skills, skill_index
+
+# relative weight of every signal in the final score, summing to 1
+WEIGHTS = {
+    "skills": 0.35,
+    "experience": 0.2,
+    "acceptance": 0.2,
+    "load": 0.15,
+    "time_of_day": 0.1,
+}
+# best experience surplus over the mandatory two-year gap, and its tolerance
+IDEAL_EXTRA_EXPERIENCE = 3
+EXPERIENCE_SPREAD = 4
+# without a requested time, slots inside working hours are preferred
+PREFERRED_HOURS = (10, 18)
+ACCEPTANCE_LOOKBACK = datetime.timedelta(days=90)
+# the accept link of an interview request stops working after this
+REQUEST_EXPIRY = datetime.timedelta(hours=1)
+LOAD_WINDOW = datetime.timedelta(days=14)
+STATS_TTL = 300
+
+
+class _StatsCache:
+    """
+    short lived per-process cache of the per-interviewer columns; they move
+    slowly and a few minutes of staleness does not change a ranking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[int, Tuple[float, int, float, int]] = {}
+
+    def get(self, interviewer_ids: np.ndarray) -> np.ndarray:
+        now = time.monotonic()
+        with self._lock:
+            rows = {
+                interviewer_id: self._rows.get(interviewer_id)
+                for interviewer_id in interviewer_ids.tolist()
+            }
+        missing = [
+            interviewer_id
+            for interviewer_id, row in rows.items()
+            if row is None or row[0] < now
+        ]
+        if missing:
+            loaded = _load_stats(missing)
+            expires = now + STATS_TTL
+            for interviewer_id in missing:
+                rows[interviewer_id] = (
+                    expires,
+                    *loaded.get(interviewer_id, (0, 0.5, 0)),
+                )
+            with self._lock:
+                self._rows.update({key: rows[key] for key in missing})
+        return np.array(
+            [rows[interviewer_id][1:] for interviewer_id in interviewer_ids.tolist()],
+            dtype=np.float64,
+        ).reshape(len(interviewer_ids), 3)
+
+
+def _load_stats(interviewer_ids: Sequence[int]) -> Dict[int, Tuple[int, float, int]]:
+    """
+    (experience, acceptance rate, recent load) per interviewer. The acceptance
+    rate is the share of interview requests the interviewer accepted out of
+    those accepted, rejected or left to expire, smoothed towards 0.5; requests
+    withdrawn because another interviewer accepted first do not count.
+    """
+    from dashboard.models import (
+        InternalInterviewer,
+        Interview,
+        InterviewScheduleRecipient,
+    )
+
+    now = timezone.now()
+    experience = dict(
+        InternalInterviewer.object_all.filter(pk__in=interviewer_ids).values_list(
+            "id", "total_experience_years"
+        )
+    )
+    outcomes = {
+        row["interviewer_id"]: row
+        for row in InterviewScheduleRecipient.objects.filter(
+            interviewer_id__in=interviewer_ids,
+            created_at__gte=now - ACCEPTANCE_LOOKBACK,
+        )
+        .values("interviewer_id")
+        .annotate(
+            accepted=Count("id", filter=Q(status="ACCEPTED")),
+            declined=Count(
+                "id",
+                filter=Q(status="REJECTED")
+                | Q(status="PENDING", created_at__lt=now - REQUEST_EXPIRY),
+            ),
+        )
+    }
+    load = dict(
+        Interview.object_all.filter(
+            interviewer_id__in=interviewer_ids,
+            scheduled_time__gte=now - LOAD_WINDOW,
+            scheduled_time__lte=now + LOAD_WINDOW,
+        )
+        .exclude(status="RESCH")
+        .values("interviewer_id")
+        .annotate(recent=Count("id"))
+        .values_list("interviewer_id", "recent")
+    )
+    stats = {}
+    for interviewer_id in interviewer_ids:
+        row = outcomes.get(interviewer_id, {"accepted": 0, "declined": 0})
+        stats[interviewer_id] = (
+            experience.get(interviewer_id) or 0,
+            (row["accepted"] + 1) / (row["accepted"] + row["declined"] + 2),
+            load.get(interviewer_id, 0),
+        )
+    return stats
+
+
+stats_cache = _StatsCache()
+
+
+def _minutes(values: Iterable[datetime.time]) -> np.ndarray:
+    return np.fromiter(
+        (value.hour * 60 + value.minute for value in values), dtype=np.float64
+    )
+
+
+def rank_slots(
+    slots: Sequence[AvailabilitySlot],
+    skills: Iterable[str],
+    experience: int,
+    preferred_time: Optional[datetime.time] = None,
+    top_k: Optional[int] = None,
+) -> List[Tuple[AvailabilitySlot, float]]:
+    """
+    scores every slot in one pass over column arrays and returns the best
+    top_k (all when None) as (slot, score) pairs, highest score first.
+    """
+    if not slots:
+        return []
+    # synonyms of one skill count once, as they do in the overlap
+    skills = normalize_skills(skills)
+    slot_interviewers = np.fromiter(
+        (slot.interviewer_id for slot in slots), dtype=np.int64, count=len(slots)
+    )
+    interviewer_ids, slot_index = np.unique(slot_interviewers, return_inverse=True)
+
+    stats = stats_cache.get(interviewer_ids)
+    experience_surplus = stats[:, 0] - (experience + 2)
+    interviewer_scores = (
+        WEIGHTS["skills"]
+        * skill_index.overlap(skills, interviewer_ids)
+        / max(len(skills), 1)
+        + WEIGHTS["experience"]
+        * np.exp(
+            -(((experience_surplus - IDEAL_EXTRA_EXPERIENCE) / EXPERIENCE_SPREAD) ** 2)
+        )
+        + WEIGHTS["acceptance"] * stats[:, 1]
+        + WEIGHTS["load"] / (1 + stats[:, 2])
+    )
+
+    starts = _minutes(slot.start_time for slot in slots)
+    if preferred_time is not None:
+        time_scores = np.exp(-np.abs(starts - _minutes([preferred_time])[0]) / 180)
+    else:
+        time_scores = np.where(
+            (starts >= PREFERRED_HOURS[0] * 60) & (starts < PREFERRED_HOURS[1] * 60),
+            1.0,
+            0.5,
+        )
+    scores = interviewer_scores[slot_index] + WEIGHTS["time_of_day"] * time_scores
+
+    if top_k is not None and top_k < len(scores):
+        best = np.argpartition(-scores, top_k)[:top_k]
+    else:
+        best = np.arange(len(scores))
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(slots[index], round(float(scores[index]), 4)) for index in best.tolist()]
@@ -0,0 +1,216 @@
+import datetime
+import functools
+import logging
+from typing import FrozenSet, Iterable, Iterator
+from dateutil.rrule import rrulestr
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# occurrences are expanded from today up to this many days ahead
+DEFAULT_HORIZON_DAYS = 90
+
+
+def get_horizon_days() -> int:
+    return getattr(
+        settings, "RECURRING_AVAILABILITY_HORIZON_DAYS", DEFAULT_HORIZON_DAYS
+    )
+
+
+def parse_rule(rule: str, date: datetime.date, start_time: datetime.time):
+    """
+    parses an RRULE string anchored at the first occurrence. The anchor is made
+    aware because the UNTIL part generated for Google Calendar is in UTC.
+    """
+    return rrulestr(
+        rule,
+        dtstart=timezone.make_aware(datetime.datetime.combine(date, start_time)),
+    )
+
+
+def iter_occurrence_dates(
+    rule: str,
+    date: datetime.date,
+    start_time: datetime.time,
+    window_start: datetime.date,
+    window_end: datetime.date,
+    exceptions: Iterable[str] = (),
+) -> Iterator[datetime.date]:
+    """
+    lazily yields the occurrence dates of a rule inside [window_start,
+    window_end], skipping the master's own date and the exception dates.
+    """
+    exceptions = set(exceptions)
+    occurrences = parse_rule(rule, date, start_time).xafter(
+        timezone.make_aware(
+            datetime.datetime.combine(max(window_start, date), datetime.time.min)
+        ),
+        inc=True,
+    )
+    for occurrence in occurrences:
+        occurrence_date = timezone.localtime(occurrence).date()
+        if occurrence_date > window_end:
+            return
+        if occurrence_date != date and occurrence_date.isoformat() not in exceptions:
+            yield occurrence_date
+
+
+@functools.lru_cache(maxsize=4096)
+def _expand(
+    rule: str,
+    date: datetime.date,
+    start_time: datetime.time,
+    window_start: datetime.date,
+    window_end: datetime.date,
+    exceptions: FrozenSet[str],
+) -> FrozenSet[datetime.date]:
+    try:
+        return frozenset(
+            iter_occurrence_dates(
+                rule, date, start_time, window_start, window_end, exceptions
+            )
+        )
+    except ValueError as e:
+        logger.warning("Ignoring unparsable recurrence rule %r: %s", rule, e)
+        return frozenset()
+
+
+def occurrence_dates(
+    rule: str,
+    date: datetime.date,
+    start_time: datetime.time,
+    exceptions: Iterable[str] = (),
+) -> FrozenSet[datetime.date]:
+    """
+    occurrence dates of a rule inside the rolling horizon. Expansions are
+    cached by value, so editing the rule or its exceptions misses the cache
+    and the horizon rolls forward once a day.
+    """
+    today = timezone.localdate()
+    return _expand(
+        rule,
+        date,
+        start_time,
+        today,
+        today + datetime.timedelta(days=get_horizon_days()),
+        frozenset(exceptions or ()),
+    )
+
+
+def occurs_on(availability, date: datetime.date) -> bool:
+    """whether a recurring availability has a virtual occurrence on date."""
+    return date in occurrence_dates(
+        availability.recurrence_rule,
+        availability.date,
+        availability.start_time,
+        availability.recurrence_exceptions,
+    )
+
+
+def recurring_overlaps(
+    interviewer,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+) -> bool:
+    """whether [start_time, end_time) overlaps a virtual occurrence on date."""
+    from dashboard.models import InterviewerAvailability
+
+    masters = InterviewerAvailability.objects.filter(
+        interviewer=interviewer,
+        recurrence_rule__isnull=False,
+        date__lt=date,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).exclude(recurrence_rule="")
+    return any(occurs_on(master, date) for master in masters)
+
+
+def _split_rule(master):
+    """
+    the next occurrence date after the master's own date and the rule that
+    generates the rest of the series from there (None for a single date).
+    """
+    exceptions = set(master.recurrence_exceptions or [])
+    skipped = 0
+    next_date = None
+    for occurrence in parse_rule(
+        master.recurrence_rule, master.date, master.start_time
+    ):
+        occurrence_date = timezone.localtime(occurrence).date()
+        if occurrence_date == master.date:
+            continue
+        if occurrence_date.isoformat() not in exceptions:
+            next_date = occurrence_date
+            break
+        skipped += 1
+    if next_date is None:
+        return None, None
+
+    # a COUNT bound series loses the occurrences before its new first date
+    parts = master.recurrence_rule.split(";")
+    for index, part in enumerate(parts):
+        if part.upper().startswith("COUNT="):
+            remaining = int(part.split("=", 1)[1]) - 1 - skipped
+            if remaining <= 1:
+                return next_date, None
+            parts[index] = f"COUNT={remaining}"
+    return next_date, ";".join(parts)
+
+
+def materialize_occurrence(master, date: datetime.date):
+    """
+    returns a concrete slot for one occurrence of a recurring availability so it
+    can be requested and booked like any other slot. Must run inside a
+    transaction holding a lock on master.
+
+    An occurrence on another date becomes its own row and an exception of the
+    series. The master's own date is detached instead: the series moves to a
+    new master on its next occurrence and master becomes a plain slot.
+    Raises ValueError when the series has no occurrence on date.
+    """
+    from dashboard.models import InterviewerAvailability
+
+    if not occurs_on(master, date):
+        raise ValueError(f"Availability {master.pk} does not occur on {date}.")
+    if date != master.date:
+        occurrence, _ = InterviewerAvailability.objects.get_or_create(
+            interviewer=master.interviewer,
+            date=date,
+            start_time=master.start_time,
+            end_time=master.end_time,
+            defaults={"google_calendar_id": master.google_calendar_id},
+        )
+        master.recurrence_exceptions = sorted(
+            set(master.recurrence_exceptions or []) | {date.isoformat()}
+        )
+        master.save(update_fields=["recurrence_exceptions", "updated_at"])
+        return occurrence
+
+    try:
+        next_date, rule = _split_rule(master)
+    except ValueError:
+        next_date = rule = None
+    if next_date:
+        InterviewerAvailability.objects.get_or_create(
+            interviewer=master.interviewer,
+            date=next_date,
+            start_time=master.start_time,
+            end_time=master.end_time,
+            defaults={
+                "google_calendar_id": master.google_calendar_id,
+                "recurrence_rule": rule,
+                "recurrence_exceptions": [
+                    exception
+                    for exception in master.recurrence_exceptions or []
+                    if rule and exception > next_date.isoformat()
+                ],
+            },
+        )
+    master.recurrence_rule = None
+    master.recurrence_exceptions = []
+    master.save(
+        update_fields=["recurrence_rule", "recurrence_exceptions", "updated_at"]
+    )
+    return master
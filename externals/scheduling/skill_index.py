@@ -0,0 +1,144 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from django.db import transaction
+from .generation import get_generation, bump_generation
+
+GENERATION_CACHE_KEY = "skill_index:generation"
+
+# spelling variants folded into one canonical skill name (keys and values are normalized)
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "es6": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "node js": "nodejs",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "angular.js": "angular",
+    "next.js": "nextjs",
+    "expressjs": "express",
+    "express.js": "express",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "aws": "amazon web services",
+    "gcp": "google cloud platform",
+    "dsa": "data structures and algorithms",
+    "rn": "react native",
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """case-folds and trims a skill, collapses whitespace and resolves synonyms."""
+    normalized = re.sub(r"\s+", " ", str(skill)).strip().casefold()
+    return SKILL_SYNONYMS.get(normalized, normalized)
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    normalized = []
+    for skill in skills or []:
+        name = normalize_skill(skill)
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+class SkillIndex:
+    """
+    Per-process inverted index of interviewer skills. Skill names resolve to
+    Skill ids through the normalized dictionary and every skill id owns a
+    posting list of interviewer ids, so job matching is a union or intersection
+    of integer sets. The whole index is reloaded when the shared generation moves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._skill_ids: Dict[str, int] = {}
+        self._postings: Dict[int, Set[int]] = {}
+
+    def _load(self) -> None:
+        from dashboard.models import Skill, InternalInterviewer
+
+        skill_ids = dict(Skill.objects.values_list("name", "id"))
+        postings = defaultdict(set)
+        through = InternalInterviewer.normalized_skills.through
+        for skill_id, interviewer_id in through.objects.values_list(
+            "skill_id", "internalinterviewer_id"
+        ):
+            postings[skill_id].add(interviewer_id)
+        self._skill_ids, self._postings = skill_ids, dict(postings)
+
+    def _refresh(self) -> None:
+        generation = get_generation(GENERATION_CACHE_KEY)
+        with self._lock:
+            if generation is not None and generation == self._generation:
+                return
+            self._load()
+            self._generation = generation
+
+    def _posting_lists(self, skills: Iterable[str]) -> List[Set[int]]:
+        self._refresh()
+        postings = []
+        for name in normalize_skills(skills):
+            skill_id = self._skill_ids.get(name)
+            postings.append(self._postings.get(skill_id, set()))
+        return postings
+
+    def match_any(self, skills: Iterable[str]) -> Set[int]:
+        """interviewer ids having at least one of the skills."""
+        return set().union(*self._posting_lists(skills))
+
+    def match_all(self, skills: Iterable[str]) -> Set[int]:
+        """interviewer ids having every one of the skills."""
+        postings = self._posting_lists(skills)
+        return set.intersection(*postings) if postings else set()
+
+    def overlap(self, skills: Iterable[str], interviewer_ids: np.ndarray) -> np.ndarray:
+        """how many of the skills each of the interviewers has."""
+        counts = np.zeros(len(interviewer_ids), dtype=np.int64)
+        for posting in self._posting_lists(skills):
+            if posting:
+                counts += np.isin(interviewer_ids, np.fromiter(posting, dtype=np.int64))
+        return counts
+
+
+skill_index = SkillIndex()
+
+
+def sync_interviewer_skills(interviewer) -> None:
+    """
+    mirrors interviewer.skills into the normalized Skill dictionary and the
+    interviewer-skill posting table. Must run inside the transaction that saved
+    the interviewer; the index generation moves once it commits.
+    """
+    from dashboard.models import Skill
+
+    names = normalize_skills(interviewer.skills)
+    existing = dict(Skill.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [Skill(name=name) for name in names if name not in existing]
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = dict(Skill.objects.filter(name__in=names).values_list("name", "id"))
+    interviewer.normalized_skills.set(existing.values())
+    transaction.on_commit(lambda: bump_generation(GENERATION_CACHE_KEY))
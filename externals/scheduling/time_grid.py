@@ -0,0 +1,220 @@
+"""
+An interviewer's day is 96 cells of 15 minutes, bit i of a mask being cell i.
+Occupied and interview cells are rounded outwards (a cell counts as soon as
+anything touches it), so a mask check can only ever *skip* an exact query,
+never hide a conflict: "no overlap" answers are always true. With
+quarter-hour aligned times, which is what the UI sends, they are exact.
+"""
+
+import datetime
+import threading
+from typing import Iterable, Optional, Tuple
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+CELL_MINUTES = 15
+CELLS_PER_DAY = 24 * 60 // CELL_MINUTES
+GRID_BYTES = CELLS_PER_DAY // 8
+
+
+def _minutes(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute + (value.second > 0 or value.microsecond > 0)
+
+
+def _range_mask(first_cell: int, last_cell: int) -> int:
+    first_cell, last_cell = max(first_cell, 0), min(last_cell, CELLS_PER_DAY - 1)
+    if last_cell < first_cell:
+        return 0
+    return ((1 << (last_cell - first_cell + 1)) - 1) << first_cell
+
+
+def covering_mask(start: datetime.time, end: datetime.time) -> int:
+    """cells touched by [start, end); end of 00:00 means midnight."""
+    end_minutes = _minutes(end) or 24 * 60
+    return _range_mask(
+        start.hour * 60 // CELL_MINUTES + start.minute // CELL_MINUTES,
+        -(-end_minutes // CELL_MINUTES) - 1,
+    )
+
+
+def point_mask(value: datetime.time) -> int:
+    return 1 << ((value.hour * 60 + value.minute) // CELL_MINUTES)
+
+
+def window_mask(
+    value: datetime.time, before: datetime.timedelta, after: datetime.timedelta
+) -> Optional[int]:
+    """
+    cells touched by [value - before, value + after], or None when the window
+    leaves the day (callers should fall back to an exact query then).
+    """
+    minutes = value.hour * 60 + value.minute
+    start = minutes - int(before.total_seconds() // 60)
+    end = minutes + int(after.total_seconds() // 60)
+    if start < 0 or end >= 24 * 60:
+        return None
+    return _range_mask(start // CELL_MINUTES, end // CELL_MINUTES)
+
+
+def to_bytes(mask: int) -> bytes:
+    return mask.to_bytes(GRID_BYTES, "little")
+
+
+def from_bytes(value: Optional[bytes]) -> int:
+    return int.from_bytes(bytes(value or b""), "little")
+
+
+def build_day_masks(
+    slots: Iterable[Tuple[datetime.time, datetime.time]],
+    interview_times: Iterable[datetime.time],
+) -> Tuple[int, int]:
+    """
+    folds the (start_time, end_time) slots, booked or free, and the interview
+    start times of one interviewer day into (occupied, interview) masks.
+    """
+    occupied = interviews = 0
+    for start_time, end_time in slots:
+        occupied |= covering_mask(start_time, end_time)
+    for interview_time in interview_times:
+        interviews |= point_mask(interview_time)
+    return occupied, interviews
+
+
+def compute_day_masks(interviewer_id: int, date: datetime.date) -> Tuple[int, int]:
+    from dashboard.models import InterviewerAvailability, Interview
+
+    slots = InterviewerAvailability.objects.filter(
+        interviewer_id=interviewer_id, date=date
+    ).values_list("start_time", "end_time")
+    interview_times = Interview.objects.filter(
+        interviewer_id=interviewer_id, status="CSCH", scheduled_time__date=date
+    ).values_list("scheduled_time", flat=True)
+    return build_day_masks(
+        slots, (timezone.localtime(value).time() for value in interview_times)
+    )
+
+
+def rebuild_day_grid(interviewer_id: int, date: datetime.date) -> None:
+    from dashboard.models import InterviewerDayGrid
+
+    occupied, interviews = compute_day_masks(interviewer_id, date)
+    masks = {
+        "occupied_cells": to_bytes(occupied),
+        "interview_cells": to_bytes(interviews),
+    }
+    InterviewerDayGrid.objects.update_or_create(
+        interviewer_id=interviewer_id,
+        date=date,
+        defaults={**masks, "version": F("version") + 1},
+        create_defaults=masks,
+    )
+
+
+_pending = threading.local()
+
+
+def schedule_day_grid_rebuild(interviewer_id: int, date: datetime.date) -> None:
+    """
+    rebuilds the grid once the current transaction commits; repeated calls for
+    the same interviewer day within one transaction collapse into one rebuild.
+    A rolled back transaction drops its on_commit callback, and with it the
+    pending days, so the next transaction schedules them afresh.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(_pending, "state", None)
+    if pending is not None and any(
+        entry[1] is pending[1] for entry in connection.run_on_commit
+    ):
+        pending[0].add((interviewer_id, date))
+        return
+
+    keys = {(interviewer_id, date)}
+
+    def rebuild():
+        if getattr(_pending, "state", None) is state:
+            _pending.state = None
+        for key in sorted(keys):
+            rebuild_day_grid(*key)
+
+    state = (keys, rebuild)
+    _pending.state = state
+    transaction.on_commit(rebuild)
+
+
+def get_day_grid(interviewer_id: int, date: datetime.date):
+    """returns the interviewer's grid row for the date, building it if missing."""
+    from dashboard.models import InterviewerDayGrid
+
+    grid = InterviewerDayGrid.objects.filter(
+        interviewer_id=interviewer_id, date=date
+    ).first()
+    if grid:
+        return grid
+    occupied, interviews = compute_day_masks(interviewer_id, date)
+    grid, _ = InterviewerDayGrid.objects.get_or_create(
+        interviewer_id=interviewer_id,
+        date=date,
+        defaults={
+            "occupied_cells": to_bytes(occupied),
+            "interview_cells": to_bytes(interviews),
+        },
+    )
+    return grid
+
+
+def may_overlap(
+    interviewer_id: int,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+) -> bool:
+    """
+    False when the day grid proves [start_time, end_time) touches none of the
+    interviewer's slots; True means "run the exact query".
+    """
+    from dashboard.models import InterviewerDayGrid
+
+    occupied = (
+        InterviewerDayGrid.objects.filter(interviewer_id=interviewer_id, date=date)
+        .values_list("occupied_cells", flat=True)
+        .first()
+    )
+    if occupied is None:
+        return True
+    return bool(from_bytes(occupied) & covering_mask(start_time, end_time))
+
+
+def may_have_interview_near(
+    grid, scheduled_time: datetime.time, gap: datetime.timedelta
+) -> bool:
+    """
+    False when grid proves no interview starts within gap of scheduled_time;
+    True means "run the exact query".
+    """
+    window = window_mask(scheduled_time, gap, gap)
+    if window is None:
+        return True
+    return bool(from_bytes(grid.interview_cells) & window)
+
+
+def mark_interview(grid, scheduled_time: datetime.time) -> bool:
+    """
+    records a new interview on a grid read with get_day_grid(). This is a
+    compare-and-swap on the grid version: False means another booking or a
+    rebuild changed the day since it was read, so the gap check is stale.
+    """
+    from dashboard.models import InterviewerDayGrid
+
+    interview_cells = to_bytes(
+        from_bytes(grid.interview_cells) | point_mask(scheduled_time)
+    )
+    updated = InterviewerDayGrid.objects.filter(
+        pk=grid.pk, version=grid.version
+    ).update(
+        interview_cells=interview_cells,
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+    return bool(updated)
+
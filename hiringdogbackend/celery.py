@@ -11,12 +11,32 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 app.conf.beat_schedule = {
-    "process_interview_recordings_every_15_minutes": {
+    "dispatch_email_outbox_every_15_seconds": {
+        "task": "dashboard.tasks.dispatch_email_outbox",
+        "schedule": 15.0,
+    },
+    "process_interview_recordings_every_5_minutes": {
         "task": "dashboard.tasks.trigger_interview_processing",
-        "schedule": crontab(minute="*/15"),
+        "schedule": crontab(minute="*/5"),
     },
     "process_interview_video_and_generate_and_store_feedback_every_30_minutes": {
         "task": "dashboard.tasks.process_interview_video_and_generate_and_store_feedback",
         "schedule": crontab(minute="*/30"),
     },
+    "sync_interviewer_calendars_every_10_minutes": {
+        "task": "dashboard.tasks.sync_interviewer_calendars",
+        "schedule": crontab(minute="*/10"),
+    },
+    "process_calendar_writes_every_minute": {
+        "task": "dashboard.tasks.process_calendar_writes",
+        "schedule": crontab(minute="*"),
+    },
+    "rebuild_capacity_forecast_every_night": {
+        "task": "dashboard.tasks.rebuild_capacity_forecast",
+        "schedule": crontab(minute=30, hour=0),
+    },
+    "compact_interviewer_availability_every_night": {
+        "task": "dashboard.tasks.compact_interviewer_availability",
+        "schedule": crontab(minute=0, hour=0),
+    },
 }
@@ -142,6 +142,42 @@ DJANGO_REST_PASSWORDRESET_NO_INFORMATION_LEAKAGE = True
 DJANGO_REST_MULTITOKENAUTH_RESET_TOKEN_EXPIRY_TIME = 1
 
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+    }
+}
+
+# recurring interviewer availability is expanded this many days ahead
+RECURRING_AVAILABILITY_HORIZON_DAYS = 90
+
+# outgoing mail across all workers, shared through Redis (externals.mail.smtp)
+EMAIL_SEND_RATE_PER_MINUTE = 30
+EMAIL_SEND_BURST = 10
+
+# ranged Drive downloads of recordings (externals.google.drive_download)
+DRIVE_DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+DRIVE_DOWNLOAD_CONCURRENCY = 4
+
+# feedback generation (externals.feedback); the Gemini quota is shared by all workers
+FEEDBACK_CONCURRENCY = 4
+GEMINI_REQUESTS_PER_MINUTE = 10
+GEMINI_REQUEST_BURST = 2
+# transcript analyses are cached this long; a directory switches to the on-disk cache
+FEEDBACK_ANALYSIS_CACHE_TTL = 30 * 24 * 60 * 60
+FEEDBACK_ANALYSIS_CACHE_DIR = None
+# longer transcripts are analyzed in segments of about this many characters
+FEEDBACK_SEGMENT_CHARS = 40000
+# feedback report PDFs: "node" posts to FEEDBACK_PDF_SERVICE_URL, "python"
+# renders templates/feedback_report.html in process (needs weasyprint, which
+# is not in requirements.txt). Node stays the default until the new template
+# has replaced its layout.
+FEEDBACK_PDF_RENDERER = "node"
+FEEDBACK_PDF_SERVICE_URL = "http://localhost:3000/generate-pdf"
+FEEDBACK_PDF_CONCURRENCY = 4
+
+
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TIMEZONE = "Asia/Kolkata"
 CELERY_RESULT_BACKEND = "redis://localhost:6379/0"